@@ -2,8 +2,10 @@
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from app.config import settings
-from app.routes import tabs, websocket
+from app.routes import tabs, websocket, events, admin, batch, leases, pool
+from app.services.leases import LeaseContextMiddleware
 from app import __version__
 
 app = FastAPI(
@@ -21,9 +23,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# X-Lease-Token / X-Lease-Wait of each request, read where commands are sent
+app.add_middleware(LeaseContextMiddleware)
+
 # Include routers
 app.include_router(websocket.router)
 app.include_router(tabs.router, prefix="/tab", tags=["tabs"])
+app.include_router(events.router, tags=["events"])
+app.include_router(batch.router, tags=["batch"])
+app.include_router(leases.router, prefix="/leases", tags=["leases"])
+app.include_router(pool.router, prefix="/pool", tags=["pool"])
+app.include_router(admin.router, prefix="/admin", tags=["admin"])
+
+@app.on_event("startup")
+async def startup():
+    """Start background work (the gateway link in worker processes)"""
+    from app.services.extension import extension_service
+    
+    await extension_service.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Stop background workers"""
+    from app.services.extension import extension_service
+    from app.services.content import shutdown_conversion_pool
+    
+    await extension_service.stop()
+    shutdown_conversion_pool()
 
 @app.get("/", tags=["health"])
 async def root():
@@ -39,13 +65,36 @@ async def root():
 
 @app.get("/health", tags=["health"])
 async def health():
-    """Detailed health check"""
+    """
+    Detailed health check
+    
+    Returns 503 with status "degraded" when the extension is disconnected or
+    has missed a heartbeat, so a load balancer can route around a stalled browser.
+    """
     from app.services.extension import extension_service
+    from app.services.events import event_bus
+    from app.services.extraction import extraction_cache
     
-    return {
-        "status": "healthy",
-        "extension": {
-            "connected": extension_service.is_connected(),
-            "pending_requests": len(extension_service.pending_requests)
+    alive = extension_service.is_alive()
+    
+    return JSONResponse(
+        status_code=200 if alive else 503,
+        content={
+            "status": "healthy" if alive else "degraded",
+            "role": settings.SERVICE_ROLE,
+            "extension": {
+                "connected": extension_service.is_connected(),
+                "pending_requests": len(extension_service.pending_requests),
+                "reconnecting": extension_service.in_grace_window(),
+                "replayed_commands": extension_service.replayed_commands,
+                "cancelled_commands": extension_service.cancelled_commands,
+                **extension_service.liveness()
+            },
+            "tab_state": extension_service.tab_state.status(),
+            "breakers": extension_service.tripped_breakers(),
+            "leases": extension_service.lease_status(),
+            "tab_pool": extension_service.pool_status(),
+            "events": event_bus.stats(),
+            "extraction_cache": extraction_cache.stats()
         }
-    }
+    )
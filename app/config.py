@@ -9,18 +9,78 @@ class Settings(BaseSettings):
     # Server
     HOST: str = "0.0.0.0"
     PORT: int = 8000
+    # Also listen on this Unix domain socket (empty = TCP only), for
+    # same-host clients such as the MCP server
+    UNIX_SOCKET: str = ""
     DEBUG: bool = False
     LOG_LEVEL: str = "INFO"
     
     # CORS
     CORS_ORIGINS: list = ["*"]
     
-    # WebSocket
-    WS_HEARTBEAT_INTERVAL: int = 30
-    WS_TIMEOUT: int = 10
+    # Process model: "standalone" (one process), or a "gateway" owning the
+    # extension WebSocket plus WORKERS stateless HTTP "worker" processes
+    SERVICE_ROLE: str = "standalone"
+    WORKERS: int = 1
+    GATEWAY_PORT: int = 8001
+    GATEWAY_SOCKET: str = "/tmp/chrome-automation-gateway.sock"
+    GATEWAY_IPC_PORT: int = 8765
+    
+    # WebSocket (server-driven heartbeat)
+    WS_HEARTBEAT_INTERVAL: int = 10
+    WS_TIMEOUT: int = 5
+    WS_MAX_MISSED_HEARTBEATS: int = 2
+    WS_RTT_WINDOW: int = 500
     
     # Extension
     EXTENSION_RESPONSE_TIMEOUT: int = 30
+    EXTENSION_RECONNECT_GRACE: float = 10.0
+    CLIENT_DISCONNECT_POLL_INTERVAL: float = 0.5
+    
+    # Adaptive timeouts (multiplier * p99 per action and domain, clamped)
+    ADAPTIVE_TIMEOUTS: bool = True
+    ADAPTIVE_TIMEOUT_MULTIPLIER: float = 3.0
+    ADAPTIVE_TIMEOUT_MIN: float = 2.0
+    ADAPTIVE_TIMEOUT_NAVIGATION_MIN: float = 10.0
+    ADAPTIVE_TIMEOUT_MAX: float = 120.0
+    ADAPTIVE_TIMEOUT_MIN_SAMPLES: int = 20
+    
+    # Circuit breakers (per domain and per tab)
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_BREAKER_FAILURES: int = 5
+    CIRCUIT_BREAKER_RECOVERY: float = 30.0
+    CIRCUIT_BREAKER_PROBES: int = 1
+    
+    # Tab leases - TTL is an idle timeout renewed by every command sent with
+    # the lease token; non-holders wait up to LEASE_WAIT seconds (0 = 423 at once)
+    LEASE_DEFAULT_TTL: float = 300.0
+    LEASE_MAX_TTL: float = 3600.0
+    LEASE_MAX_TABS: int = 20
+    LEASE_WAIT: float = 0.0
+    LEASE_REAP_INTERVAL: float = 5.0
+    
+    # Warm tab pool (POST /pool/checkout) - TAB_POOL_SIZE tabs at most (0 = off),
+    # TAB_POOL_MIN_IDLE kept loaded; extra idle tabs close after IDLE_TIMEOUT and
+    # tabs not checked in within CHECKOUT_TIMEOUT are taken back
+    TAB_POOL_SIZE: int = 0
+    TAB_POOL_MIN_IDLE: int = 2
+    TAB_POOL_IDLE_TIMEOUT: float = 300.0
+    TAB_POOL_CHECKOUT_TIMEOUT: float = 600.0
+    TAB_POOL_WINDOW: bool = False
+    TAB_POOL_CLEAR_STORAGE: bool = False
+    
+    # Event stream
+    EVENT_BUFFER_SIZE: int = 256
+    # Largest buffer a client may ask for with ?buffer=
+    EVENT_BUFFER_MAX: int = 4096
+    EVENT_KEEPALIVE_INTERVAL: int = 15
+    
+    # Markdown conversion worker processes (0 = threads in the server process)
+    CONVERSION_WORKERS: int = 2
+    
+    # Structured extraction cache, keyed by (url, schema hash)
+    EXTRACT_CACHE_TTL: float = 60.0
+    EXTRACT_CACHE_SIZE: int = 256
     
     class Config:
         env_file = ".env"
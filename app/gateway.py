@@ -0,0 +1,54 @@
+"""Extension gateway application (multi-process mode)"""
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from app.routes import websocket
+from app.services.extension import extension_service
+from app.services.gateway import GatewayServer, ipc_address
+from app import __version__
+
+app = FastAPI(
+    title="Chrome Automation Gateway",
+    version=__version__,
+    description="Owns the Chrome extension connection and serves HTTP workers over local IPC"
+)
+
+app.include_router(websocket.router)
+
+gateway = GatewayServer(extension_service)
+
+@app.on_event("startup")
+async def startup():
+    """Start accepting worker connections and reaping expired leases"""
+    await extension_service.start()
+    await gateway.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Disconnect workers"""
+    await gateway.stop()
+    await extension_service.stop()
+
+@app.get("/health", tags=["health"])
+async def health():
+    """Extension liveness and connected workers"""
+    alive = extension_service.is_alive()
+    
+    return JSONResponse(
+        status_code=200 if alive else 503,
+        content={
+            "status": "healthy" if alive else "degraded",
+            "role": "gateway",
+            "ipc": ipc_address(),
+            "workers": len(gateway.links),
+            "extension": {
+                "connected": extension_service.is_connected(),
+                "pending_requests": len(extension_service.pending_requests),
+                **extension_service.liveness()
+            },
+            "tab_state": extension_service.tab_state.status(),
+            "breakers": extension_service.tripped_breakers(),
+            "leases": extension_service.lease_status(),
+            "tab_pool": extension_service.pool_status()
+        }
+    )
@@ -1,9 +1,28 @@
 """Pydantic models for request/response validation"""
 
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal, Union
 
-class TabCreate(BaseModel):
+WaitUntil = Literal["commit", "domcontentloaded", "load", "networkidle", "selector"]
+
+class NavigationWait(BaseModel):
+    """How far a page must load before a navigating command returns"""
+    wait_until: WaitUntil = Field("load", description="Lifecycle point to wait for: commit, domcontentloaded, load, networkidle or selector")
+    wait_selector: Optional[str] = Field(None, description="CSS selector that must be present (wait_until=selector)")
+    wait_timeout: Optional[int] = Field(None, gt=0, le=300000, description="Milliseconds before the wait fails (default: 30000)")
+    
+    def to_wait(self) -> Dict[str, Any]:
+        """Wait fields of the extension command"""
+        if self.wait_until == "selector" and not self.wait_selector:
+            raise ValueError("wait_until 'selector' requires wait_selector")
+        wait: Dict[str, Any] = {"waitUntil": self.wait_until}
+        if self.wait_selector:
+            wait["waitSelector"] = self.wait_selector
+        if self.wait_timeout is not None:
+            wait["waitTimeout"] = self.wait_timeout
+        return wait
+
+class TabCreate(NavigationWait):
     """Request model for creating a new tab"""
     url: str = Field(..., description="URL to open in the new tab")
     active: bool = Field(True, description="Whether to make the tab active")
@@ -15,17 +34,39 @@ class TabInfo(BaseModel):
     title: str
     active: bool
     windowId: Optional[int] = None
+    index: Optional[int] = None
+    pinned: Optional[bool] = None
+    status: Optional[str] = None
+    favIconUrl: Optional[str] = None
+
+class TabStateInfo(BaseModel):
+    """Staleness indicator for responses served from the tab mirror"""
+    synced: bool
+    stale: bool
+    age: Optional[float] = Field(None, description="Seconds since the mirror last received a snapshot or event")
+    tabs: int = 0
 
 class TabsResponse(BaseModel):
     """Response model for listing tabs"""
     success: bool
+    count: Optional[int] = None
     tabs: List[TabInfo]
+    source: str = Field("extension", description="'mirror' when served from the server-side tab table, 'extension' for a live query")
+    state: Optional[TabStateInfo] = None
 
 class TabContentResponse(BaseModel):
     """Response model for tab content"""
     success: bool
     content: Dict[str, Any]
 
+class TabsContentRequest(BaseModel):
+    """Request model for capturing the content of many tabs at once"""
+    tab_ids: List[int] = Field(..., min_length=1, description="Tabs to capture")
+    format: Literal["html", "markdown"] = Field("html", description="Content format")
+    method: str = Field("html2text", description="Markdown conversion method")
+    clean: bool = Field(True, description="Clean HTML before conversion")
+    concurrency: int = Field(4, ge=1, le=32, description="Maximum tabs captured at once")
+
 class InteractionRequest(BaseModel):
     """Request model for page interactions"""
     action: str = Field(..., description="Action type: click, input, select, wait, waitForElement, getText, getAttribute")
@@ -39,6 +80,214 @@ class InteractionResponse(BaseModel):
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
+class WorkflowStep(BaseModel):
+    """A single step of an in-page workflow"""
+    action: Literal[
+        "input", "click", "select", "wait", "waitForElement",
+        "getText", "getAttribute", "extract", "if"
+    ] = Field(..., description="Step type")
+    selector: Optional[str] = Field(None, description="CSS selector for the element")
+    value: Optional[str] = Field(None, description="Value for input/select steps")
+    timeout: Optional[int] = Field(None, description="Milliseconds for wait (default 1000), waitForElement (default 5000) and if (default 0)")
+    name: Optional[str] = Field(None, description="Store the step's value under this key in `outputs`")
+    attribute: Optional[str] = Field(None, description="getAttribute/extract: attribute to read; extract also accepts text (default) and html")
+    all: bool = Field(False, description="extract: every match instead of the first")
+    limit: Optional[int] = Field(None, description="extract: maximum number of matches")
+    fields: Optional[Dict[str, str]] = Field(None, description="extract: record fields as sub-selectors, optionally suffixed with @attribute")
+    exists: bool = Field(True, description="if: take the then-branch when the element exists (true) or is missing (false)")
+    then: Optional[List["WorkflowStep"]] = Field(None, description="if: steps to run when the condition holds")
+    else_: Optional[List["WorkflowStep"]] = Field(None, alias="else", description="if: steps to run otherwise")
+    optional: bool = Field(False, description="A failure of this step does not fail the workflow")
+    
+    model_config = {"populate_by_name": True}
+    
+    def budget_ms(self) -> int:
+        """Longest time this step may spend waiting in the page"""
+        if self.action == "if":
+            branches = [self.then or [], self.else_ or []]
+            return (self.timeout or 0) + max(sum(step.budget_ms() for step in branch) for branch in branches)
+        if self.action == "wait":
+            return self.timeout if self.timeout is not None else 1000
+        if self.action == "waitForElement":
+            return self.timeout if self.timeout is not None else 5000
+        if self.action == "click":
+            return 300
+        return 0
+
+WorkflowStep.model_rebuild()
+
+class WorkflowRequest(BaseModel):
+    """Request model for running several interactions in one injected script"""
+    steps: List[WorkflowStep] = Field(..., min_length=1, description="Steps to run, in order")
+    stop_on_error: bool = Field(True, description="Skip the remaining steps once a non-optional step fails")
+    
+    def to_workflow(self) -> Dict[str, Any]:
+        """Translate into the extension's workflow message"""
+        return {
+            "steps": [step.model_dump(by_alias=True, exclude_none=True) for step in self.steps],
+            "stopOnError": self.stop_on_error
+        }
+    
+    def budget_ms(self) -> int:
+        """Longest time the whole workflow may spend waiting in the page"""
+        return sum(step.budget_ms() for step in self.steps)
+    
+    def may_navigate(self) -> bool:
+        """Whether a click step could take the workflow to another document"""
+        def clicks(steps: List[WorkflowStep]) -> bool:
+            return any(step.action == "click" or clicks((step.then or []) + (step.else_ or [])) for step in steps)
+        return clicks(self.steps)
+
+class ExtractField(BaseModel):
+    """How to read one field of an extracted row"""
+    selector: Optional[str] = Field(None, description="CSS selector relative to the container item; omit for the item itself")
+    attribute: Optional[str] = Field(None, description="text (default), html, or an attribute name such as href")
+    all: bool = Field(False, description="Return every match as a list instead of the first")
+    transforms: List[Literal["trim", "collapse", "lower", "upper", "number", "integer", "absolute_url"]] = Field(
+        default_factory=list, description="Applied in order to each value"
+    )
+    regex: Optional[str] = Field(None, description="Keep the first capture group (or whole match) of this pattern")
+    default: Optional[Any] = Field(None, description="Value when nothing matches")
+    
+    @classmethod
+    def normalize(cls, spec: Union[str, "ExtractField"]) -> Dict[str, Any]:
+        """Expand "selector@attribute" shorthand and drop unset options"""
+        if isinstance(spec, str):
+            selector, _, attribute = spec.partition("@")
+            spec = cls(selector=selector or None, attribute=attribute or None)
+        return spec.model_dump(exclude_none=True, exclude_defaults=True)
+
+class ExtractRequest(BaseModel):
+    """Request model for declarative structured extraction"""
+    container: Optional[str] = Field(None, description="Selector of the repeated item; omit to extract a single row from the page")
+    fields: Dict[str, Union[str, ExtractField]] = Field(
+        ..., min_length=1, description='Field specs; a string is shorthand for "selector" or "selector@attribute"'
+    )
+    limit: Optional[int] = Field(None, ge=1, description="Maximum number of rows")
+    format: Literal["objects", "columns"] = Field("objects", description="Rows as objects, or column names plus value lists")
+    cache: bool = Field(True, description="Serve and store results in the (url, schema) cache")
+    
+    def to_schema(self) -> Dict[str, Any]:
+        """Normalized schema sent to the extension and hashed for the cache"""
+        schema: Dict[str, Any] = {
+            "fields": {name: ExtractField.normalize(spec) for name, spec in self.fields.items()}
+        }
+        if self.container:
+            schema["container"] = self.container
+        if self.limit:
+            schema["limit"] = self.limit
+        return schema
+
+class HarvestRequest(BaseModel):
+    """Request model for harvesting an infinite-scroll or paginated feed"""
+    item: str = Field(..., description="Selector of one feed item")
+    fields: Optional[Dict[str, Union[str, ExtractField]]] = Field(
+        None, description="Field specs as for /extract (default: the item's text)"
+    )
+    key: Optional[str] = Field(None, description="Field used to dedupe items (default: the whole row)")
+    mode: Literal["scroll", "next"] = Field("scroll", description="Scroll to the bottom or click a next button between rounds")
+    next_selector: Optional[str] = Field(None, description='Selector of the "next" button (mode: next)')
+    max_items: int = Field(500, ge=1, description="Stop after this many items")
+    max_rounds: int = Field(50, ge=1, description="Stop after this many scroll/next rounds")
+    idle_rounds: int = Field(3, ge=1, description="Stop after this many rounds without new items")
+    time_budget: float = Field(60.0, gt=0, le=600, description="Stop after this many seconds")
+    wait: int = Field(1000, ge=0, description="Milliseconds to wait for new items after each scroll/next")
+    
+    def to_harvest(self) -> Dict[str, Any]:
+        """Translate into the extension's harvest message"""
+        fields = self.fields or {"text": ExtractField(transforms=["collapse"])}
+        return {
+            "schema": {
+                "container": self.item,
+                "fields": {name: ExtractField.normalize(spec) for name, spec in fields.items()}
+            },
+            "key": self.key,
+            "mode": self.mode,
+            "nextSelector": self.next_selector,
+            "maxItems": self.max_items,
+            "maxRounds": self.max_rounds,
+            "idleRounds": self.idle_rounds,
+            "timeBudget": int(self.time_budget * 1000),
+            "wait": self.wait
+        }
+
+class BatchCommand(NavigationWait):
+    """
+    A single command inside a batch; fields mirror the matching tab route
+    
+    The wait_* fields apply to createTab, navigateTab and reloadTab.
+    """
+    action: Literal[
+        "createTab", "getTabs", "getActiveTab", "navigateTab", "activateTab",
+        "reloadTab", "closeTab", "getContent", "getMetadata", "interact"
+    ] = Field(..., description="Extension action to run")
+    tab_id: Optional[int] = Field(None, description="Target tab (all tab-scoped actions)")
+    url: Optional[str] = Field(None, description="URL for createTab and navigateTab")
+    active: Optional[bool] = Field(None, description="createTab: activate the tab; getTabs: filter on active")
+    current_window: Optional[bool] = Field(None, description="getTabs: filter on the current window")
+    bypass_cache: bool = Field(False, description="reloadTab: bypass the browser cache")
+    format: str = Field("html", description="getContent: html or markdown")
+    method: str = Field("html2text", description="getContent: markdown conversion method")
+    clean: bool = Field(True, description="getContent: clean HTML before conversion")
+    interaction: Optional[InteractionRequest] = Field(None, description="interact: the interaction to perform")
+    
+    def to_command(self) -> Dict[str, Any]:
+        """Translate into the extension's command message"""
+        command: Dict[str, Any] = {"action": self.action}
+        
+        if self.action in ("createTab", "navigateTab") and not self.url:
+            raise ValueError(f"{self.action} requires url")
+        if self.action not in ("createTab", "getTabs", "getActiveTab") and self.tab_id is None:
+            raise ValueError(f"{self.action} requires tab_id")
+        if self.action == "interact" and self.interaction is None:
+            raise ValueError("interact requires interaction")
+        
+        if self.tab_id is not None and self.action not in ("createTab", "getTabs", "getActiveTab"):
+            command["tabId"] = self.tab_id
+        if self.action in ("createTab", "navigateTab", "reloadTab"):
+            command.update(self.to_wait())
+        if self.action == "createTab":
+            command["url"] = self.url
+            command["active"] = True if self.active is None else self.active
+        elif self.action == "navigateTab":
+            command["url"] = self.url
+        elif self.action == "getTabs":
+            query = {}
+            if self.active is not None:
+                query["active"] = self.active
+            if self.current_window is not None:
+                query["currentWindow"] = self.current_window
+            command["filter"] = query
+        elif self.action == "reloadTab":
+            command["bypassCache"] = self.bypass_cache
+        elif self.action == "getContent":
+            command["format"] = self.format
+        elif self.action == "interact":
+            command["interaction"] = self.interaction.model_dump()
+        
+        return command
+
+class BatchRequest(BaseModel):
+    """Request model for running several commands in one round trip"""
+    commands: List[BatchCommand] = Field(..., min_length=1, description="Commands to run, in order")
+    mode: Literal["sequential", "parallel"] = Field("sequential", description="Run commands one after another or concurrently")
+    concurrency: int = Field(8, ge=1, le=64, description="Maximum commands in flight in parallel mode")
+    stop_on_error: bool = Field(False, description="Skip commands that have not started once one fails")
+    stream: bool = Field(False, description="Stream results as NDJSON as they complete")
+
+class LeaseRequest(BaseModel):
+    """Request model for leasing tabs to one client"""
+    client: str = Field("anonymous", description="Name of the agent or job holding the lease, shown to others")
+    tab_ids: List[int] = Field(default_factory=list, description="Existing tabs to lease")
+    count: int = Field(0, ge=0, description="New background tabs to open for the lease")
+    url: str = Field("about:blank", description="URL the new tabs open at")
+    ttl: Optional[float] = Field(None, gt=0, description="Idle seconds before the lease expires (default: LEASE_DEFAULT_TTL)")
+    wait: float = Field(0.0, ge=0, le=300, description="Seconds to wait for tabs leased by others")
+
+class PoolCheckoutRequest(NavigationWait):
+    """Request model for taking a tab from the warm pool"""
+    url: Optional[str] = Field(None, description="URL to navigate the tab to (default: leave it blank)")
+
 class ErrorResponse(BaseModel):
     """Error response model"""
     success: bool = False
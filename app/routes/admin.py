@@ -0,0 +1,57 @@
+"""Operational endpoints for inspecting server internals"""
+
+from typing import Optional
+from fastapi import APIRouter
+from app.config import settings
+from app.services.extension import extension_service
+
+router = APIRouter()
+
+@router.get("/timeouts")
+async def get_timeouts():
+    """
+    Adaptive command timeouts
+    
+    Returns the rolling latency for every (action, domain) pair seen so far
+    and the timeout currently derived from it.
+    """
+    return {
+        "success": True,
+        "enabled": settings.ADAPTIVE_TIMEOUTS,
+        "multiplier": settings.ADAPTIVE_TIMEOUT_MULTIPLIER,
+        "floor": settings.ADAPTIVE_TIMEOUT_MIN,
+        "ceiling": settings.ADAPTIVE_TIMEOUT_MAX,
+        "min_samples": settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+        **await extension_service.admin("timeouts")
+    }
+
+@router.get("/breakers")
+async def get_breakers(tripped_only: bool = False):
+    """
+    Circuit breaker state
+    
+    - **tripped_only**: Only list open and half-open breakers (default: false)
+    
+    Breakers are keyed `domain:<host>` and `tab:<id>`. A breaker opens after
+    CIRCUIT_BREAKER_FAILURES consecutive timeouts or page-load failures and
+    half-opens after CIRCUIT_BREAKER_RECOVERY seconds to let probe requests through.
+    """
+    return {
+        "success": True,
+        "enabled": settings.CIRCUIT_BREAKER_ENABLED,
+        "failure_threshold": settings.CIRCUIT_BREAKER_FAILURES,
+        "recovery_timeout": settings.CIRCUIT_BREAKER_RECOVERY,
+        **await extension_service.admin("breakers", include_closed=not tripped_only)
+    }
+
+@router.post("/breakers/reset")
+async def reset_breakers(key: Optional[str] = None):
+    """
+    Close circuit breakers
+    
+    - **key**: Breaker to reset, e.g. `domain:example.com` (optional, default: all)
+    """
+    return {
+        "success": True,
+        **await extension_service.admin("reset_breakers", key=key)
+    }
@@ -0,0 +1,40 @@
+"""Batch execution routes"""
+
+from typing import Optional
+from fastapi import APIRouter, Request
+from fastapi.responses import StreamingResponse
+from app.models import BatchRequest
+from app.services.batch import BatchRunner
+
+router = APIRouter()
+
+@router.post("/batch")
+async def run_batch(request: BatchRequest, http_request: Request, command_timeout: Optional[float] = None):
+    """
+    Run several commands in a single round trip to the extension
+    
+    - **commands**: Commands to run; each has an `action` plus the fields of the matching tab route
+      (`tab_id`, `url`, `active`, `current_window`, `bypass_cache`, `format`, `method`, `clean`, `interaction`)
+    - **mode**: "sequential" or "parallel" (default: sequential)
+    - **concurrency**: Maximum commands in flight in parallel mode (default: 8)
+    - **stop_on_error**: Skip commands that have not started once one fails (default: false)
+    - **stream**: Stream results as NDJSON as they complete (default: false)
+    - **command_timeout**: Timeout for the whole batch in seconds (default: derived from the sub-commands)
+    
+    ## Supported Actions:
+    createTab, getTabs, getActiveTab, navigateTab, activateTab, reloadTab,
+    closeTab, getContent, getMetadata, interact
+    
+    Every result carries the `index` of its command. A failing command does
+    not fail the batch; check `success` on each result and the `failed` count.
+    """
+    runner = BatchRunner(request, http_request, command_timeout)
+    
+    if request.stream:
+        return StreamingResponse(
+            runner.stream(),
+            media_type="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    
+    return await runner.run()
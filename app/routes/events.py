@@ -0,0 +1,78 @@
+"""Event stream routes for API clients"""
+
+import json
+from typing import List, Optional
+from fastapi import APIRouter, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from app.config import settings
+from app.services.events import event_bus
+
+router = APIRouter()
+
+
+def _parse_types(types: Optional[str]) -> List[str]:
+    """Split a comma-separated event type filter"""
+    return [t.strip() for t in types.split(",") if t.strip()] if types else []
+
+
+@router.get("/events")
+async def stream_events(
+    types: Optional[str] = None,
+    tab_id: Optional[List[int]] = Query(None),
+    buffer: Optional[int] = Query(None, ge=2, le=settings.EVENT_BUFFER_MAX)
+):
+    """
+    Subscribe to browser events as Server-Sent Events
+    
+    - **types**: Comma-separated event types or categories, e.g. `tab,navigation.completed` (optional)
+    - **tab_id**: Only events for these tabs, repeatable (optional)
+    - **buffer**: Per-subscriber buffer size, 2 to EVENT_BUFFER_MAX (default: EVENT_BUFFER_SIZE)
+    
+    ## Event Types:
+    - **tab.created / tab.updated / tab.removed / tab.activated**
+    - **window.focusChanged**
+    - **navigation.committed / navigation.domContentLoaded / navigation.completed / navigation.errorOccurred**
+    
+    Subscribers that fall behind by more than `buffer` events receive a
+    final `stream.dropped` event and are disconnected.
+    """
+    subscriber = event_bus.subscribe(_parse_types(types), tab_id, buffer)
+    
+    async def event_source():
+        async for event in event_bus.listen(subscriber, keepalive=settings.EVENT_KEEPALIVE_INTERVAL):
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+    
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.websocket("/events")
+async def websocket_events(
+    websocket: WebSocket,
+    types: Optional[str] = None,
+    tab_id: Optional[List[int]] = Query(None),
+    buffer: Optional[int] = Query(None, ge=2, le=settings.EVENT_BUFFER_MAX)
+):
+    """Subscribe to browser events over a WebSocket (same filters as GET /events)"""
+    await websocket.accept()
+    subscriber = event_bus.subscribe(_parse_types(types), tab_id, buffer)
+    
+    try:
+        async for event in event_bus.listen(subscriber, keepalive=settings.EVENT_KEEPALIVE_INTERVAL):
+            if event is None:
+                await websocket.send_json({"type": "keepalive"})
+                continue
+            await websocket.send_json(event)
+        
+        # Dropped for being too slow
+        await websocket.close(code=1013)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        event_bus.unsubscribe(subscriber)
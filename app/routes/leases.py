@@ -0,0 +1,80 @@
+"""Tab lease routes for clients sharing one browser"""
+
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from app.config import settings
+from app.models import LeaseRequest
+from app.services.extension import extension_service
+
+router = APIRouter()
+
+@router.post("")
+async def acquire_lease(request: LeaseRequest):
+    """
+    Lease tabs for exclusive use by one client
+    
+    - **client**: Name of the holder, reported to clients that are turned away
+    - **tab_ids**: Existing tabs to lease (optional)
+    - **count**: New background tabs to open for the lease (optional)
+    - **url**: URL the new tabs open at (default: about:blank)
+    - **ttl**: Idle seconds before the lease expires (default: LEASE_DEFAULT_TTL, at most LEASE_MAX_TTL)
+    - **wait**: Seconds to wait for tabs another client holds (default: 0)
+    
+    Send the returned `token` as `X-Lease-Token` on every command for the
+    leased tabs; each such command renews the lease. Commands from anyone
+    else get 423 Locked, or queue for up to `X-Lease-Wait` seconds (default:
+    LEASE_WAIT). Tabs created with the token join the lease. Expired leases
+    are reclaimed automatically and the tabs they opened are closed.
+    """
+    total = len(request.tab_ids) + request.count
+    if total == 0:
+        raise HTTPException(status_code=422, detail="Lease at least one tab: give tab_ids or count")
+    if total > settings.LEASE_MAX_TABS:
+        raise HTTPException(status_code=422, detail=f"A lease holds at most {settings.LEASE_MAX_TABS} tabs")
+    
+    return {
+        "success": True,
+        **await extension_service.admin(
+            "lease_acquire",
+            client=request.client,
+            tab_ids=request.tab_ids,
+            count=request.count,
+            url=request.url,
+            ttl=request.ttl,
+            wait=request.wait
+        )
+    }
+
+@router.get("")
+async def list_leases():
+    """
+    Live leases
+    
+    Lists every lease with its holder, tabs and remaining time (tokens are
+    never listed), plus how many leases have expired so far.
+    """
+    return {"success": True, **await extension_service.admin("leases")}
+
+@router.post("/{token}/renew")
+async def renew_lease(token: str, ttl: Optional[float] = None):
+    """
+    Extend a lease without sending a command
+    
+    - **token**: The lease token
+    - **ttl**: New idle TTL in seconds (optional, default: keep the current one)
+    
+    Returns 410 if the lease has already expired or been released.
+    """
+    return {"success": True, **await extension_service.admin("lease_renew", token=token, ttl=ttl)}
+
+@router.delete("/{token}")
+async def release_lease(token: str, close_tabs: bool = True):
+    """
+    Release a lease
+    
+    - **token**: The lease token
+    - **close_tabs**: Close the tabs the lease opened (default: true)
+    
+    Commands queued for the lease's tabs proceed immediately.
+    """
+    return {"success": True, **await extension_service.admin("lease_release", token=token, close_tabs=close_tabs)}
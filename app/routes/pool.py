@@ -0,0 +1,57 @@
+"""Warm tab pool routes"""
+
+from typing import Optional
+from fastapi import APIRouter, HTTPException
+from app.models import PoolCheckoutRequest
+from app.services.extension import extension_service
+
+router = APIRouter()
+
+@router.get("")
+async def get_pool():
+    """
+    Tab pool state
+    
+    Idle and checked-out tab counts, plus `hits` (checkouts served by a warm
+    tab), `misses` (tab opened on demand), `recycled`, `closed`, `reclaimed`
+    and `reset_failures` counters. Also reported under `tab_pool` in /health.
+    """
+    return {"success": True, **await extension_service.admin("pool")}
+
+@router.post("/checkout")
+async def checkout_tab(request: PoolCheckoutRequest, command_timeout: Optional[float] = None):
+    """
+    Take a warm tab from the pool
+    
+    - **url**: URL to navigate the tab to (optional)
+    - **wait_until / wait_selector / wait_timeout**: When the navigation counts as done, as for `/tab/{tab_id}/navigate`
+    
+    Returns a loaded background tab instantly when one is idle, otherwise
+    opens one. Fails with 503 when the pool is disabled (TAB_POOL_SIZE=0) or
+    all TAB_POOL_SIZE tabs are checked out. Return the tab with
+    `POST /pool/{tab_id}/checkin` (or `DELETE /tab/{tab_id}`) when done.
+    """
+    try:
+        wait = request.to_wait()
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {
+        "success": True,
+        **await extension_service.admin("pool_checkout", url=request.url, timeout=command_timeout, wait=wait)
+    }
+
+@router.post("/{tab_id}/checkin")
+async def checkin_tab(tab_id: int, clear_storage: Optional[bool] = None):
+    """
+    Return a tab to the pool
+    
+    - **tab_id**: A tab from `POST /pool/checkout`
+    - **clear_storage**: Clear the page's cookies and storage before resetting (default: TAB_POOL_CLEAR_STORAGE)
+    
+    The tab is reset to about:blank and kept warm for the next checkout; a
+    tab that fails to reset is closed instead (`returned: false`).
+    """
+    return {
+        "success": True,
+        **await extension_service.admin("pool_checkin", tab_id=tab_id, clear_storage=clear_storage)
+    }
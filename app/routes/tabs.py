@@ -1,39 +1,92 @@
-"""Tab management routes"""
+"""
+Tab management routes
 
-from fastapi import APIRouter, HTTPException
+Every route that talks to the extension accepts an optional
+`command_timeout` query parameter (seconds) that overrides the adaptive
+per-action, per-domain timeout. Long-running routes pass the incoming
+request along so the command is cancelled if the client disconnects.
+
+The navigating routes (new, navigate, reload) take `wait_until`,
+`wait_selector` and `wait_timeout` to choose when they return; a wait that
+runs out fails with 504 instead of returning a half-loaded page.
+"""
+
+import json
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from app.models import (
-    TabCreate, TabsResponse, TabContentResponse, 
-    InteractionRequest, InteractionResponse
+    NavigationWait, WaitUntil, TabCreate, TabsResponse, TabContentResponse, 
+    InteractionRequest, InteractionResponse, WorkflowRequest, ExtractRequest,
+    HarvestRequest, TabsContentRequest
 )
+from app.config import settings
 from app.services.extension import extension_service
+from app.services.content import convert_markdown_content, ContentConversionError
+from app.services.extraction import extraction_cache, schema_hash, to_columns
+from app.services.fanout import ContentFanOut
 
 router = APIRouter()
 
+def _wait_fields(wait_until: str, wait_selector: Optional[str], wait_timeout: Optional[int]) -> dict:
+    """Command fields of a navigation wait; 422 for a selector wait without a selector"""
+    try:
+        return NavigationWait(
+            wait_until=wait_until, wait_selector=wait_selector, wait_timeout=wait_timeout
+        ).to_wait()
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
 @router.post("/new", response_model=dict)
-async def create_tab(request: TabCreate):
+async def create_tab(request: TabCreate, http_request: Request, command_timeout: Optional[float] = None):
     """
     Open a new tab with the specified URL
     
     - **url**: The URL to open
     - **active**: Whether to make the tab active (default: true)
+    - **wait_until**: commit, domcontentloaded, load, networkidle or selector (default: load)
+    - **wait_selector**: Selector to wait for when wait_until is "selector"
+    - **wait_timeout**: Milliseconds before the wait fails with 504 (default: 30000)
+    
+    The response's `wait` reports which condition was met and after how many milliseconds.
     """
     response = await extension_service.send_command({
         "action": "createTab",
         "url": request.url,
-        "active": request.active
-    })
+        "active": request.active,
+        **_wait_fields(request.wait_until, request.wait_selector, request.wait_timeout)
+    }, timeout=command_timeout, request=http_request)
     return response
 
 @router.get("s", response_model=TabsResponse)
-async def get_tabs(active: bool = None, current_window: bool = None):
+async def get_tabs(
+    active: bool = None,
+    current_window: bool = None,
+    live: bool = False,
+    command_timeout: Optional[float] = None
+):
     """
     Get information about all open tabs
     
     - **active**: Filter by active status (optional)
     - **current_window**: Filter by current window (optional)
+    - **live**: Skip the server-side tab mirror and query the extension (default: false)
     
-    Returns a list of all tabs with their ID, URL, title, status, and more
+    Returns a list of all tabs with their ID, URL, title, status, and more.
+    Served from the tab mirror when it is in sync; `source` and `state`
+    report where the answer came from and how fresh it is.
     """
+    tab_state = extension_service.tab_state
+    if not live and tab_state.is_fresh():
+        tabs = tab_state.query(active=active, current_window=current_window)
+        return {
+            "success": True,
+            "count": len(tabs),
+            "tabs": tabs,
+            "source": "mirror",
+            "state": tab_state.status()
+        }
+    
     filter_params = {}
     if active is not None:
         filter_params['active'] = active
@@ -43,40 +96,93 @@ async def get_tabs(active: bool = None, current_window: bool = None):
     response = await extension_service.send_command({
         "action": "getTabs",
         "filter": filter_params
-    })
+    }, timeout=command_timeout)
+    response["source"] = "extension"
+    response["state"] = tab_state.status()
     return response
 
+@router.post("s/content")
+async def get_tabs_content(
+    request: TabsContentRequest,
+    http_request: Request,
+    command_timeout: Optional[float] = None
+):
+    """
+    Capture the content of many tabs at once, streamed as NDJSON
+    
+    - **tab_ids**: Tabs to capture
+    - **format**: "html" or "markdown" (default: html)
+    - **method**: Markdown conversion method (default: html2text)
+    - **clean**: Clean HTML before conversion (default: true)
+    - **concurrency**: Maximum tabs captured at once in the extension (default: 4)
+    
+    Emits one `{"type": "result", "tab_id": ...}` line per tab as soon as it
+    is captured (and converted), in completion order, then a
+    `{"type": "summary"}` line. A failing tab only fails its own line.
+    """
+    fan_out = ContentFanOut(request, http_request, command_timeout)
+    return StreamingResponse(
+        fan_out.stream(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/active")
-async def get_active_tab():
+async def get_active_tab(live: bool = False, command_timeout: Optional[float] = None):
     """
     Get the currently active tab
     
+    - **live**: Skip the server-side tab mirror and query the extension (default: false)
+    
     Returns information about the active tab in the current window
     """
+    tab_state = extension_service.tab_state
+    tab = tab_state.active_tab() if not live and tab_state.is_fresh() else None
+    if tab is not None:
+        return {
+            "success": True,
+            "tab": tab,
+            "source": "mirror",
+            "state": tab_state.status()
+        }
+    
     response = await extension_service.send_command({
         "action": "getActiveTab"
-    })
+    }, timeout=command_timeout)
     return response
 
 @router.post("/{tab_id}/navigate")
-async def navigate_tab(tab_id: int, url: str):
+async def navigate_tab(
+    tab_id: int,
+    url: str,
+    http_request: Request,
+    wait_until: WaitUntil = "load",
+    wait_selector: Optional[str] = None,
+    wait_timeout: Optional[int] = None,
+    command_timeout: Optional[float] = None
+):
     """
     Navigate a tab to a new URL
     
     - **tab_id**: The ID of the tab to navigate
     - **url**: The URL to navigate to
+    - **wait_until**: commit, domcontentloaded, load, networkidle or selector (default: load)
+    - **wait_selector**: Selector to wait for when wait_until is "selector"
+    - **wait_timeout**: Milliseconds before the wait fails with 504 (default: 30000)
     
-    Navigates the specified tab to the new URL and waits for it to load
+    Navigates the specified tab to the new URL and waits until the chosen
+    condition holds; `wait` in the response reports it and the elapsed time.
     """
     response = await extension_service.send_command({
         "action": "navigateTab",
         "tabId": tab_id,
-        "url": url
-    })
+        "url": url,
+        **_wait_fields(wait_until, wait_selector, wait_timeout)
+    }, timeout=command_timeout, request=http_request)
     return response
 
 @router.post("/{tab_id}/activate")
-async def activate_tab(tab_id: int):
+async def activate_tab(tab_id: int, command_timeout: Optional[float] = None):
     """
     Activate (focus) a specific tab
     
@@ -87,32 +193,44 @@ async def activate_tab(tab_id: int):
     response = await extension_service.send_command({
         "action": "activateTab",
         "tabId": tab_id
-    })
+    }, timeout=command_timeout)
     return response
 
 @router.post("/{tab_id}/reload")
-async def reload_tab(tab_id: int, bypass_cache: bool = False):
+async def reload_tab(
+    tab_id: int,
+    http_request: Request,
+    bypass_cache: bool = False,
+    wait_until: WaitUntil = "load",
+    wait_selector: Optional[str] = None,
+    wait_timeout: Optional[int] = None,
+    command_timeout: Optional[float] = None
+):
     """
     Reload a specific tab
     
     - **tab_id**: The ID of the tab to reload
     - **bypass_cache**: Whether to bypass the cache (default: false)
+    - **wait_until / wait_selector / wait_timeout**: As for navigate
     
-    Reloads the specified tab and waits for it to finish loading
+    Reloads the specified tab and waits until the chosen condition holds
     """
     response = await extension_service.send_command({
         "action": "reloadTab",
         "tabId": tab_id,
-        "bypassCache": bypass_cache
-    })
+        "bypassCache": bypass_cache,
+        **_wait_fields(wait_until, wait_selector, wait_timeout)
+    }, timeout=command_timeout, request=http_request)
     return response
 
 @router.get("/{tab_id}/content")
 async def get_tab_content(
     tab_id: int, 
+    http_request: Request,
     format: str = "html",
     method: str = "html2text",
-    clean: bool = True
+    clean: bool = True,
+    command_timeout: Optional[float] = None
 ):
     """
     Get the content of a specific tab
@@ -130,7 +248,7 @@ async def get_tab_content(
             "action": "getContent",
             "tabId": tab_id,
             "format": format
-        })
+        }, timeout=command_timeout, request=http_request)
         
         if not response.get("success"):
             raise HTTPException(status_code=500, detail="Failed to get content from extension")
@@ -139,43 +257,15 @@ async def get_tab_content(
         
         # If markdown is requested, convert using Python
         if format == "markdown":
-            from app.services.markdown_converter import markdown_converter
-            
-            html = content.get("bodyHtml") or content.get("html", "")
-            
-            if not html:
-                raise HTTPException(status_code=500, detail="No HTML content available")
-            
-            # Convert HTML to Markdown
-            conversion_result = markdown_converter.convert(
-                html=html,
-                method=method,
-                clean=clean
-            )
-            
-            if not conversion_result.get("success"):
-                raise HTTPException(
-                    status_code=500, 
-                    detail=f"Markdown conversion failed: {conversion_result.get('error')}"
-                )
+            try:
+                markdown_content = await convert_markdown_content(content, method=method, clean=clean)
+            except ContentConversionError as e:
+                raise HTTPException(status_code=500, detail=str(e))
             
             # Return markdown content with metadata
             return {
                 "success": True,
-                "content": {
-                    "format": "markdown",
-                    "markdown": conversion_result["markdown"],
-                    "html": html if format == "markdown" else None,
-                    "url": content.get("url"),
-                    "title": content.get("title"),
-                    "timestamp": content.get("timestamp"),
-                    "conversion": {
-                        "method": method,
-                        "length": conversion_result["length"],
-                        "lines": conversion_result["lines"],
-                        "metadata": conversion_result.get("metadata", {})
-                    }
-                }
+                "content": markdown_content
             }
         
         # Return HTML content as-is
@@ -186,8 +276,137 @@ async def get_tab_content(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get content: {str(e)}")
 
+@router.post("/{tab_id}/extract")
+async def extract_from_tab(
+    tab_id: int,
+    request: ExtractRequest,
+    http_request: Request,
+    command_timeout: Optional[float] = None
+):
+    """
+    Extract structured rows from a tab in a single round trip
+    
+    - **tab_id**: The ID of the tab
+    - **container**: Selector of the repeated item, e.g. `#search .g` (optional; omit for a single row)
+    - **fields**: Field name to spec; `"h3"`, `"a@href"`, or an object with
+      `selector`, `attribute`, `all`, `transforms`, `regex`, `default`
+    - **limit**: Maximum number of rows (optional)
+    - **format**: "objects" or "columns" (default: objects)
+    - **cache**: Use the (url, schema) result cache (default: true)
+    
+    ## Transforms:
+    trim, collapse (whitespace), lower, upper, number, integer, absolute_url
+    
+    The schema is evaluated in the page over every container match. Results
+    of fully loaded pages are cached by URL and schema hash until the tab
+    navigates, an interaction, workflow or harvest runs on it, or
+    EXTRACT_CACHE_TTL expires. Cached reads still respect tab leases and
+    circuit breakers.
+    """
+    schema = request.to_schema()
+    digest = schema_hash(schema)
+    
+    # Only trust the cache for a page the mirror knows has finished loading
+    tab_state = extension_service.tab_state
+    tab = tab_state.get(tab_id) if tab_state.is_fresh() else None
+    url = tab.get("url") if tab and tab.get("status") == "complete" else None
+    
+    command = {"action": "extract", "tabId": tab_id, "schema": schema}
+    cached = None
+    if request.cache:
+        if url:
+            # A cached read answers for the tab, so it must pass the same checks
+            await extension_service.admit(command)
+        cached = extraction_cache.get(url, digest)
+    if cached:
+        result, age = cached
+    else:
+        response = await extension_service.send_command(command, timeout=command_timeout, request=http_request)
+        result, age = response.get("result", {}), None
+        if request.cache and result.get("readyState") == "complete":
+            extraction_cache.put(result.get("url"), digest, result)
+    
+    rows = result.get("rows", [])
+    data = to_columns(rows, list(schema["fields"])) if request.format == "columns" else {"rows": rows}
+    
+    return {
+        "success": True,
+        "url": result.get("url"),
+        "title": result.get("title"),
+        "count": len(rows),
+        "matched": result.get("matched", len(rows)),
+        **data,
+        "schema_hash": digest,
+        "cached": cached is not None,
+        "age": round(age, 3) if age is not None else None,
+        "durationMs": result.get("durationMs")
+    }
+
+@router.post("/{tab_id}/harvest")
+async def harvest_tab(
+    tab_id: int,
+    request: HarvestRequest,
+    http_request: Request,
+    command_timeout: Optional[float] = None
+):
+    """
+    Harvest an infinite-scroll or paginated feed as a stream of new items
+    
+    - **tab_id**: The ID of the tab
+    - **item**: Selector of one feed item
+    - **fields**: Field specs as for /extract (default: the item's text)
+    - **key**: Field used to dedupe items (default: the whole row)
+    - **mode**: "scroll" or "next" (default: scroll)
+    - **next_selector**: Selector of the "next" button (required for mode next)
+    - **max_items / max_rounds / idle_rounds / time_budget**: Stop conditions
+    - **wait**: Milliseconds to wait for new items after each round (default: 1000)
+    
+    Runs in the extension: each round reads only items not seen before
+    (tracked in page memory), then scrolls or clicks next. The response is
+    NDJSON: one `{"type": "items"}` line per round with new items, then a
+    `{"type": "summary"}` line with the stop reason, or an `{"type": "error"}` line.
+    """
+    if request.mode == "next" and not request.next_selector:
+        raise HTTPException(status_code=422, detail="mode 'next' requires next_selector")
+    if request.key and request.key not in (request.fields or {"text": None}):
+        raise HTTPException(status_code=422, detail=f"key '{request.key}' is not one of the fields")
+    
+    stream = extension_service.stream_command({
+        "action": "harvest",
+        "tabId": tab_id,
+        "harvest": request.to_harvest()
+    }, timeout=command_timeout or request.time_budget + settings.ADAPTIVE_TIMEOUT_NAVIGATION_MIN, request=http_request)
+    
+    async def lines():
+        try:
+            async for data in stream:
+                yield json.dumps({"type": "items", **data}) + "\n"
+            
+            result = stream.result or {}
+            if result.get("items"):
+                # Extension answered without streaming
+                yield json.dumps({
+                    "type": "items", "round": result.get("rounds"),
+                    "items": result["items"], "total": result.get("total")
+                }) + "\n"
+            yield json.dumps({
+                "type": "summary",
+                "total": result.get("total", 0),
+                "rounds": result.get("rounds", 0),
+                "stopReason": result.get("stopReason"),
+                "durationMs": result.get("durationMs")
+            }) + "\n"
+        except HTTPException as e:
+            yield json.dumps({"type": "error", "error": str(e.detail)}) + "\n"
+    
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/{tab_id}/metadata")
-async def get_tab_metadata(tab_id: int):
+async def get_tab_metadata(tab_id: int, http_request: Request, command_timeout: Optional[float] = None):
     """
     Get metadata from a specific tab
     
@@ -199,7 +418,7 @@ async def get_tab_metadata(tab_id: int):
         response = await extension_service.send_command({
             "action": "getMetadata",
             "tabId": tab_id
-        })
+        }, timeout=command_timeout, request=http_request)
         return response
     except HTTPException:
         raise
@@ -207,7 +426,12 @@ async def get_tab_metadata(tab_id: int):
         raise HTTPException(status_code=500, detail=f"Failed to get metadata: {str(e)}")
 
 @router.post("/{tab_id}/interact", response_model=InteractionResponse)
-async def interact_with_tab(tab_id: int, request: InteractionRequest):
+async def interact_with_tab(
+    tab_id: int,
+    request: InteractionRequest,
+    http_request: Request,
+    command_timeout: Optional[float] = None
+):
     """
     Interact with elements in a specific tab
     
@@ -235,11 +459,47 @@ async def interact_with_tab(tab_id: int, request: InteractionRequest):
             "value": request.value,
             "timeout": request.timeout
         }
-    })
+    }, timeout=command_timeout, request=http_request)
+    return response
+
+@router.post("/{tab_id}/workflow")
+async def run_workflow(
+    tab_id: int,
+    request: WorkflowRequest,
+    http_request: Request,
+    command_timeout: Optional[float] = None
+):
+    """
+    Run a sequence of interactions in a single injected script
+    
+    - **tab_id**: The ID of the tab
+    - **steps**: Steps to run in order; each has an `action` plus `selector`, `value`, `timeout`, `name`, `optional`
+    - **stop_on_error**: Skip the remaining steps once a non-optional step fails (default: true)
+    
+    ## Supported Steps:
+    - **input / click / select / wait / waitForElement**: Same as the interact actions
+    - **getText / getAttribute**: Read from an element
+    - **extract**: Read `attribute` (text, html or an attribute name) from the first or `all` matches,
+      optionally as records built from `fields` (`{"title": "h3", "link": "a@href"}`)
+    - **if**: Run `then` when `selector` exists (or is missing with `exists: false`), `else` otherwise
+    
+    Steps with a `name` store their value in `outputs`. Every step reports
+    its duration; the result says whether the workflow `completed` and
+    which step failed. A click that navigates continues the remaining
+    steps in the new page once it has loaded.
+    """
+    # Leave room for a page load when a click may navigate mid-workflow
+    navigation_budget = settings.ADAPTIVE_TIMEOUT_NAVIGATION_MIN * 1000 if request.may_navigate() else 0
+    response = await extension_service.send_command({
+        "action": "runWorkflow",
+        "tabId": tab_id,
+        "workflow": request.to_workflow(),
+        "waitBudget": request.budget_ms() + navigation_budget
+    }, timeout=command_timeout, request=http_request)
     return response
 
 @router.delete("/{tab_id}")
-async def close_tab(tab_id: int):
+async def close_tab(tab_id: int, command_timeout: Optional[float] = None):
     """
     Close a specific tab
     
@@ -248,5 +508,5 @@ async def close_tab(tab_id: int):
     response = await extension_service.send_command({
         "action": "closeTab",
         "tabId": tab_id
-    })
+    }, timeout=command_timeout)
     return response
@@ -1,6 +1,7 @@
 """WebSocket route for extension communication"""
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
+from app.config import settings
 from app.services.extension import extension_service
 
 router = APIRouter()
@@ -9,6 +10,11 @@ router = APIRouter()
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for Chrome extension connection"""
     
+    if settings.SERVICE_ROLE == "worker":
+        # The gateway owns the extension; refusing makes it try the next URL
+        await websocket.close(code=1008)
+        return
+    
     await extension_service.connect(websocket)
     
     try:
@@ -23,7 +29,7 @@ async def websocket_endpoint(websocket: WebSocket):
             await extension_service.handle_message(data)
             
     except WebSocketDisconnect:
-        extension_service.disconnect()
+        extension_service.disconnect(websocket)
     except Exception as e:
         print(f"WebSocket error: {e}")
-        extension_service.disconnect()
+        extension_service.disconnect(websocket)
@@ -0,0 +1,233 @@
+"""Runs several extension commands in a single WebSocket round trip"""
+
+import asyncio
+import json
+import math
+from typing import Dict, Any, Optional, AsyncIterator
+from fastapi import HTTPException, Request
+from app.models import BatchRequest, BatchCommand
+from app.services.extension import extension_service
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.leases import current_claim
+from app.services.content import convert_markdown_content, ContentConversionError
+
+
+class _Entry:
+    """A sub-command that will be sent to the extension"""
+    
+    def __init__(self, index: int, item: BatchCommand, command: Dict[str, Any], domain: Optional[str], breakers: list):
+        self.index = index
+        self.item = item
+        self.command = command
+        self.domain = domain
+        self.breakers = breakers
+
+
+class BatchRunner:
+    """
+    Executes a BatchRequest as one `batch` command in the extension
+    
+    Sub-commands are validated up front and checked against their circuit
+    breakers when the batch starts running, inside the same try/finally
+    that settles them; those whose breaker is open fail without being sent. The
+    extension runs the rest sequentially or with bounded concurrency and
+    reports one result per sub-command, which is post-processed here
+    (markdown conversion, breaker bookkeeping) exactly like the single
+    command routes do.
+    """
+    
+    def __init__(self, batch: BatchRequest, request: Optional[Request] = None, timeout: Optional[float] = None):
+        self.batch = batch
+        self.request = request
+        self.timeout = timeout
+        self.results: Dict[int, Dict[str, Any]] = {}
+        self.entries: Dict[int, _Entry] = {}
+        self.error: Optional[str] = None
+        # Tabs the batch creates join the caller's lease
+        self.lease_token = (current_claim() or {}).get("token")
+        self.commands = self._validate()
+    
+    def _validate(self) -> list:
+        commands = []
+        for index, item in enumerate(self.batch.commands):
+            try:
+                commands.append((index, item, item.to_command()))
+            except ValueError as e:
+                raise HTTPException(status_code=422, detail=f"commands[{index}]: {e}")
+        return commands
+    
+    def _acquire(self):
+        """Take breaker slots for every sub-command; released again by `abandon`"""
+        stopped = False
+        for index, item, command in self.commands:
+            if stopped:
+                self.results[index] = self._skipped(index, item)
+                continue
+            
+            domain = extension_service.command_domain(command)
+            try:
+                breakers = extension_service.acquire_breakers(command, domain)
+            except CircuitOpenError as e:
+                self.results[index] = {
+                    "index": index,
+                    "action": item.action,
+                    "success": False,
+                    "error": e.detail,
+                    "circuit_breaker": e.key
+                }
+                stopped = self.batch.stop_on_error
+                continue
+            
+            self.entries[index] = _Entry(index, item, command, domain, breakers)
+    
+    def _skipped(self, index: int, item: BatchCommand) -> Dict[str, Any]:
+        return {"index": index, "action": item.action, "success": False, "skipped": True}
+    
+    def command_timeout(self) -> float:
+        """
+        Timeout for the whole batch
+        
+        The sum of the sub-command timeouts when sequential; in parallel mode
+        the slowest sub-command times the number of concurrency waves.
+        """
+        if self.timeout:
+            return self.timeout
+        
+        timeouts = [
+            extension_service.timeout_for(entry.command, entry.domain)
+            for entry in self.entries.values()
+        ]
+        if self.batch.mode == "sequential":
+            return sum(timeouts)
+        return max(timeouts) * math.ceil(len(timeouts) / self.batch.concurrency)
+    
+    def batch_command(self) -> Dict[str, Any]:
+        """The `batch` command message sent to the extension"""
+        return {
+            "action": "batch",
+            "mode": self.batch.mode,
+            "concurrency": self.batch.concurrency,
+            "stopOnError": self.batch.stop_on_error,
+            "commands": [
+                {**entry.command, "index": entry.index}
+                for entry in sorted(self.entries.values(), key=lambda entry: entry.index)
+            ]
+        }
+    
+    async def finish(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Turn one sub-command result from the extension into its API result"""
+        entry = self.entries.pop(data.get("index"), None)
+        if entry is None:
+            return None
+        
+        extension_service.settle_batch_result(entry.breakers, entry.item.action, data, self.lease_token)
+        if data.get("skipped"):
+            result = self._skipped(entry.index, entry.item)
+            self.results[entry.index] = result
+            return result
+        
+        payload = {key: value for key, value in data.items() if key not in ("index", "action", "success")}
+        success = bool(data.get("success"))
+        
+        if success and entry.item.action == "getContent" and entry.item.format == "markdown":
+            try:
+                payload["content"] = await convert_markdown_content(
+                    payload.get("content", {}), method=entry.item.method, clean=entry.item.clean
+                )
+            except ContentConversionError as e:
+                # Conversion happens here, not in the page - the tab itself was fine
+                payload = {"error": str(e)}
+                success = False
+        
+        result = {"index": entry.index, "action": entry.item.action, "success": success, **payload}
+        self.results[entry.index] = result
+        return result
+    
+    def abandon(self):
+        """Release breakers of sub-commands that never reported back"""
+        for entry in self.entries.values():
+            extension_service.settle_breakers(entry.breakers, entry.item.action, None)
+        self.entries = {}
+    
+    def summary(self) -> Dict[str, Any]:
+        """Counts over the results collected so far"""
+        results = list(self.results.values())
+        skipped = sum(1 for result in results if result.get("skipped"))
+        completed = sum(1 for result in results if result["success"])
+        failed = len(results) - completed - skipped
+        return {
+            "success": failed == 0,
+            "mode": self.batch.mode,
+            "completed": completed,
+            "failed": failed,
+            "skipped": skipped
+        }
+    
+    async def run(self) -> Dict[str, Any]:
+        """Run the batch and return every result at once"""
+        try:
+            self._acquire()
+            if self.entries:
+                response = await extension_service.send_command(
+                    self.batch_command(), timeout=self.command_timeout(), request=self.request
+                )
+                # Conversions of different results run in parallel workers
+                await asyncio.gather(*(self.finish(data) for data in response.get("results", [])))
+        finally:
+            self.abandon()
+        
+        return {
+            **self.summary(),
+            "results": [self.results[index] for index in sorted(self.results)]
+        }
+    
+    async def iter_results(self) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the batch and yield each result as it completes
+        
+        Results already known before sending (open breakers, skips) come
+        first, then one per sub-command in completion order. If the batch
+        as a whole fails, `error` is set and the sub-commands it cut off
+        are yielded as failed.
+        """
+        try:
+            self._acquire()
+            for index in sorted(self.results):
+                yield self.results[index]
+            
+            if self.entries:
+                stream = extension_service.stream_command(
+                    self.batch_command(), timeout=self.command_timeout(), request=self.request
+                )
+                async for data in stream:
+                    result = await self.finish(data)
+                    if result is not None:
+                        yield result
+                # Extensions without streaming support answer with all results at once
+                for data in (stream.result or {}).get("results", []):
+                    result = await self.finish(data)
+                    if result is not None:
+                        yield result
+        except HTTPException as e:
+            self.error = str(e.detail)
+            for index in sorted(self.entries):
+                result = {"index": index, "action": self.entries[index].item.action, "success": False, "error": self.error}
+                self.results[index] = result
+                yield result
+        finally:
+            self.abandon()
+    
+    async def stream(self) -> AsyncIterator[str]:
+        """
+        Run the batch and yield NDJSON lines as results complete
+        
+        One line per sub-command, then a final summary line. A batch-level
+        failure is reported as an error line before the summary instead of
+        an HTTP error status.
+        """
+        async for result in self.iter_results():
+            yield json.dumps({"type": "result", **result}) + "\n"
+        
+        if self.error is not None:
+            yield json.dumps({"type": "error", "error": self.error}) + "\n"
+        yield json.dumps({"type": "summary", **self.summary()}) + "\n"
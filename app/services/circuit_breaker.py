@@ -0,0 +1,179 @@
+"""Circuit breakers for extension commands"""
+
+import time
+from typing import Dict, Any, Optional, List, Callable
+from fastapi import HTTPException
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(HTTPException):
+    """Raised instead of sending a command to a target whose breaker is open"""
+    
+    def __init__(self, key: str, retry_after: float):
+        super().__init__(
+            status_code=503,
+            detail=f"Circuit breaker open for {key}; failing fast. Retry in {round(retry_after, 1)} seconds.",
+            headers={
+                "Retry-After": str(max(1, int(retry_after))),
+                "X-Circuit-Breaker": key
+            }
+        )
+        self.key = key
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker
+    
+    Opens after `failure_threshold` consecutive failures, rejects calls for
+    `recovery_timeout` seconds, then lets up to `half_open_probes` calls
+    through. A successful probe closes the breaker, a failed one re-opens it.
+    """
+    
+    def __init__(
+        self,
+        key: str,
+        failure_threshold: int,
+        recovery_timeout: float,
+        half_open_probes: int,
+        on_change: Optional[Callable[["CircuitBreaker"], None]] = None
+    ):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_probes = half_open_probes
+        
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probes_in_flight = 0
+        self.last_failure: Optional[str] = None
+        self.rejected = 0
+        self.on_change = on_change
+    
+    def _set_state(self, state: str):
+        changed = state != self.state
+        self.state = state
+        if changed and self.on_change:
+            self.on_change(self)
+    
+    def retry_after(self) -> float:
+        """Seconds until the breaker half-opens"""
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (time.time() - self.opened_at))
+    
+    def allow(self) -> bool:
+        """Whether a call may proceed; reserves a probe slot when half-open"""
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                return False
+            self.probes_in_flight = 0
+            self._set_state(HALF_OPEN)
+        
+        if self.state == HALF_OPEN:
+            if self.probes_in_flight >= self.half_open_probes:
+                return False
+            self.probes_in_flight += 1
+        
+        return True
+    
+    def record_success(self):
+        """Call finished normally"""
+        self.failures = 0
+        self.opened_at = None
+        self.probes_in_flight = 0
+        self._set_state(CLOSED)
+    
+    def record_failure(self, reason: str):
+        """Call timed out or failed"""
+        self.failures += 1
+        self.last_failure = reason
+        
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_at = time.time()
+            self.probes_in_flight = 0
+            self._set_state(OPEN)
+    
+    def release_probe(self):
+        """A half-open probe ended without a verdict (e.g. caller error)"""
+        if self.state == HALF_OPEN and self.probes_in_flight > 0:
+            self.probes_in_flight -= 1
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Breaker state for /health and the admin endpoint"""
+        return {
+            "key": self.key,
+            "state": self.state,
+            "failures": self.failures,
+            "retry_after": round(self.retry_after(), 3) if self.state == OPEN else None,
+            "last_failure": self.last_failure,
+            "rejected": self.rejected
+        }
+
+
+class BreakerRegistry:
+    """Breakers keyed by target, e.g. domain:example.com or tab:123"""
+    
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0, half_open_probes: int = 1):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_probes = half_open_probes
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        # Called with a breaker whenever it opens, half-opens, closes or is reset
+        self.listeners: List[Callable[[CircuitBreaker], None]] = []
+    
+    def _changed(self, breaker: CircuitBreaker):
+        for listener in self.listeners:
+            listener(breaker)
+    
+    def get(self, key: str) -> CircuitBreaker:
+        """Get or create the breaker for a key"""
+        if key not in self.breakers:
+            self.breakers[key] = CircuitBreaker(
+                key, self.failure_threshold, self.recovery_timeout, self.half_open_probes, self._changed
+            )
+        return self.breakers[key]
+    
+    def acquire(self, keys: List[str]) -> List[CircuitBreaker]:
+        """
+        Check every breaker guarding a call
+        
+        Raises CircuitOpenError for the first open breaker; probe slots taken
+        on breakers checked before it are released again.
+        """
+        acquired = []
+        for key in keys:
+            breaker = self.get(key)
+            if not breaker.allow():
+                breaker.rejected += 1
+                for taken in acquired:
+                    taken.release_probe()
+                raise CircuitOpenError(key, breaker.retry_after())
+            acquired.append(breaker)
+        return acquired
+    
+    def reset(self, key: Optional[str] = None) -> int:
+        """Close one breaker or all of them; returns how many were reset"""
+        if key is not None:
+            reset = [self.breakers.pop(key)] if key in self.breakers else []
+        else:
+            reset = list(self.breakers.values())
+            self.breakers.clear()
+        for breaker in reset:
+            breaker._set_state(CLOSED)
+        return len(reset)
+    
+    def forget_tab(self, tab_id: int):
+        """Drop the breaker of a closed tab"""
+        self.breakers.pop(f"tab:{tab_id}", None)
+    
+    def snapshot(self, include_closed: bool = True) -> List[Dict[str, Any]]:
+        """All breakers, optionally only the tripped ones"""
+        return [
+            breaker.snapshot() for key, breaker in sorted(self.breakers.items())
+            if include_closed or breaker.state != CLOSED
+        ]
@@ -0,0 +1,86 @@
+"""Shapes extension page content into API responses"""
+
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional
+from app.config import settings
+from app.services.markdown_converter import markdown_converter
+
+# Conversion worker processes, created on first use
+_conversion_pool: Optional[ProcessPoolExecutor] = None
+
+
+class ContentConversionError(Exception):
+    """Raised when extracted page content cannot be converted"""
+    pass
+
+
+def to_markdown_content(content: Dict[str, Any], method: str = "html2text", clean: bool = True) -> Dict[str, Any]:
+    """
+    Convert the HTML captured by the extension's getContent into the
+    markdown content payload returned by the API
+    """
+    html = content.get("bodyHtml") or content.get("html", "")
+    
+    if not html:
+        raise ContentConversionError("No HTML content available")
+    
+    # Convert HTML to Markdown
+    conversion_result = markdown_converter.convert(
+        html=html,
+        method=method,
+        clean=clean
+    )
+    
+    if not conversion_result.get("success"):
+        raise ContentConversionError(f"Markdown conversion failed: {conversion_result.get('error')}")
+    
+    return {
+        "format": "markdown",
+        "markdown": conversion_result["markdown"],
+        "html": html,
+        "url": content.get("url"),
+        "title": content.get("title"),
+        "timestamp": content.get("timestamp"),
+        "conversion": {
+            "method": method,
+            "length": conversion_result["length"],
+            "lines": conversion_result["lines"],
+            "metadata": conversion_result.get("metadata", {})
+        }
+    }
+
+
+def _get_conversion_pool() -> Optional[ProcessPoolExecutor]:
+    """Conversion worker processes, or None for the default thread pool"""
+    global _conversion_pool
+    if _conversion_pool is None and settings.CONVERSION_WORKERS > 0:
+        _conversion_pool = ProcessPoolExecutor(max_workers=settings.CONVERSION_WORKERS)
+    return _conversion_pool
+
+
+async def convert_markdown_content(content: Dict[str, Any], method: str = "html2text", clean: bool = True) -> Dict[str, Any]:
+    """
+    Run to_markdown_content in a conversion worker
+    
+    Parsing and converting a large page takes tens to hundreds of
+    milliseconds of pure CPU; doing it off the event loop keeps other
+    requests and the extension WebSocket responsive.
+    """
+    # Only ship what the conversion needs across the process boundary
+    page = {
+        "bodyHtml": content.get("bodyHtml") or content.get("html", ""),
+        "url": content.get("url"),
+        "title": content.get("title"),
+        "timestamp": content.get("timestamp")
+    }
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_conversion_pool(), to_markdown_content, page, method, clean)
+
+
+def shutdown_conversion_pool():
+    """Stop the conversion worker processes"""
+    global _conversion_pool
+    if _conversion_pool is not None:
+        _conversion_pool.shutdown(cancel_futures=True)
+        _conversion_pool = None
@@ -0,0 +1,136 @@
+"""Event fan-out for API clients"""
+
+import asyncio
+import time
+from typing import Dict, Any, Optional, Set, Iterable, AsyncIterator
+from app.config import settings
+
+
+class Subscriber:
+    """A single event stream consumer with its own filter and bounded buffer"""
+    
+    def __init__(
+        self,
+        types: Optional[Iterable[str]] = None,
+        tab_ids: Optional[Iterable[int]] = None,
+        max_queue: Optional[int] = None
+    ):
+        self.types: Set[str] = set(types or [])
+        self.tab_ids: Set[int] = set(tab_ids or [])
+        size = min(max_queue or settings.EVENT_BUFFER_SIZE, settings.EVENT_BUFFER_MAX)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(2, size))
+        self.dropped = False
+        self.delivered = 0
+    
+    def matches(self, event: Dict[str, Any]) -> bool:
+        """
+        Check an event against this subscriber's filter
+        
+        A type filter matches exactly ("tab.updated") or by category ("tab").
+        """
+        if self.types:
+            event_type = event["type"]
+            if event_type not in self.types and event_type.split(".", 1)[0] not in self.types:
+                return False
+        if self.tab_ids and event.get("tabId") not in self.tab_ids:
+            return False
+        return True
+
+
+class EventBus:
+    """
+    Fans out extension-sourced events to API subscribers
+    
+    Publishing never blocks: a subscriber whose buffer is full is dropped
+    and receives a final `stream.dropped` event instead of slowing down
+    everybody else.
+    """
+    
+    def __init__(self):
+        self.subscribers: Set[Subscriber] = set()
+        self.published = 0
+        self.dropped_subscribers = 0
+    
+    def subscribe(
+        self,
+        types: Optional[Iterable[str]] = None,
+        tab_ids: Optional[Iterable[int]] = None,
+        max_queue: Optional[int] = None
+    ) -> Subscriber:
+        """Register a new subscriber"""
+        subscriber = Subscriber(types, tab_ids, max_queue)
+        self.subscribers.add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, subscriber: Subscriber):
+        """Remove a subscriber"""
+        self.subscribers.discard(subscriber)
+    
+    def publish(self, event_type: str, tab_id: Optional[int] = None, data: Optional[Dict[str, Any]] = None):
+        """Publish an event to every matching subscriber"""
+        event = {
+            "type": event_type,
+            "tabId": tab_id,
+            "timestamp": time.time(),
+            "data": data or {}
+        }
+        self.published += 1
+        
+        for subscriber in list(self.subscribers):
+            if not subscriber.matches(event):
+                continue
+            try:
+                subscriber.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscriber)
+    
+    def _drop(self, subscriber: Subscriber):
+        """Disconnect a slow consumer without blocking the publisher"""
+        self.unsubscribe(subscriber)
+        self.dropped_subscribers += 1
+        subscriber.dropped = True
+        
+        # Discard the backlog to make room for the final notice and end marker
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait({
+            "type": "stream.dropped",
+            "tabId": None,
+            "timestamp": time.time(),
+            "data": {"reason": "Subscriber buffer full - consumer too slow"}
+        })
+        subscriber.queue.put_nowait(None)
+    
+    async def listen(self, subscriber: Subscriber, keepalive: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield events for a subscriber until it is dropped
+        
+        Yields None every `keepalive` seconds without traffic so transports
+        can send a heartbeat.
+        """
+        try:
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscriber.queue.get(), timeout=keepalive)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                
+                if event is None:
+                    return
+                subscriber.delivered += 1
+                yield event
+        finally:
+            self.unsubscribe(subscriber)
+    
+    def stats(self) -> Dict[str, Any]:
+        """Subscriber counts for /health"""
+        return {
+            "subscribers": len(self.subscribers),
+            "published": self.published,
+            "dropped_subscribers": self.dropped_subscribers
+        }
+
+
+# Global event bus
+event_bus = EventBus()
@@ -1,10 +1,86 @@
 """Extension communication service"""
 
 import asyncio
+import time
 import uuid
-from typing import Dict, Any, Optional
-from fastapi import WebSocket, HTTPException
+from typing import Dict, Any, Optional, List, Callable
+from urllib.parse import urlparse
+from fastapi import WebSocket, HTTPException, Request
 from app.config import settings
+from app.services.tab_state import TabState
+from app.services.events import event_bus
+from app.services.metrics import RollingHistogram, LatencyTracker
+from app.services.circuit_breaker import BreakerRegistry
+from app.services.leases import LeaseRegistry, current_claim
+from app.services.tab_pool import TabPool
+from app.services.extraction import extraction_cache
+
+# Read-only commands that are safe to run twice, so they can be replayed
+# to a new connection after the extension's service worker restarts
+IDEMPOTENT_ACTIONS = {"getTabs", "getActiveTab", "syncTabs", "getContent", "getMetadata", "extract"}
+
+# Actions that wait for a page load and need a higher timeout floor
+NAVIGATION_ACTIONS = {"createTab", "navigateTab", "reloadTab"}
+
+# Commands guarded by per-domain and per-tab circuit breakers. Extension
+# errors only count as failures for page loads and content reads; an
+# interaction or workflow error such as "Element not found" means the page
+# is responsive.
+BREAKER_ACTIONS = NAVIGATION_ACTIONS | {"getContent", "getMetadata", "extract", "harvest", "interact", "runWorkflow"}
+BREAKER_ERROR_ACTIONS = NAVIGATION_ACTIONS | {"getContent", "getMetadata", "extract"}
+
+# Commands that can change a page without navigating it, so cached
+# extractions of that page are stale once they have run
+MUTATING_ACTIONS = {"interact", "runWorkflow", "harvest"}
+
+
+class CommandStream:
+    """
+    A command whose partial results the extension streams back
+    
+    Iterate to receive each `{"type": "stream"}` payload as it arrives; once
+    iteration ends, `result` holds the command's final response.
+    """
+    
+    def __init__(self, service: "ExtensionService", command: Dict[str, Any], timeout: Optional[float], request: Optional[Request]):
+        self.service = service
+        self.command = command
+        self.timeout = timeout
+        self.request = request
+        self.result: Optional[Dict[str, Any]] = None
+    
+    async def __aiter__(self):
+        request_id = str(uuid.uuid4())
+        self.command['requestId'] = request_id
+        self.command['stream'] = True
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        self.service.stream_queues[request_id] = queue
+        task = asyncio.ensure_future(
+            self.service.send_command(self.command, timeout=self.timeout, request=self.request)
+        )
+        
+        try:
+            while True:
+                getter = asyncio.ensure_future(queue.get())
+                done, _ = await asyncio.wait({getter, task}, return_when=asyncio.FIRST_COMPLETED)
+                if getter in done:
+                    yield getter.result()
+                    continue
+                
+                getter.cancel()
+                # Final response arrived - flush items that came in just before it
+                while not queue.empty():
+                    yield queue.get_nowait()
+                self.result = task.result()
+                return
+        finally:
+            self.service.stream_queues.pop(request_id, None)
+            if not task.done():
+                # Consumer went away (e.g. streaming client disconnected)
+                task.cancel()
+                asyncio.ensure_future(self.service.cancel_command(request_id, self.service.command_tabs(self.command)))
+
 
 class ExtensionService:
     """Manages communication with Chrome extension"""
@@ -12,30 +88,368 @@ class ExtensionService:
     def __init__(self):
         self.websocket: Optional[WebSocket] = None
         self.pending_requests: Dict[str, asyncio.Future] = {}
+        self.pending_commands: Dict[str, Dict[str, Any]] = {}
+        # When a held command was re-sent; its deadline runs from there
+        self.replayed_at: Dict[str, float] = {}
+        self.stream_queues: Dict[str, asyncio.Queue] = {}
+        self.tab_state = TabState()
+        self.disconnected_at: Optional[float] = None
+        self.replayed_commands = 0
+        self.cancelled_commands = 0
+        self._connected = asyncio.Event()
+        self._resync_task: Optional[asyncio.Task] = None
+        self._grace_task: Optional[asyncio.Task] = None
+        
+        # Server-driven heartbeat
+        self.rtt = RollingHistogram(max_samples=settings.WS_RTT_WINDOW)
+        self.missed_heartbeats = 0
+        self.last_pong_at: Optional[float] = None
+        self._heartbeat_seq = 0
+        self._pong_waiters: Dict[int, asyncio.Future] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        # Missed pings only count once the extension has shown it answers them
+        # (a pong, or "heartbeat" in its hello); older builds never do
+        self.heartbeat_confirmed = False
+        self.extension_capabilities: List[str] = []
+        
+        # Adaptive command timeouts
+        self.latency = LatencyTracker(
+            default=settings.EXTENSION_RESPONSE_TIMEOUT,
+            multiplier=settings.ADAPTIVE_TIMEOUT_MULTIPLIER,
+            floor=settings.ADAPTIVE_TIMEOUT_MIN,
+            ceiling=settings.ADAPTIVE_TIMEOUT_MAX,
+            min_samples=settings.ADAPTIVE_TIMEOUT_MIN_SAMPLES,
+            action_floors={action: settings.ADAPTIVE_TIMEOUT_NAVIGATION_MIN for action in NAVIGATION_ACTIONS}
+        )
+        
+        self._create_owned_state()
+        
+        # Called with every pushed extension message and connection change
+        # (used by the gateway to fan state out to HTTP workers)
+        self.listeners: List[Callable[[Dict[str, Any]], None]] = []
+    
+    def _create_owned_state(self):
+        """Breakers, leases and the tab pool - kept only by the process that holds the extension"""
+        # Per-domain / per-tab circuit breakers
+        self.breakers = BreakerRegistry(
+            failure_threshold=settings.CIRCUIT_BREAKER_FAILURES,
+            recovery_timeout=settings.CIRCUIT_BREAKER_RECOVERY,
+            half_open_probes=settings.CIRCUIT_BREAKER_PROBES
+        )
+        
+        # Tab leases for clients sharing the browser
+        self.leases = LeaseRegistry(default_ttl=settings.LEASE_DEFAULT_TTL, max_ttl=settings.LEASE_MAX_TTL)
+        self._reaper_task: Optional[asyncio.Task] = None
+        
+        # Warm worker tabs reused across jobs
+        self.pool = TabPool(
+            self,
+            size=settings.TAB_POOL_SIZE,
+            min_idle=settings.TAB_POOL_MIN_IDLE,
+            idle_timeout=settings.TAB_POOL_IDLE_TIMEOUT,
+            checkout_timeout=settings.TAB_POOL_CHECKOUT_TIMEOUT,
+            use_window=settings.TAB_POOL_WINDOW,
+            clear_storage=settings.TAB_POOL_CLEAR_STORAGE
+        )
+    
+    async def start(self):
+        """Background work started with the app (lease reaper, tab pool upkeep)"""
+        self._reaper_task = asyncio.create_task(self._reap_leases())
+        self.pool.start()
+    
+    async def stop(self):
+        """Background work stopped with the app"""
+        if self._reaper_task:
+            self._reaper_task.cancel()
+            self._reaper_task = None
+        self.pool.stop()
+    
+    async def _reap_leases(self):
+        """Expire idle leases and close the tabs they opened"""
+        while True:
+            await asyncio.sleep(settings.LEASE_REAP_INTERVAL)
+            self.leases.expire()
+            await self._close_tabs(self.leases.take_orphans())
+    
+    async def _close_tabs(self, tab_ids: List[int]):
+        """Close tabs a lease opened; tabs the user closed already are fine"""
+        if not tab_ids or not self.is_connected():
+            return
+        await asyncio.gather(
+            *(self.send_command({"action": "closeTab", "tabId": tab_id}) for tab_id in tab_ids),
+            return_exceptions=True
+        )
+    
+    def _notify(self, message: Dict[str, Any]):
+        for listener in list(self.listeners):
+            try:
+                listener(message)
+            except Exception as e:
+                print(f"Listener failed for {message.get('type')}: {e}")
     
     def is_connected(self) -> bool:
         """Check if extension is connected"""
         return self.websocket is not None
     
+    def is_alive(self) -> bool:
+        """Connected and answering heartbeats"""
+        return self.is_connected() and self.missed_heartbeats == 0
+    
+    def liveness(self) -> Dict[str, Any]:
+        """Heartbeat state and round-trip times for /health"""
+        return {
+            "alive": self.is_alive(),
+            "missed_heartbeats": self.missed_heartbeats,
+            "heartbeat_confirmed": self.heartbeat_confirmed,
+            "last_pong_age": round(time.time() - self.last_pong_at, 3) if self.last_pong_at else None,
+            "rtt": self.rtt.snapshot()
+        }
+    
+    def in_grace_window(self) -> bool:
+        """Whether a lost connection may still come back before commands are failed"""
+        return (
+            self.websocket is None
+            and self.disconnected_at is not None
+            and time.time() - self.disconnected_at < settings.EXTENSION_RECONNECT_GRACE
+        )
+    
     async def connect(self, websocket: WebSocket):
         """Connect extension via WebSocket"""
         await websocket.accept()
         self.websocket = websocket
+        self.disconnected_at = None
+        self._connected.set()
         print("✓ Chrome extension connected")
+        
+        if self._grace_task and not self._grace_task.done():
+            self._grace_task.cancel()
+        
+        # Replay idempotent commands held since the previous connection dropped.
+        # The old socket's disconnect may not have run yet, so anything else
+        # still pending was sent there and may have run: fail it, never resend it.
+        replay = []
+        for request_id, command in list(self.pending_commands.items()):
+            future = self.pending_requests.get(request_id)
+            if not future or future.done():
+                continue
+            if command.get('action') not in IDEMPOTENT_ACTIONS:
+                self._fail(request_id, self._lost_error(
+                    "Extension reconnected while the command was in flight; it may not have completed."
+                ))
+                continue
+            # Stamped before the first await so waiters woken by the reconnect see it
+            self.replayed_at[request_id] = time.perf_counter()
+            replay.append(command)
+        for command in replay:
+            await websocket.send_json(command)
+        if replay:
+            self.replayed_commands += len(replay)
+            print(f"↻ Replayed {len(replay)} in-flight command(s) after reconnect")
+        
+        # Rebuild the tab mirror from a fresh snapshot
+        self.tab_state.mark_connected()
+        self._resync_task = asyncio.create_task(self.resync_tabs())
+        
+        self.missed_heartbeats = 0
+        self.heartbeat_confirmed = False
+        self.extension_capabilities = []
+        self._heartbeat_task = asyncio.create_task(self._heartbeat(websocket))
+        self._notify({"type": "connection", "connected": True})
     
-    def disconnect(self):
-        """Disconnect extension"""
+    def disconnect(self, websocket: Optional[WebSocket] = None):
+        """
+        Disconnect extension
+        
+        In-flight idempotent commands are held for EXTENSION_RECONNECT_GRACE
+        seconds and replayed if the extension comes back; everything else
+        fails immediately with a non-retryable 502, since it may have run.
+        """
+        if websocket is not None and websocket is not self.websocket:
+            # A newer connection already replaced this one
+            return
+        
         self.websocket = None
+        self.disconnected_at = time.time()
+        self._connected.clear()
+        self.tab_state.mark_disconnected()
         print("✗ Chrome extension disconnected")
+        self._notify({"type": "connection", "connected": False})
         
-        # Cancel all pending requests
-        for future in self.pending_requests.values():
-            if not future.done():
-                future.cancel()
-        self.pending_requests.clear()
+        if self._resync_task and not self._resync_task.done():
+            self._resync_task.cancel()
+        if self._heartbeat_task and self._heartbeat_task is not asyncio.current_task():
+            self._heartbeat_task.cancel()
+        
+        for request_id, command in list(self.pending_commands.items()):
+            if command.get('action') in IDEMPOTENT_ACTIONS:
+                continue
+            self._fail(request_id, self._lost_error(
+                "Extension connection lost while the command was in flight; it may not have completed."
+            ))
+        
+        if self.pending_commands:
+            self._grace_task = asyncio.create_task(self._expire_grace())
+    
+    async def _heartbeat(self, websocket: WebSocket):
+        """
+        Ping the extension every WS_HEARTBEAT_INTERVAL seconds
+        
+        Round-trip times go into `self.rtt`. After WS_MAX_MISSED_HEARTBEATS
+        unanswered pings the connection is treated as dead and closed, so a
+        half-open socket does not look healthy until a command times out.
+        Until the extension has answered a ping or announced the "heartbeat"
+        capability, misses are ignored: builds that predate server pings
+        never answer them and must not be dropped for it.
+        """
+        warned = False
+        while self.websocket is websocket:
+            await asyncio.sleep(settings.WS_HEARTBEAT_INTERVAL)
+            if self.websocket is not websocket:
+                return
+            
+            if await self._ping(websocket):
+                self.missed_heartbeats = 0
+                continue
+            
+            if not self.heartbeat_confirmed:
+                if not warned:
+                    print("⚠ Extension does not answer heartbeats (built before server pings?) - liveness not enforced")
+                    warned = True
+                continue
+            
+            self.missed_heartbeats += 1
+            if self.missed_heartbeats >= settings.WS_MAX_MISSED_HEARTBEATS:
+                print(f"✗ Extension missed {self.missed_heartbeats} heartbeats - closing connection")
+                self.disconnect(websocket)
+                try:
+                    await asyncio.wait_for(websocket.close(code=1011), timeout=settings.WS_TIMEOUT)
+                except Exception:
+                    pass
+                return
+    
+    async def _ping(self, websocket: WebSocket) -> bool:
+        """Send one heartbeat and wait up to WS_TIMEOUT for the pong"""
+        self._heartbeat_seq += 1
+        heartbeat_id = self._heartbeat_seq
+        waiter = asyncio.get_running_loop().create_future()
+        self._pong_waiters[heartbeat_id] = waiter
+        
+        sent_at = time.perf_counter()
+        try:
+            await websocket.send_json({"type": "ping", "id": heartbeat_id})
+            await asyncio.wait_for(waiter, timeout=settings.WS_TIMEOUT)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return False
+        finally:
+            self._pong_waiters.pop(heartbeat_id, None)
+        
+        self.rtt.observe(time.perf_counter() - sent_at)
+        self.last_pong_at = time.time()
+        return True
+    
+    async def _expire_grace(self):
+        """Fail held commands if the extension does not come back in time"""
+        await asyncio.sleep(settings.EXTENSION_RECONNECT_GRACE)
+        if self.is_connected():
+            return
+        for request_id in list(self.pending_commands):
+            self._fail(request_id, self._retryable_error(
+                f"Extension did not reconnect within {settings.EXTENSION_RECONNECT_GRACE} seconds"
+            ))
+    
+    def _fail(self, request_id: str, error: Exception):
+        """Resolve a pending request with an error"""
+        self.pending_commands.pop(request_id, None)
+        future = self.pending_requests.pop(request_id, None)
+        if future and not future.done():
+            future.set_exception(error)
+    
+    def _retryable_error(self, message: str) -> HTTPException:
+        """503 that tells clients the command was never sent and is safe to retry"""
+        return HTTPException(
+            status_code=503,
+            detail=message,
+            headers={
+                "Retry-After": str(max(1, int(settings.EXTENSION_RECONNECT_GRACE))),
+                "X-Retryable": "true"
+            }
+        )
+    
+    def _lost_error(self, message: str) -> HTTPException:
+        """502 for a command that may already have run; retrying could repeat it"""
+        return HTTPException(status_code=502, detail=message, headers={"X-Retryable": "false"})
+    
+    async def resync_tabs(self):
+        """Request a full tab snapshot from the extension"""
+        try:
+            response = await self.send_command({"action": "syncTabs"})
+            self.tab_state.apply_snapshot(
+                response.get("tabs", []),
+                focused_window_id=response.get("focusedWindowId"),
+                seq=response.get("seq", 0)
+            )
+            self._notify({"type": "tabSnapshot", **self.tab_snapshot()})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Tab resync failed: {e}")
+            self.tab_state.abort_sync()
+    
+    def tab_snapshot(self) -> Dict[str, Any]:
+        """The mirrored tab table, for handing to another process"""
+        return {
+            "tabs": list(self.tab_state.tabs.values()),
+            "focusedWindowId": self.tab_state.focused_window_id,
+            "synced": self.tab_state.synced
+        }
+    
+    def forget_tab(self, tab_id: Optional[int]):
+        """Drop a closed tab's breaker, lease hold and pool slot"""
+        self.breakers.forget_tab(tab_id)
+        self.leases.forget_tab(tab_id)
+        self.pool.forget(tab_id)
     
     async def handle_message(self, data: Dict[str, Any]):
         """Handle incoming message from extension"""
+        message_type = data.get('type')
+        
+        if message_type == 'tabEvent':
+            self.tab_state.apply_event(data)
+            if data.get('event') == 'removed':
+                self.forget_tab(data.get('tabId'))
+            self._publish_event(data, "window" if data.get('event') == 'focusChanged' else "tab")
+            self._notify(data)
+            return
+        
+        if message_type == 'navEvent':
+            if data.get('event') == 'committed':
+                extraction_cache.invalidate_url(data.get('url'))
+            self._publish_event(data, "navigation")
+            self._notify(data)
+            return
+        
+        if message_type == 'stream':
+            queue = self.stream_queues.get(data.get('requestId'))
+            if queue is not None:
+                queue.put_nowait(data.get('data'))
+            return
+        
+        if message_type == 'pong':
+            waiter = self._pong_waiters.get(data.get('id'))
+            if waiter and not waiter.done():
+                self.heartbeat_confirmed = True
+                waiter.set_result(True)
+            return
+        
+        if message_type == 'hello':
+            self.extension_capabilities = list(data.get('capabilities') or [])
+            if 'heartbeat' in self.extension_capabilities:
+                self.heartbeat_confirmed = True
+            print(f"✓ Extension {data.get('version', 'unknown')} capabilities: {', '.join(self.extension_capabilities) or 'none'}")
+            return
+        
         request_id = data.get('requestId')
         
         if request_id and request_id in self.pending_requests:
@@ -43,45 +457,359 @@ class ExtensionService:
             if not future.done():
                 future.set_result(data)
     
+    def _publish_event(self, data: Dict[str, Any], category: str):
+        """Forward an extension event to API subscribers"""
+        payload = {
+            key: value for key, value in data.items()
+            if key not in ('type', 'event', 'tabId', 'seq')
+        }
+        event_bus.publish(f"{category}.{data.get('event')}", data.get('tabId'), payload)
+    
+    def command_domain(self, command: Dict[str, Any]) -> Optional[str]:
+        """Target domain of a command, from its URL or the mirrored tab"""
+        url = command.get('url')
+        if not url and command.get('tabId') is not None:
+            tab = self.tab_state.get(command['tabId'])
+            url = tab.get('url') if tab else None
+        return urlparse(url).hostname if url else None
+    
+    def timeout_for(self, command: Dict[str, Any], domain: Optional[str] = None) -> float:
+        """
+        Timeout for a command, derived from observed latency
+        
+        Commands that carry their own in-page wait (interaction timeouts, a
+        workflow's wait budget or an explicit navigation wait timeout, in
+        milliseconds) never get a timeout shorter than that wait.
+        """
+        if not settings.ADAPTIVE_TIMEOUTS:
+            return settings.EXTENSION_RESPONSE_TIMEOUT
+        
+        in_page_wait = (
+            (command.get('interaction') or {}).get('timeout')
+            or command.get('waitBudget')
+            or command.get('waitTimeout')
+            or 0
+        )
+        floor = in_page_wait / 1000 + settings.ADAPTIVE_TIMEOUT_MIN
+        return self.latency.timeout_for(command.get('action'), domain, floor=floor)
+    
     async def send_command(
         self, 
         command: Dict[str, Any], 
-        timeout: Optional[int] = None
+        timeout: Optional[float] = None,
+        request: Optional[Request] = None
     ) -> Dict[str, Any]:
-        """Send command to extension and wait for response"""
+        """
+        Send command to extension and wait for response
+        
+        `timeout` overrides the adaptive per-action, per-domain timeout.
+        Commands against a domain or tab whose circuit breaker is open fail
+        fast with CircuitOpenError. When `request` is given and its client
+        disconnects, the command is abandoned and cancelled in the extension.
+        """
+        
+        # Lease token and wait budget travel in the command when forwarded by a worker
+        claim = command.pop('lease', None) or current_claim() or {}
+        token, wait = claim.get('token'), claim.get('wait')
+        await self.leases.claim(self.command_tabs(command), token, settings.LEASE_WAIT if wait is None else wait)
+        
+        # Closing a tab checked out from the pool returns it instead
+        if command.get('action') == 'closeTab' and command.get('tabId') in self.pool.checked_out:
+            return {"success": True, "pooled": True, **await self.pool.checkin(command['tabId'])}
         
         if not self.is_connected():
-            raise HTTPException(
-                status_code=503, 
-                detail="Chrome extension not connected. Please ensure the extension is installed and running."
-            )
+            await self._wait_for_reconnect(command)
         
-        request_id = str(uuid.uuid4())
+        action = command.get('action')
+        domain = self.command_domain(command)
+        breakers = self.acquire_breakers(command, domain)
+        
+        try:
+            response = await self._send_cancellable(command, action, domain, timeout, request)
+        except HTTPException as e:
+            self.settle_breakers(breakers, action, e.status_code, str(e.detail))
+            raise
+        except BaseException:
+            self.settle_breakers(breakers, action, None)
+            raise
+        finally:
+            self.invalidate_extractions(command)
+        
+        self.settle_breakers(breakers, action, 200)
+        if token and action == 'createTab' and response.get('tab', {}).get('id') is not None:
+            self.leases.adopt(token, response['tab']['id'])
+        return response
+    
+    async def admit(self, command: Dict[str, Any]):
+        """
+        Lease and breaker checks for a command answered without the extension
+        
+        Claims the command's tabs for the current lease holder and fails
+        fast on open breakers, exactly as send_command would.
+        """
+        claim = current_claim() or {}
+        token, wait = claim.get('token'), claim.get('wait')
+        await self.leases.claim(self.command_tabs(command), token, settings.LEASE_WAIT if wait is None else wait)
+        for breaker in self.acquire_breakers(command, self.command_domain(command)):
+            breaker.release_probe()
+    
+    def invalidate_extractions(self, command: Dict[str, Any]):
+        """Drop cached extractions of the pages a mutating command ran on"""
+        for item in [command, *command.get('commands', [])]:
+            if item.get('action') in MUTATING_ACTIONS and item.get('tabId') is not None:
+                tab = self.tab_state.get(item['tabId'])
+                if tab:
+                    extraction_cache.invalidate_url(tab.get('url'))
+    
+    def command_tabs(self, command: Dict[str, Any]) -> List[int]:
+        """Tabs a command acts on, including every sub-command of a batch"""
+        commands = [command, *command.get('commands', [])]
+        return [item['tabId'] for item in commands if item.get('tabId') is not None]
+    
+    def breaker_keys(self, command: Dict[str, Any], domain: Optional[str] = None) -> List[str]:
+        """Keys of the breakers guarding a command"""
+        if not settings.CIRCUIT_BREAKER_ENABLED or command.get('action') not in BREAKER_ACTIONS:
+            return []
+        
+        keys = []
+        if domain:
+            keys.append(f"domain:{domain}")
+        if command.get('tabId') is not None:
+            keys.append(f"tab:{command['tabId']}")
+        return keys
+    
+    def acquire_breakers(self, command: Dict[str, Any], domain: Optional[str] = None) -> list:
+        """Breakers guarding a command; raises CircuitOpenError if one is open"""
+        return self.breakers.acquire(self.breaker_keys(command, domain))
+    
+    def tripped_breakers(self) -> List[Dict[str, Any]]:
+        """Open and half-open breakers for /health"""
+        return self.breakers.snapshot(include_closed=False)
+    
+    async def admin(self, op: str, **params) -> Dict[str, Any]:
+        """
+        Internal state for the admin and lease routes
+        
+        Kept behind one method so HTTP workers can ask the gateway, which
+        owns the latency histograms, breakers, leases and the tab pool.
+        """
+        if op == "timeouts":
+            return {"timeouts": self.latency.snapshot()}
+        if op == "breakers":
+            return {"breakers": self.breakers.snapshot(include_closed=params.get("include_closed", True))}
+        if op == "reset_breakers":
+            return {"reset": self.breakers.reset(params.get("key"))}
+        if op == "leases":
+            return self.leases.snapshot()
+        if op == "lease_acquire":
+            return {"lease": await self.acquire_lease(**params)}
+        if op == "lease_renew":
+            lease = self.leases.get(params["token"])
+            lease.touch(self.leases.ttl(params.get("ttl") or lease.ttl))
+            return {"lease": lease.snapshot(include_token=True)}
+        if op == "lease_claim":
+            wait = params.get("wait")
+            await self.leases.claim(params.get("tab_ids", []), params.get("token"), settings.LEASE_WAIT if wait is None else wait)
+            return {}
+        if op == "lease_release":
+            return {"lease": await self.release_lease(params["token"], params.get("close_tabs", True))}
+        if op == "pool":
+            return {"pool": self.pool.status()}
+        if op == "pool_checkout":
+            return {"tab": await self.pool.checkout(params.get("url"), params.get("timeout"), params.get("wait"))}
+        if op == "pool_checkin":
+            return await self.pool.checkin(params["tab_id"], params.get("clear_storage"))
+        raise ValueError(f"Unknown admin operation: {op}")
+    
+    def pool_status(self) -> Dict[str, Any]:
+        """Tab pool size and hit/miss counters for /health"""
+        return self.pool.status()
+    
+    def lease_status(self) -> Dict[str, Any]:
+        """Lease counters for /health"""
+        status = self.leases.snapshot()
+        return {key: status[key] for key in ("active", "leased_tabs", "expired")}
+    
+    async def acquire_lease(
+        self,
+        client: str,
+        tab_ids: List[int],
+        count: int,
+        url: str,
+        ttl: Optional[float] = None,
+        wait: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        Lease existing tabs and/or `count` new background tabs to one client
+        
+        Waits up to `wait` seconds for the existing tabs to be released by
+        other holders. New tabs are opened at `url` and closed again when the
+        lease ends; a lease that fails to open them all is rolled back.
+        """
+        if self.tab_state.is_fresh():
+            missing = [tab_id for tab_id in tab_ids if self.tab_state.get(tab_id) is None]
+            if missing:
+                raise HTTPException(status_code=404, detail=f"No such tab: {', '.join(map(str, missing))}")
+        
+        await self.leases.claim(tab_ids, None, wait)
+        lease = self.leases.grant(client, tab_ids, ttl)
+        try:
+            await asyncio.gather(*(
+                self.send_command({
+                    "action": "createTab",
+                    "url": url,
+                    "active": False,
+                    "lease": {"token": lease.token}
+                })
+                for _ in range(count)
+            ))
+        except BaseException:
+            await self.release_lease(lease.token)
+            raise
+        return lease.snapshot(include_token=True)
+    
+    async def release_lease(self, token: str, close_tabs: bool = True) -> Dict[str, Any]:
+        """End a lease, closing the tabs it opened unless `close_tabs` is false"""
+        lease = self.leases.release(token)
+        if lease is None:
+            raise HTTPException(status_code=410, detail="Lease expired or unknown")
+        if close_tabs:
+            await self._close_tabs(sorted(lease.opened))
+        return lease.snapshot()
+    
+    def settle_breakers(self, breakers: list, action: Optional[str], status_code: Optional[int], detail: str = ""):
+        """Record a command's outcome (HTTP-style status, None if abandoned) on its breakers"""
+        for breaker in breakers:
+            if status_code == 200:
+                breaker.record_success()
+            elif status_code == 504 or (status_code == 500 and action in BREAKER_ERROR_ACTIONS):
+                breaker.record_failure(detail)
+            elif status_code == 500:
+                breaker.record_success()
+            else:
+                breaker.release_probe()
+    
+    def settle_batch_result(
+        self,
+        breakers: list,
+        action: Optional[str],
+        data: Dict[str, Any],
+        token: Optional[str] = None
+    ):
+        """
+        Record one sub-result of a batch, as reported by the extension
+        
+        Settles its breakers and, as for a single createTab, adds a tab
+        created with a lease token to that lease.
+        """
+        if data.get("skipped"):
+            self.settle_breakers(breakers, action, None)
+        elif data.get("success"):
+            self.settle_breakers(breakers, action, 200)
+        else:
+            self.settle_breakers(breakers, action, 500, str(data.get("error", "")))
+        
+        if token and action == 'createTab' and data.get("success") and (data.get("tab") or {}).get("id") is not None:
+            self.leases.adopt(token, data["tab"]["id"])
+    
+    def stream_command(
+        self,
+        command: Dict[str, Any],
+        timeout: Optional[float] = None,
+        request: Optional[Request] = None
+    ) -> CommandStream:
+        """Send a command whose results the extension streams back in parts"""
+        return CommandStream(self, command, timeout, request)
+    
+    async def _send_cancellable(
+        self,
+        command: Dict[str, Any],
+        action: Optional[str],
+        domain: Optional[str],
+        timeout: Optional[float],
+        request: Optional[Request]
+    ) -> Dict[str, Any]:
+        """Await a command while watching the HTTP client for a disconnect"""
+        if request is None:
+            return await self._send(command, action, domain, timeout)
+        
+        task = asyncio.ensure_future(self._send(command, action, domain, timeout))
+        try:
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=settings.CLIENT_DISCONNECT_POLL_INTERVAL)
+                if done:
+                    return task.result()
+                if await request.is_disconnected():
+                    task.cancel()
+                    await self.cancel_command(command.get('requestId'), self.command_tabs(command))
+                    raise HTTPException(status_code=499, detail="Client disconnected; command cancelled")
+        finally:
+            if not task.done():
+                task.cancel()
+    
+    async def cancel_command(self, request_id: Optional[str], tab_ids: Optional[List[int]] = None):
+        """
+        Tell the extension to abandon a command
+        
+        The extension aborts in-page waits for it in `tab_ids` (every
+        sub-command's tab for a batch) and drops its response instead of
+        serializing it.
+        """
+        self.cancelled_commands += 1
+        if not request_id or not self.is_connected():
+            return
+        try:
+            await self.websocket.send_json({"type": "cancel", "requestId": request_id, "tabIds": tab_ids or []})
+        except Exception as e:
+            print(f"Failed to send cancel for {request_id}: {e}")
+    
+    async def _send(
+        self,
+        command: Dict[str, Any],
+        action: Optional[str],
+        domain: Optional[str],
+        timeout: Optional[float]
+    ) -> Dict[str, Any]:
+        """Send one command over the WebSocket and await its response"""
+        request_id = command.get('requestId') or str(uuid.uuid4())
         command['requestId'] = request_id
         
         # Create future for response
         future = asyncio.Future()
         self.pending_requests[request_id] = future
+        self.pending_commands[request_id] = command
+        
+        timeout_value = timeout or self.timeout_for(command, domain)
+        started = time.perf_counter()
         
         try:
             # Send command
-            await self.websocket.send_json(command)
+            try:
+                await self.websocket.send_json(command)
+            except Exception:
+                if command.get('action') not in IDEMPOTENT_ACTIONS:
+                    raise self._retryable_error("Extension connection lost; command was not sent. Retry shortly.")
+                # Connection is going away - the command is replayed on reconnect
             
             # Wait for response
-            timeout_value = timeout or settings.EXTENSION_RESPONSE_TIMEOUT
-            response = await asyncio.wait_for(future, timeout=timeout_value)
+            response = await self._await_response(request_id, future, timeout_value, started)
+            # Latency of the attempt that answered, not the time held for a reconnect
+            self.latency.observe(action, domain, time.perf_counter() - self.replayed_at.get(request_id, started))
             
             # Check for errors in response
             if not response.get('success', False):
                 error_msg = response.get('error', 'Unknown error from extension')
-                raise HTTPException(status_code=500, detail=error_msg)
+                # A navigation wait that ran out is a timeout, not a crash
+                raise HTTPException(status_code=504 if response.get('timedOut') else 500, detail=error_msg)
             
             return response
             
         except asyncio.TimeoutError:
+            # Censored sample: keeps slow domains from being starved by short timeouts
+            self.latency.observe(action, domain, timeout_value)
             raise HTTPException(
                 status_code=504, 
-                detail=f"Extension did not respond within {timeout_value} seconds"
+                detail=f"Extension did not respond within {round(timeout_value, 2)} seconds"
             )
         except Exception as e:
             if isinstance(e, HTTPException):
@@ -89,6 +817,63 @@ class ExtensionService:
             raise HTTPException(status_code=500, detail=str(e))
         finally:
             self.pending_requests.pop(request_id, None)
+            self.pending_commands.pop(request_id, None)
+            self.replayed_at.pop(request_id, None)
+    
+    async def _await_response(
+        self,
+        request_id: str,
+        future: asyncio.Future,
+        timeout_value: float,
+        started: float
+    ) -> Dict[str, Any]:
+        """
+        Wait for a command's response within `timeout_value` seconds
+        
+        The deadline is suspended while the command is held for a reconnect
+        and restarts when it is replayed, so a service worker restart never
+        turns into a 504 (nor a timeout sample or breaker failure). If the
+        extension does not come back, the grace expiry fails the command.
+        """
+        while True:
+            sent_at = self.replayed_at.get(request_id, started)
+            remaining = sent_at + timeout_value - time.perf_counter()
+            try:
+                return await asyncio.wait_for(asyncio.shield(future), timeout=max(remaining, 0))
+            except asyncio.TimeoutError:
+                if self.replayed_at.get(request_id, started) != sent_at:
+                    continue
+                if self.is_connected() or request_id not in self.pending_commands:
+                    raise
+            
+            # Held: wait for the replay (or the grace expiry failing the command)
+            reconnected = asyncio.ensure_future(self._connected.wait())
+            try:
+                await asyncio.wait({future, reconnected}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                reconnected.cancel()
+    
+    async def _wait_for_reconnect(self, command: Dict[str, Any]):
+        """Hold an idempotent command while the extension is reconnecting"""
+        if not self.in_grace_window():
+            raise self._retryable_error(
+                "Chrome extension not connected. Please ensure the extension is installed and running."
+            )
+        
+        if command.get('action') not in IDEMPOTENT_ACTIONS:
+            raise self._retryable_error("Extension is reconnecting; command was not sent. Retry shortly.")
+        
+        remaining = settings.EXTENSION_RECONNECT_GRACE - (time.time() - self.disconnected_at)
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=max(remaining, 0))
+        except asyncio.TimeoutError:
+            raise self._retryable_error(
+                f"Extension did not reconnect within {settings.EXTENSION_RECONNECT_GRACE} seconds"
+            )
 
-# Global instance
-extension_service = ExtensionService()
+# Global instance - HTTP workers reach the extension through the gateway process
+if settings.SERVICE_ROLE == "worker":
+    from app.services.gateway import GatewayExtensionService
+    extension_service: ExtensionService = GatewayExtensionService()
+else:
+    extension_service = ExtensionService()
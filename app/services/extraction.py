@@ -0,0 +1,89 @@
+"""Declarative structured extraction and its result cache"""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+from app.config import settings
+
+
+def schema_hash(schema: Dict[str, Any]) -> str:
+    """Stable short hash of a normalized extraction schema"""
+    canonical = json.dumps(schema, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:16]
+
+
+def to_columns(rows: List[Dict[str, Any]], fields: List[str]) -> Dict[str, Any]:
+    """Compact column/row layout: field names once, then one list per row"""
+    return {
+        "columns": fields,
+        "rows": [[row.get(field) for field in fields] for row in rows]
+    }
+
+
+class ExtractionCache:
+    """
+    Extraction results keyed by (url, schema hash)
+    
+    Entries expire after `ttl` seconds and are dropped as soon as a tab
+    commits a navigation to their URL (including reloads), so a cached
+    result never outlives the page it was read from by more than the TTL.
+    """
+    
+    def __init__(self, ttl: float = 60.0, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, url: Optional[str], digest: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Cached result and its age in seconds, or None"""
+        if not url or self.ttl <= 0:
+            self.misses += 1
+            return None
+        
+        key = (url, digest)
+        entry = self.entries.get(key)
+        if entry is None or time.time() - entry[0] > self.ttl:
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+        
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1], time.time() - entry[0]
+    
+    def put(self, url: Optional[str], digest: str, result: Dict[str, Any]):
+        """Store a result, evicting the least recently used entry when full"""
+        if not url or self.ttl <= 0:
+            return
+        self.entries[(url, digest)] = (time.time(), result)
+        self.entries.move_to_end((url, digest))
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    def invalidate_url(self, url: Optional[str]):
+        """Forget every result read from a URL"""
+        for key in [key for key in self.entries if key[0] == url]:
+            del self.entries[key]
+    
+    def clear(self) -> int:
+        """Drop all entries; returns how many were dropped"""
+        count = len(self.entries)
+        self.entries.clear()
+        return count
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache counters for /health"""
+        return {
+            "entries": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "ttl": self.ttl
+        }
+
+
+# Global cache
+extraction_cache = ExtractionCache(settings.EXTRACT_CACHE_TTL, settings.EXTRACT_CACHE_SIZE)
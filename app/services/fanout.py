@@ -0,0 +1,118 @@
+"""Parallel content capture across many tabs"""
+
+import asyncio
+import json
+import time
+from typing import Dict, Any, Optional, AsyncIterator
+from fastapi import Request
+from app.models import TabsContentRequest, BatchRequest, BatchCommand
+from app.services.batch import BatchRunner
+from app.services.content import convert_markdown_content, ContentConversionError
+
+
+class ContentFanOut:
+    """
+    Captures several tabs in parallel and streams each one as it is ready
+    
+    Capture runs in the extension as a parallel batch of getContent commands
+    with bounded concurrency; markdown conversion of each page starts as soon
+    as its HTML arrives and runs in the conversion workers, so one slow tab
+    or one heavy page never holds back the others.
+    """
+    
+    def __init__(self, request: TabsContentRequest, http_request: Optional[Request] = None, timeout: Optional[float] = None):
+        self.request = request
+        self.runner = BatchRunner(
+            BatchRequest(
+                commands=[
+                    BatchCommand(action="getContent", tab_id=tab_id, format="html")
+                    for tab_id in request.tab_ids
+                ],
+                mode="parallel",
+                concurrency=request.concurrency
+            ),
+            http_request,
+            timeout
+        )
+        self.completed = 0
+        self.failed = 0
+    
+    async def _convert(self, tab_id: int, content: Dict[str, Any]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        try:
+            converted = await convert_markdown_content(content, method=self.request.method, clean=self.request.clean)
+        except ContentConversionError as e:
+            return {"tab_id": tab_id, "success": False, "error": str(e)}
+        except Exception as e:
+            # A broken worker pool or pickling error is still just this tab's failure
+            return {"tab_id": tab_id, "success": False, "error": f"Conversion failed: {str(e) or type(e).__name__}"}
+        return {
+            "tab_id": tab_id,
+            "success": True,
+            "content": converted,
+            "conversionMs": round((time.perf_counter() - started) * 1000, 1)
+        }
+    
+    async def _capture(self, output: asyncio.Queue):
+        """Feed finished tabs into `output`, converting markdown in the background"""
+        conversions = set()
+        
+        async def convert(tab_id: int, content: Dict[str, Any]):
+            await output.put(await self._convert(tab_id, content))
+        
+        try:
+            async for result in self.runner.iter_results():
+                tab_id = self.request.tab_ids[result["index"]]
+                if not result["success"]:
+                    error = "Skipped" if result.get("skipped") else result.get("error", "Unknown error")
+                    await output.put({"tab_id": tab_id, "success": False, "error": error})
+                elif self.request.format == "markdown":
+                    conversions.add(asyncio.ensure_future(convert(tab_id, result.get("content", {}))))
+                else:
+                    await output.put({"tab_id": tab_id, "success": True, "content": result.get("content", {})})
+            
+            if conversions:
+                await asyncio.wait(conversions)
+        finally:
+            for task in conversions:
+                task.cancel()
+            await output.put(None)
+    
+    async def stream(self) -> AsyncIterator[str]:
+        """
+        Yield one NDJSON line per tab in completion order, then a summary
+        
+        Every tab gets its own result line with `success` and either
+        `content` or `error`; a failing tab never fails the others.
+        """
+        started = time.perf_counter()
+        output: asyncio.Queue = asyncio.Queue()
+        capture = asyncio.ensure_future(self._capture(output))
+        
+        try:
+            while True:
+                result = await output.get()
+                if result is None:
+                    break
+                if result["success"]:
+                    self.completed += 1
+                else:
+                    self.failed += 1
+                yield json.dumps({"type": "result", **result}) + "\n"
+        finally:
+            # Client went away - stop capturing and cancel the extension work
+            if not capture.done():
+                capture.cancel()
+        
+        error = self.runner.error
+        if error is None and capture.done() and not capture.cancelled() and capture.exception() is not None:
+            error = str(capture.exception())
+        if error is not None:
+            yield json.dumps({"type": "error", "error": error}) + "\n"
+        yield json.dumps({
+            "type": "summary",
+            "success": self.failed == 0,
+            "completed": self.completed,
+            "failed": self.failed,
+            "durationMs": round((time.perf_counter() - started) * 1000, 1)
+        }) + "\n"
@@ -0,0 +1,567 @@
+"""
+Extension gateway for multi-process deployments
+
+One gateway process owns the extension WebSocket and the real
+ExtensionService. Stateless HTTP worker processes reach it over a local
+IPC channel (a Unix socket, or loopback TCP where Unix sockets are not
+available) using length-prefixed JSON frames:
+
+- worker -> gateway: `{"id", "op": "command", "command", "timeout"}` (the
+  command carries the request's `lease` claim, if any),
+  `{"op": "cancel", "requestId", "tabIds"}`, `{"id", "op": "admin", "name", "params"}`
+- gateway -> worker: replies `{"id", "ok", "result"}` or
+  `{"id", "ok": false, "status", "detail", "headers"}`, plus pushed
+  `status`, `tabSnapshot`, `tabEvent`, `navEvent` and `stream` messages
+
+Workers keep their own tab mirror and event bus fed from the pushed
+messages, so reads from the mirror and event streams never cross the IPC.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import socket
+import struct
+import time
+import uuid
+from typing import Dict, Any, Optional, Set, List
+from fastapi import HTTPException, Request
+from app.config import settings
+from app.services.extension import ExtensionService
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.leases import current_claim
+
+# Frame header: payload length as a 4-byte big-endian unsigned int
+_HEADER = struct.Struct("!I")
+# Seconds a worker waits for a reply beyond the gateway's own deadline
+_REPLY_MARGIN = 5.0
+
+
+def use_unix_socket() -> bool:
+    """Unix sockets where the platform has them, loopback TCP otherwise"""
+    return hasattr(socket, "AF_UNIX") and os.name != "nt"
+
+
+def ipc_address() -> str:
+    """Human-readable IPC endpoint for logs and /health"""
+    if use_unix_socket():
+        return f"unix://{settings.GATEWAY_SOCKET}"
+    return f"tcp://127.0.0.1:{settings.GATEWAY_IPC_PORT}"
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[Dict[str, Any]]:
+    """Read one frame; None when the peer closed the connection"""
+    try:
+        header = await reader.readexactly(_HEADER.size)
+        payload = await reader.readexactly(_HEADER.unpack(header)[0])
+    except (asyncio.IncompleteReadError, ConnectionError):
+        return None
+    return json.loads(payload)
+
+
+def encode_frame(frame: Dict[str, Any]) -> bytes:
+    """Serialize one frame with its length header"""
+    payload = json.dumps(frame, separators=(",", ":")).encode("utf-8")
+    return _HEADER.pack(len(payload)) + payload
+
+
+class _WorkerLink:
+    """
+    Gateway side of one worker connection
+    
+    Outgoing frames go through a queue drained by a single writer task, so
+    `post` never blocks and stream items always reach the worker before the
+    reply that ends their command.
+    """
+    
+    def __init__(self, writer: asyncio.StreamWriter):
+        self.writer = writer
+        self.outgoing: asyncio.Queue = asyncio.Queue()
+        self.commands: Dict[str, asyncio.Task] = {}
+        self._writer_task = asyncio.create_task(self._write_loop())
+    
+    def post(self, frame: Dict[str, Any]):
+        self.outgoing.put_nowait(frame)
+    
+    async def _write_loop(self):
+        try:
+            while True:
+                frame = await self.outgoing.get()
+                self.writer.write(encode_frame(frame))
+                await self.writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+    
+    def close(self):
+        self._writer_task.cancel()
+        for task in self.commands.values():
+            task.cancel()
+        self.writer.close()
+
+
+class _BatchBreakers:
+    """
+    Breakers of each sub-command in a batch forwarded by a worker
+    
+    Workers only fail fast on breakers the gateway last reported open; the
+    counts and leases live here, so every sub-result is settled as it
+    arrives and tabs the batch creates join the worker's lease.
+    """
+    
+    def __init__(self, service: ExtensionService, command: Dict[str, Any]):
+        self.service = service
+        # Read before send_command takes the claim off the command
+        self.token = (command.get("lease") or {}).get("token")
+        self.entries: Dict[Any, tuple] = {}
+        for item in command.get("commands", []):
+            try:
+                breakers = service.acquire_breakers(item, service.command_domain(item))
+            except CircuitOpenError:
+                # Opened after the worker checked; run it unguarded rather than reshape the batch
+                breakers = []
+            self.entries[item.get("index")] = (item.get("action"), breakers)
+    
+    def settle(self, data: Any):
+        entry = self.entries.pop(data.get("index"), None) if isinstance(data, dict) else None
+        if entry is not None:
+            self.service.settle_batch_result(entry[1], entry[0], data, self.token)
+    
+    def abandon(self):
+        """Release breakers of sub-commands that never reported back"""
+        for action, breakers in self.entries.values():
+            self.service.settle_breakers(breakers, action, None)
+        self.entries = {}
+
+
+class _StreamForwarder:
+    """Stands in for a stream queue and forwards items to the owning worker"""
+    
+    def __init__(self, link: _WorkerLink, request_id: str, batch: Optional[_BatchBreakers] = None):
+        self.link = link
+        self.request_id = request_id
+        self.batch = batch
+    
+    def put_nowait(self, data: Any):
+        if self.batch:
+            self.batch.settle(data)
+        self.link.post({"type": "stream", "requestId": self.request_id, "data": data})
+
+
+class GatewayServer:
+    """Serves HTTP workers over IPC from the process that owns the extension"""
+    
+    def __init__(self, service: ExtensionService):
+        self.service = service
+        self.links: Set[_WorkerLink] = set()
+        self.server: Optional[asyncio.AbstractServer] = None
+        self._status_task: Optional[asyncio.Task] = None
+    
+    async def start(self):
+        """Listen for workers and start fanning out extension state"""
+        if use_unix_socket():
+            if os.path.exists(settings.GATEWAY_SOCKET):
+                os.unlink(settings.GATEWAY_SOCKET)
+            self.server = await asyncio.start_unix_server(self._handle, path=settings.GATEWAY_SOCKET)
+        else:
+            self.server = await asyncio.start_server(self._handle, "127.0.0.1", settings.GATEWAY_IPC_PORT)
+        
+        self.service.listeners.append(self._broadcast)
+        self.service.breakers.listeners.append(self._breaker_changed)
+        self._status_task = asyncio.create_task(self._publish_status())
+        print(f"✓ Gateway listening for workers on {ipc_address()}")
+    
+    async def stop(self):
+        """Close every worker connection and the listener"""
+        if self._broadcast in self.service.listeners:
+            self.service.listeners.remove(self._broadcast)
+        if self._breaker_changed in self.service.breakers.listeners:
+            self.service.breakers.listeners.remove(self._breaker_changed)
+        if self._status_task:
+            self._status_task.cancel()
+        for link in list(self.links):
+            link.close()
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+        if use_unix_socket() and os.path.exists(settings.GATEWAY_SOCKET):
+            os.unlink(settings.GATEWAY_SOCKET)
+    
+    def status(self) -> Dict[str, Any]:
+        """Extension state that workers report in /health and use for fail-fast checks"""
+        return {
+            "type": "status",
+            "connected": self.service.is_connected(),
+            "alive": self.service.is_alive(),
+            "reconnecting": self.service.in_grace_window(),
+            "liveness": self.service.liveness(),
+            "replayed_commands": self.service.replayed_commands,
+            "cancelled_commands": self.service.cancelled_commands,
+            "breakers": self.service.tripped_breakers(),
+            "leases": self.service.lease_status(),
+            "tab_pool": self.service.pool_status()
+        }
+    
+    def _broadcast(self, message: Dict[str, Any]):
+        """Forward a pushed extension message (or connection change) to every worker"""
+        frame = self.status() if message.get("type") == "connection" else message
+        for link in list(self.links):
+            link.post(frame)
+    
+    def _breaker_changed(self, breaker):
+        """Push a breaker opening or closing to workers straight away"""
+        self._broadcast({"type": "connection"})
+    
+    async def _publish_status(self):
+        """Refresh worker status on the heartbeat cadence (liveness, RTT, breakers)"""
+        while True:
+            await asyncio.sleep(settings.WS_HEARTBEAT_INTERVAL)
+            self._broadcast({"type": "connection"})
+    
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        link = _WorkerLink(writer)
+        self.links.add(link)
+        link.post(self.status())
+        if self.service.tab_state.synced:
+            link.post({"type": "tabSnapshot", **self.service.tab_snapshot()})
+        
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                
+                op = frame.get("op")
+                if op == "command":
+                    request_id = frame["command"]["requestId"]
+                    task = asyncio.create_task(self._run_command(link, frame))
+                    link.commands[request_id] = task
+                    task.add_done_callback(lambda _, request_id=request_id: link.commands.pop(request_id, None))
+                elif op == "cancel":
+                    task = link.commands.get(frame.get("requestId"))
+                    if task:
+                        task.cancel()
+                    await self.service.cancel_command(frame.get("requestId"), frame.get("tabIds"))
+                elif op == "admin":
+                    asyncio.create_task(self._run_admin(link, frame))
+        finally:
+            # A worker that goes away abandons its commands
+            self.links.discard(link)
+            for request_id, task in list(link.commands.items()):
+                command = self.service.pending_commands.get(request_id) or {}
+                task.cancel()
+                await self.service.cancel_command(request_id, self.service.command_tabs(command))
+            link.close()
+    
+    async def _run_command(self, link: _WorkerLink, frame: Dict[str, Any]):
+        command = frame["command"]
+        request_id = command["requestId"]
+        batch = _BatchBreakers(self.service, command) if command.get("action") == "batch" else None
+        if command.get("stream"):
+            self.service.stream_queues[request_id] = _StreamForwarder(link, request_id, batch)
+        
+        try:
+            result = await self.service.send_command(command, timeout=frame.get("timeout"))
+            if batch:
+                for data in result.get("results", []):
+                    batch.settle(data)
+            reply = {"id": frame["id"], "ok": True, "result": result}
+        except HTTPException as e:
+            reply = {
+                "id": frame["id"],
+                "ok": False,
+                "status": e.status_code,
+                "detail": e.detail,
+                "headers": e.headers
+            }
+        except Exception as e:
+            # Anything else would leave the worker's HTTP request waiting for a reply
+            print(f"Gateway command {request_id} failed: {e}")
+            reply = {"id": frame["id"], "ok": False, "status": 500, "detail": str(e)}
+        finally:
+            self.service.stream_queues.pop(request_id, None)
+            if batch:
+                batch.abandon()
+        
+        link.post(reply)
+    
+    async def _run_admin(self, link: _WorkerLink, frame: Dict[str, Any]):
+        try:
+            result = await self.service.admin(frame["name"], **frame.get("params", {}))
+            link.post({"id": frame["id"], "ok": True, "result": result})
+        except ValueError as e:
+            link.post({"id": frame["id"], "ok": False, "status": 400, "detail": str(e)})
+        except HTTPException as e:
+            link.post({"id": frame["id"], "ok": False, "status": e.status_code, "detail": e.detail, "headers": e.headers})
+        except Exception as e:
+            print(f"Gateway admin {frame.get('name')} failed: {e}")
+            link.post({"id": frame["id"], "ok": False, "status": 500, "detail": str(e)})
+
+
+class GatewayClient:
+    """Worker side of the IPC channel, reconnecting while the app runs"""
+    
+    def __init__(self, service: "GatewayExtensionService"):
+        self.service = service
+        self.writer: Optional[asyncio.StreamWriter] = None
+        self.pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connected = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+    
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+    
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._maintain())
+    
+    async def close(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self.writer:
+            self.writer.close()
+    
+    async def _maintain(self):
+        """Connect, read until the gateway goes away, and try again"""
+        while True:
+            try:
+                if use_unix_socket():
+                    reader, self.writer = await asyncio.open_unix_connection(settings.GATEWAY_SOCKET)
+                else:
+                    reader, self.writer = await asyncio.open_connection("127.0.0.1", settings.GATEWAY_IPC_PORT)
+            except OSError:
+                await asyncio.sleep(1)
+                continue
+            
+            self._connected.set()
+            try:
+                while True:
+                    frame = await read_frame(reader)
+                    if frame is None:
+                        break
+                    future = self.pending.get(frame.get("id"))
+                    if future is not None:
+                        if not future.done():
+                            future.set_result(frame)
+                        continue
+                    await self.service.handle_gateway_message(frame)
+            finally:
+                self._connected.clear()
+                self.writer.close()
+                self.writer = None
+                self.service.gateway_lost()
+                for future in self.pending.values():
+                    if not future.done():
+                        future.set_exception(self.service._lost_error(
+                            "Connection to the extension gateway was lost; the command may not have completed."
+                        ))
+            
+            await asyncio.sleep(1)
+    
+    async def _ensure_connected(self):
+        self.start()
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=settings.EXTENSION_RECONNECT_GRACE)
+        except asyncio.TimeoutError:
+            raise self.service._retryable_error(
+                f"Extension gateway not reachable at {ipc_address()}. Is the gateway process running?"
+            )
+    
+    async def post(self, frame: Dict[str, Any]):
+        """Send a frame without waiting for a reply"""
+        await self._ensure_connected()
+        self.writer.write(encode_frame(frame))
+        await self.writer.drain()
+    
+    async def request(self, frame: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        """Send a frame and wait up to `timeout` seconds for the gateway's reply"""
+        await self._ensure_connected()
+        frame_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[frame_id] = future
+        try:
+            self.writer.write(encode_frame({**frame, "id": frame_id}))
+            await self.writer.drain()
+            reply = await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            raise HTTPException(
+                status_code=504,
+                detail=f"Extension gateway did not reply within {round(timeout, 2)} seconds"
+            )
+        finally:
+            self.pending.pop(frame_id, None)
+        
+        if not reply.get("ok"):
+            raise HTTPException(
+                status_code=reply.get("status", 500),
+                detail=reply.get("detail"),
+                headers=reply.get("headers")
+            )
+        return reply["result"]
+
+
+class GatewayExtensionService(ExtensionService):
+    """
+    ExtensionService for HTTP worker processes
+    
+    Commands go to the gateway, which applies adaptive timeouts, circuit
+    breakers and reconnect handling exactly as in a single process. Tab
+    mirror and events are rebuilt locally from what the gateway pushes.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        self.gateway = GatewayClient(self)
+        self.gateway_status: Dict[str, Any] = {}
+        # When the last status frame arrived; ages the breakers' retry_after
+        self.gateway_status_at = 0.0
+    
+    def _create_owned_state(self):
+        """Breakers, leases and the tab pool live in the gateway"""
+    
+    def forget_tab(self, tab_id: Optional[int]):
+        """The gateway drops closed tabs from its own state"""
+    
+    async def start(self):
+        self.gateway.start()
+    
+    async def stop(self):
+        await self.gateway.close()
+    
+    def is_connected(self) -> bool:
+        return self.gateway.connected and self.gateway_status.get("connected", False)
+    
+    def is_alive(self) -> bool:
+        return self.is_connected() and self.gateway_status.get("alive", False)
+    
+    def liveness(self) -> Dict[str, Any]:
+        return {
+            **self.gateway_status.get("liveness", {}),
+            "alive": self.is_alive(),
+            "gateway": ipc_address() if self.gateway.connected else None
+        }
+    
+    def in_grace_window(self) -> bool:
+        return self.gateway_status.get("reconnecting", False)
+    
+    def tripped_breakers(self) -> List[Dict[str, Any]]:
+        return self.gateway_status.get("breakers", [])
+    
+    def lease_status(self) -> Dict[str, Any]:
+        return self.gateway_status.get("leases", {})
+    
+    def pool_status(self) -> Dict[str, Any]:
+        return self.gateway_status.get("tab_pool", {})
+    
+    def acquire_breakers(self, command: Dict[str, Any], domain: Optional[str] = None) -> list:
+        """
+        Fail fast on breakers the gateway last reported open
+        
+        The gateway pushes every open/close as it happens and keeps the
+        counts; once a breaker's recovery timeout has run out here the
+        command goes through and the gateway decides on the half-open probe.
+        """
+        elapsed = time.monotonic() - self.gateway_status_at
+        tripped = {breaker["key"]: breaker for breaker in self.tripped_breakers() if breaker["state"] == "open"}
+        for key in self.breaker_keys(command, domain):
+            retry_after = (tripped[key].get("retry_after") or 0) - elapsed if key in tripped else 0
+            if retry_after > 0:
+                raise CircuitOpenError(key, retry_after)
+        return []
+    
+    def reply_timeout(self, budget: float, wait: Optional[float] = None) -> float:
+        """
+        How long to wait for the gateway's reply
+        
+        Covers the gateway's own deadline, a queue for leased tabs, a
+        command held through an extension reconnect, and IPC slack.
+        """
+        wait = wait if isinstance(wait, (int, float)) else settings.LEASE_WAIT
+        return budget + wait + settings.EXTENSION_RECONNECT_GRACE + _REPLY_MARGIN
+    
+    async def admin(self, op: str, **params) -> Dict[str, Any]:
+        timeout = self.reply_timeout(settings.ADAPTIVE_TIMEOUT_MAX, params.get("wait"))
+        return await self.gateway.request({"op": "admin", "name": op, "params": params}, timeout)
+    
+    async def send_command(
+        self,
+        command: Dict[str, Any],
+        timeout: Optional[float] = None,
+        request: Optional[Request] = None
+    ) -> Dict[str, Any]:
+        """
+        Forward a command to the gateway, cancelling it if the HTTP client disconnects
+        
+        The request's lease token rides along in the command; the gateway
+        owns the leases and checks it.
+        """
+        command['requestId'] = command.get('requestId') or str(uuid.uuid4())
+        claim = current_claim()
+        if claim:
+            command['lease'] = claim
+        try:
+            return await self._send_cancellable(command, command.get('action'), None, timeout, request)
+        finally:
+            self.invalidate_extractions(command)
+    
+    def settle_batch_result(self, breakers: list, action: Optional[str], data: Dict[str, Any], token: Optional[str] = None):
+        """The gateway settles sub-results against the breakers and leases it owns"""
+    
+    async def admit(self, command: Dict[str, Any]):
+        """Lease checks run on the gateway; breakers against its last report"""
+        claim = current_claim() or {}
+        await self.admin("lease_claim", tab_ids=self.command_tabs(command), token=claim.get('token'), wait=claim.get('wait'))
+        self.acquire_breakers(command, self.command_domain(command))
+    
+    async def _send(
+        self,
+        command: Dict[str, Any],
+        action: Optional[str],
+        domain: Optional[str],
+        timeout: Optional[float]
+    ) -> Dict[str, Any]:
+        # Without an explicit timeout the gateway derives one from latency it alone has seen
+        budget = timeout or max(settings.ADAPTIVE_TIMEOUT_MAX, self.timeout_for(command, domain))
+        wait = (command.get('lease') or {}).get('wait')
+        return await self.gateway.request(
+            {"op": "command", "command": command, "timeout": timeout},
+            self.reply_timeout(budget, wait)
+        )
+    
+    async def cancel_command(self, request_id: Optional[str], tab_ids: Optional[List[int]] = None):
+        if not request_id or not self.gateway.connected:
+            return
+        try:
+            await self.gateway.post({"op": "cancel", "requestId": request_id, "tabIds": tab_ids or []})
+        except Exception as e:
+            print(f"Failed to send cancel for {request_id}: {e}")
+    
+    async def handle_gateway_message(self, frame: Dict[str, Any]):
+        """Apply state pushed by the gateway"""
+        message_type = frame.get("type")
+        
+        if message_type == "status":
+            self.gateway_status = frame
+            self.gateway_status_at = time.monotonic()
+            self.replayed_commands = frame.get("replayed_commands", 0)
+            self.cancelled_commands = frame.get("cancelled_commands", 0)
+            if not frame.get("connected") and self.tab_state.connected:
+                self.tab_state.mark_disconnected()
+            return
+        
+        if message_type == "tabSnapshot":
+            self.tab_state.mark_connected()
+            if frame.get("synced"):
+                self.tab_state.apply_snapshot(frame.get("tabs", []), focused_window_id=frame.get("focusedWindowId"))
+            return
+        
+        # tabEvent, navEvent and stream messages are handled like direct extension traffic
+        await self.handle_message(frame)
+    
+    def gateway_lost(self):
+        """The IPC connection dropped - nothing we know about the extension is current"""
+        self.gateway_status = {}
+        self.tab_state.mark_disconnected()
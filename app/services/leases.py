@@ -0,0 +1,259 @@
+"""Tab leases for agents sharing one browser"""
+
+import asyncio
+import secrets
+import time
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, List, Iterable, Set
+from fastapi import HTTPException
+
+LEASE_HEADER = "X-Lease-Token"
+LEASE_WAIT_HEADER = "X-Lease-Wait"
+
+# Lease token and wait budget of the HTTP request being served
+_claim: ContextVar[Optional[Dict[str, Any]]] = ContextVar("lease_claim", default=None)
+
+
+def current_claim() -> Optional[Dict[str, Any]]:
+    """`{"token", "wait"}` sent with the current request, if any"""
+    return _claim.get()
+
+
+def set_claim(token: Optional[str], wait: Optional[float] = None):
+    """
+    Bind a lease token (and how long to queue for a leased tab) to the current context
+    
+    Returns the ContextVar token to hand to `reset_claim` afterwards.
+    """
+    return _claim.set({"token": token, "wait": wait} if token or wait is not None else None)
+
+
+def reset_claim(context_token):
+    """Restore the claim that was current before `set_claim`"""
+    _claim.reset(context_token)
+
+
+class LeaseContextMiddleware:
+    """
+    Reads the lease headers of every HTTP request into the request's context
+    
+    Pure ASGI so streaming responses and client-disconnect detection in the
+    routes behave exactly as without it.
+    """
+    
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope["headers"]}
+            wait = headers.get(LEASE_WAIT_HEADER.lower())
+            try:
+                wait = float(wait) if wait else None
+            except ValueError:
+                wait = None
+            context_token = set_claim(headers.get(LEASE_HEADER.lower()), wait)
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                reset_claim(context_token)
+            return
+        await self.app(scope, receive, send)
+
+
+class TabLeasedError(HTTPException):
+    """Raised for a command on a tab another client holds a lease on"""
+    
+    def __init__(self, tab_id: int, lease: "TabLease"):
+        super().__init__(
+            status_code=423,
+            detail=f"Tab {tab_id} is leased by {lease.client}; retry in {round(lease.remaining(), 1)} seconds "
+                   f"or send {LEASE_WAIT_HEADER} to queue.",
+            headers={"Retry-After": str(max(1, int(lease.remaining())))}
+        )
+        self.tab_id = tab_id
+
+
+class TabLease:
+    """
+    Exclusive use of a set of tabs by one client
+    
+    The lease is an idle timeout: every command sent with its token pushes
+    the expiry `ttl` seconds out again, as does an explicit renew.
+    """
+    
+    def __init__(self, client: str, tab_ids: Iterable[int], ttl: float, opened: Iterable[int] = ()):
+        self.token = secrets.token_urlsafe(18)
+        self.client = client
+        self.tab_ids: Set[int] = set(tab_ids)
+        # Tabs the lease opened itself; closed again when it ends
+        self.opened: Set[int] = set(opened)
+        self.ttl = ttl
+        self.created_at = time.time()
+        self.expires_at = time.time() + ttl
+    
+    def remaining(self) -> float:
+        """Seconds until the lease expires"""
+        return max(0.0, self.expires_at - time.time())
+    
+    def touch(self, ttl: Optional[float] = None):
+        """Extend the lease, optionally with a new TTL"""
+        if ttl is not None:
+            self.ttl = ttl
+        self.expires_at = time.time() + self.ttl
+    
+    def snapshot(self, include_token: bool = False) -> Dict[str, Any]:
+        """Lease state for the lease routes (the token only for its holder)"""
+        data = {
+            "client": self.client,
+            "tab_ids": sorted(self.tab_ids),
+            "ttl": self.ttl,
+            "expires_in": round(self.remaining(), 3),
+            "created_at": self.created_at
+        }
+        if include_token:
+            data["token"] = self.token
+        return data
+
+
+class LeaseRegistry:
+    """
+    Leases by token, and which lease holds each tab
+    
+    Commands on a leased tab are let through for the holder only. Others are
+    rejected with TabLeasedError, or queued up to their wait budget until
+    the lease is released or expires. Expired leases are dropped lazily on
+    every check and by the service's reaper, which also closes their tabs.
+    """
+    
+    def __init__(self, default_ttl: float = 300.0, max_ttl: float = 3600.0):
+        self.default_ttl = default_ttl
+        self.max_ttl = max_ttl
+        self.leases: Dict[str, TabLease] = {}
+        self.tab_owners: Dict[int, str] = {}
+        self.expired = 0
+        # Tabs opened by expired leases, for the reaper to close
+        self.orphaned: Set[int] = set()
+        self._changed = asyncio.Event()
+    
+    def _signal(self):
+        """Wake commands queued for a leased tab"""
+        self._changed.set()
+        self._changed = asyncio.Event()
+    
+    def ttl(self, ttl: Optional[float]) -> float:
+        """Requested TTL clamped to the configured maximum"""
+        return min(self.max_ttl, ttl or self.default_ttl)
+    
+    def get(self, token: str) -> TabLease:
+        """A live lease by token; 410 once it is released or expired"""
+        self.expire()
+        lease = self.leases.get(token)
+        if lease is None:
+            raise HTTPException(status_code=410, detail="Lease expired or unknown")
+        return lease
+    
+    def holder(self, tab_id: int) -> Optional[TabLease]:
+        """The live lease holding a tab, if any"""
+        token = self.tab_owners.get(tab_id)
+        return self.leases.get(token) if token else None
+    
+    def conflict(self, tab_ids: Iterable[int], token: Optional[str]) -> Optional[TabLease]:
+        """First lease other than `token` that holds one of the tabs"""
+        for tab_id in tab_ids:
+            lease = self.holder(tab_id)
+            if lease is not None and lease.token != token:
+                return lease
+        return None
+    
+    def grant(self, client: str, tab_ids: Iterable[int], ttl: Optional[float], opened: Iterable[int] = ()) -> TabLease:
+        """Create a lease over free tabs (callers check for conflicts first)"""
+        lease = TabLease(client, tab_ids, self.ttl(ttl), opened)
+        self.leases[lease.token] = lease
+        for tab_id in lease.tab_ids:
+            self.tab_owners[tab_id] = lease.token
+        return lease
+    
+    def adopt(self, token: str, tab_id: int):
+        """Add a tab the holder just created to its lease"""
+        lease = self.leases.get(token)
+        if lease is not None and tab_id not in self.tab_owners:
+            lease.tab_ids.add(tab_id)
+            lease.opened.add(tab_id)
+            self.tab_owners[tab_id] = token
+    
+    def release(self, token: str) -> Optional[TabLease]:
+        """End a lease; returns it so the caller can close the tabs it opened"""
+        lease = self.leases.pop(token, None)
+        if lease is None:
+            return None
+        for tab_id in lease.tab_ids:
+            if self.tab_owners.get(tab_id) == token:
+                del self.tab_owners[tab_id]
+        self._signal()
+        return lease
+    
+    def expire(self) -> List[TabLease]:
+        """Drop every lease past its expiry"""
+        now = time.time()
+        expired = [lease for lease in self.leases.values() if lease.expires_at <= now]
+        for lease in expired:
+            self.release(lease.token)
+            self.orphaned |= lease.opened
+        self.expired += len(expired)
+        return expired
+    
+    def take_orphans(self) -> List[int]:
+        """Tabs of expired leases that still need closing"""
+        orphaned, self.orphaned = sorted(self.orphaned), set()
+        return orphaned
+    
+    def forget_tab(self, tab_id: int):
+        """A leased tab was closed"""
+        token = self.tab_owners.pop(tab_id, None)
+        lease = self.leases.get(token) if token else None
+        if lease is not None:
+            lease.tab_ids.discard(tab_id)
+            lease.opened.discard(tab_id)
+        self.orphaned.discard(tab_id)
+    
+    async def claim(self, tab_ids: List[int], token: Optional[str], wait: Optional[float] = None):
+        """
+        Admit a command on `tab_ids` for the bearer of `token`
+        
+        A known token is renewed; an unknown one fails with 410 so the client
+        learns it lost its lease. With a wait budget the command queues
+        until the tabs are free, else TabLeasedError is raised at once.
+        """
+        if token:
+            self.get(token).touch()
+        if not tab_ids:
+            return
+        
+        deadline = time.monotonic() + (wait or 0)
+        while True:
+            self.expire()
+            lease = self.conflict(tab_ids, token)
+            if lease is None:
+                return
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                blocked = next(tab_id for tab_id in tab_ids if self.tab_owners.get(tab_id) == lease.token)
+                raise TabLeasedError(blocked, lease)
+            
+            # Woken by a release, or wake up when this lease would expire
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=min(remaining, lease.remaining() + 0.01))
+            except asyncio.TimeoutError:
+                pass
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Live leases (without tokens) and counters for /health"""
+        self.expire()
+        return {
+            "active": len(self.leases),
+            "leased_tabs": len(self.tab_owners),
+            "expired": self.expired,
+            "leases": [lease.snapshot() for lease in self.leases.values()]
+        }
@@ -0,0 +1,156 @@
+"""Rolling latency metrics"""
+
+import math
+import time
+from collections import deque
+from typing import Dict, Any, Optional, Deque, Tuple
+
+# Histogram bucket upper bounds in milliseconds
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+
+class RollingHistogram:
+    """
+    Latency samples over a sliding window
+    
+    Keeps at most `max_samples` samples no older than `max_age` seconds and
+    answers quantile queries over them. Values are recorded in seconds and
+    reported in milliseconds.
+    """
+    
+    def __init__(self, max_samples: int = 1000, max_age: Optional[float] = 600.0):
+        self.max_samples = max_samples
+        self.max_age = max_age
+        self.samples: Deque[Tuple[float, float]] = deque(maxlen=max_samples)
+        self.total = 0
+    
+    def observe(self, value: float):
+        """Record a latency sample in seconds"""
+        self.samples.append((time.time(), value))
+        self.total += 1
+    
+    def _values(self) -> list:
+        if self.max_age is not None:
+            cutoff = time.time() - self.max_age
+            while self.samples and self.samples[0][0] < cutoff:
+                self.samples.popleft()
+        return sorted(value for _, value in self.samples)
+    
+    def count(self) -> int:
+        """Number of samples currently in the window"""
+        return len(self._values())
+    
+    def quantile(self, q: float) -> Optional[float]:
+        """Quantile in seconds (nearest rank), None when the window is empty"""
+        values = self._values()
+        if not values:
+            return None
+        index = min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))
+        return values[index]
+    
+    def last(self) -> Optional[float]:
+        """Most recent sample in seconds"""
+        return self.samples[-1][1] if self.samples else None
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Summary in milliseconds for /health and admin endpoints"""
+        values = self._values()
+        if not values:
+            return {"count": 0, "total": self.total}
+        
+        def ms(value: float) -> float:
+            return round(value * 1000, 2)
+        
+        def rank(q: float) -> float:
+            return values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))]
+        
+        buckets = {}
+        remaining = iter(values)
+        pending = next(remaining, None)
+        for bound in DEFAULT_BUCKETS_MS:
+            bucket = 0
+            while pending is not None and pending * 1000 <= bound:
+                bucket += 1
+                pending = next(remaining, None)
+            buckets[f"le_{bound}"] = bucket
+        buckets["le_inf"] = len(values) - sum(buckets.values())
+        
+        return {
+            "count": len(values),
+            "total": self.total,
+            "last_ms": ms(self.samples[-1][1]),
+            "min_ms": ms(values[0]),
+            "mean_ms": ms(sum(values) / len(values)),
+            "p50_ms": ms(rank(0.50)),
+            "p90_ms": ms(rank(0.90)),
+            "p99_ms": ms(rank(0.99)),
+            "max_ms": ms(values[-1]),
+            "buckets": buckets
+        }
+
+
+class LatencyTracker:
+    """
+    Rolling latency per (action, domain) used to derive command timeouts
+    
+    The timeout for a key is `multiplier * p99`, clamped to [floor, ceiling].
+    Keys with fewer than `min_samples` samples fall back to the action-wide
+    histogram and then to the static default.
+    """
+    
+    ANY_DOMAIN = "*"
+    
+    def __init__(
+        self,
+        default: float,
+        multiplier: float = 3.0,
+        floor: float = 2.0,
+        ceiling: float = 120.0,
+        min_samples: int = 20,
+        max_samples: int = 500,
+        action_floors: Optional[Dict[str, float]] = None
+    ):
+        self.default = default
+        self.multiplier = multiplier
+        self.floor = floor
+        self.ceiling = ceiling
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.action_floors = action_floors or {}
+        self.histograms: Dict[Tuple[str, str], RollingHistogram] = {}
+    
+    def _histogram(self, action: str, domain: str) -> RollingHistogram:
+        key = (action, domain)
+        if key not in self.histograms:
+            self.histograms[key] = RollingHistogram(max_samples=self.max_samples)
+        return self.histograms[key]
+    
+    def observe(self, action: str, domain: Optional[str], seconds: float):
+        """Record a command latency for the domain and the action as a whole"""
+        self._histogram(action, self.ANY_DOMAIN).observe(seconds)
+        if domain:
+            self._histogram(action, domain).observe(seconds)
+    
+    def timeout_for(self, action: str, domain: Optional[str] = None, floor: Optional[float] = None) -> float:
+        """Derived timeout in seconds for a command"""
+        floor = max(self.floor, self.action_floors.get(action, 0), floor or 0)
+        
+        for key in ((action, domain), (action, self.ANY_DOMAIN)):
+            histogram = self.histograms.get(key)
+            if histogram is None or histogram.count() < self.min_samples:
+                continue
+            return min(self.ceiling, max(floor, self.multiplier * histogram.quantile(0.99)))
+        
+        return max(floor, self.default)
+    
+    def snapshot(self) -> list:
+        """Per-key latency summaries and the timeout each one currently yields"""
+        return [
+            {
+                "action": action,
+                "domain": domain,
+                "timeout": round(self.timeout_for(action, None if domain == self.ANY_DOMAIN else domain), 3),
+                "latency": histogram.snapshot()
+            }
+            for (action, domain), histogram in sorted(self.histograms.items())
+        ]
@@ -0,0 +1,284 @@
+"""Warm pool of reusable worker tabs"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set, TYPE_CHECKING
+from fastapi import HTTPException
+
+if TYPE_CHECKING:
+    from app.services.extension import ExtensionService
+
+# How often the pool refills, trims idle tabs and reclaims forgotten checkouts
+MAINTAIN_INTERVAL = 5.0
+
+
+class TabPool:
+    """
+    Pre-created tabs handed out to jobs instead of a create/close per job
+    
+    Up to `min_idle` blank tabs are kept loaded in the background (in their
+    own window when `use_window` is set). A checkout takes one, or opens a
+    new one on a miss while the pool holds fewer than `size` tabs; checkin
+    resets the tab to about:blank - optionally clearing the page's storage
+    first - and returns it to the pool. Idle tabs above `min_idle` are
+    closed after `idle_timeout` seconds, and tabs checked out for longer
+    than `checkout_timeout` are taken back.
+    """
+    
+    def __init__(
+        self,
+        service: "ExtensionService",
+        size: int = 0,
+        min_idle: int = 0,
+        idle_timeout: float = 300.0,
+        checkout_timeout: float = 600.0,
+        use_window: bool = False,
+        clear_storage: bool = False
+    ):
+        self.service = service
+        self.size = size
+        self.min_idle = min(min_idle, size)
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.use_window = use_window
+        self.clear_storage = clear_storage
+        
+        # tab id -> idle since / checked out at; idle tabs in LRU order
+        self.idle: "OrderedDict[int, float]" = OrderedDict()
+        self.checked_out: Dict[int, float] = {}
+        self.resetting: Set[int] = set()
+        self.window_id: Optional[int] = None
+        self.creating = 0
+        self.stats = {"hits": 0, "misses": 0, "created": 0, "recycled": 0, "closed": 0, "reclaimed": 0, "reset_failures": 0}
+        self._window_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # Background refill started by a checkout; at most one at a time
+        self._fill_task: Optional[asyncio.Task] = None
+    
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+    
+    def total(self) -> int:
+        """Tabs the pool owns, including ones being opened or reset"""
+        return len(self.idle) + len(self.checked_out) + len(self.resetting) + self.creating
+    
+    def start(self):
+        if self.enabled:
+            self._task = asyncio.create_task(self._maintain())
+    
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        if self._fill_task:
+            self._fill_task.cancel()
+            self._fill_task = None
+    
+    def forget(self, tab_id: int):
+        """A pool tab was closed outside the pool"""
+        self.idle.pop(tab_id, None)
+        self.checked_out.pop(tab_id, None)
+        self.resetting.discard(tab_id)
+    
+    async def _create(self) -> int:
+        """Open a blank background tab for the pool"""
+        self.creating += 1
+        try:
+            tab_id = await self._open()
+        finally:
+            self.creating -= 1
+        self.stats["created"] += 1
+        return tab_id
+    
+    async def _open(self) -> int:
+        if self.use_window and self.window_id is None:
+            async with self._window_lock:
+                if self.window_id is None:
+                    response = await self.service.send_command({"action": "createWindow", "url": "about:blank"})
+                    self.window_id = response["windowId"]
+                    return response["tab"]["id"]
+        
+        command = {"action": "createTab", "url": "about:blank", "active": False}
+        if self.window_id is not None:
+            command["windowId"] = self.window_id
+        try:
+            response = await self.service.send_command(command)
+        except HTTPException as e:
+            if self.window_id is None or e.status_code != 500:
+                raise
+            # Pool window was closed - open a new one
+            self.window_id = None
+            return await self._open()
+        return response["tab"]["id"]
+    
+    async def _close(self, tab_id: int):
+        self.forget(tab_id)
+        try:
+            await self.service.send_command({"action": "closeTab", "tabId": tab_id})
+        except HTTPException:
+            pass
+        self.stats["closed"] += 1
+    
+    def _take_idle(self) -> Optional[int]:
+        """Most recently returned idle tab that still exists"""
+        tab_state = self.service.tab_state
+        while self.idle:
+            tab_id, _ = self.idle.popitem(last=True)
+            if not tab_state.is_fresh() or tab_state.get(tab_id) is not None:
+                return tab_id
+        return None
+    
+    async def checkout(
+        self,
+        url: Optional[str] = None,
+        timeout: Optional[float] = None,
+        wait: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Take a warm tab (opening one on a miss) and navigate it to `url`
+        
+        `wait` holds the navigation wait fields of the navigateTab command.
+        Raises 503 when the pool is disabled or every tab is checked out.
+        """
+        if not self.enabled:
+            raise HTTPException(status_code=503, detail="Tab pool is disabled (TAB_POOL_SIZE=0)")
+        
+        tab_id = self._take_idle()
+        if tab_id is not None:
+            self.stats["hits"] += 1
+        else:
+            if self.total() >= self.size:
+                raise HTTPException(
+                    status_code=503,
+                    detail=f"All {self.size} pool tabs are checked out; retry shortly.",
+                    headers={"Retry-After": "1"}
+                )
+            self.stats["misses"] += 1
+            tab_id = await self._create()
+        
+        self.checked_out[tab_id] = time.time()
+        # Refill in the background so the next checkout is a hit
+        self._refill()
+        
+        if not url:
+            return {"id": tab_id, "url": "about:blank", "pooled": True}
+        try:
+            response = await self.service.send_command(
+                {"action": "navigateTab", "tabId": tab_id, "url": url, **(wait or {})}, timeout=timeout
+            )
+        except BaseException:
+            await self.checkin(tab_id)
+            raise
+        return {**response.get("tab", {}), "id": tab_id, "pooled": True, "wait": response.get("wait")}
+    
+    async def checkin(self, tab_id: int, clear_storage: Optional[bool] = None) -> Dict[str, Any]:
+        """Reset a checked-out tab and return it to the pool (or close it if it will not reset)"""
+        if self.checked_out.pop(tab_id, None) is None:
+            raise HTTPException(status_code=404, detail=f"Tab {tab_id} is not checked out from the pool")
+        
+        self.resetting.add(tab_id)
+        try:
+            await self.service.send_command({
+                "action": "resetTab",
+                "tabId": tab_id,
+                "clearStorage": self.clear_storage if clear_storage is None else clear_storage
+            })
+        except HTTPException:
+            self.stats["reset_failures"] += 1
+            await self._close(tab_id)
+            return {"id": tab_id, "returned": False}
+        finally:
+            self.resetting.discard(tab_id)
+        
+        self.idle[tab_id] = time.time()
+        self.stats["recycled"] += 1
+        return {"id": tab_id, "returned": True}
+    
+    def _refill(self):
+        """Start a background fill unless one is already running"""
+        if self._fill_task and not self._fill_task.done():
+            return
+        self._fill_task = asyncio.create_task(self.fill())
+        self._fill_task.add_done_callback(self._refill_done)
+    
+    def _refill_done(self, task: asyncio.Task):
+        if task is self._fill_task:
+            self._fill_task = None
+        if task.cancelled():
+            return
+        if task.exception():
+            print(f"Tab pool refill failed: {task.exception()}")
+        elif task.result():
+            print(f"Tab pool refilled {task.result()} tab(s)")
+    
+    async def fill(self) -> int:
+        """Open tabs until `min_idle` are ready (or the pool is full); returns how many opened"""
+        missing = min(self.min_idle - len(self.idle) - self.creating, self.size - self.total())
+        if missing <= 0 or not self.service.is_connected():
+            return 0
+        # Reserve the slots now so concurrent fills do not overshoot
+        self.creating += missing
+        try:
+            results = await asyncio.gather(*(self._open() for _ in range(missing)), return_exceptions=True)
+        finally:
+            self.creating -= missing
+        opened = 0
+        for result in results:
+            if isinstance(result, int):
+                opened += 1
+                self.stats["created"] += 1
+                self.idle[result] = time.time()
+            else:
+                print(f"Tab pool could not open a tab: {result}")
+        return opened
+    
+    async def _trim(self):
+        """Close idle tabs above `min_idle` that sat unused for `idle_timeout`"""
+        cutoff = time.time() - self.idle_timeout
+        expired = [tab_id for tab_id, since in self.idle.items() if since < cutoff]
+        for tab_id in expired[:max(0, len(self.idle) - self.min_idle)]:
+            await self._close(tab_id)
+    
+    async def _reclaim(self):
+        """Take back tabs whose job never checked them in"""
+        cutoff = time.time() - self.checkout_timeout
+        for tab_id in [tab_id for tab_id, since in self.checked_out.items() if since < cutoff]:
+            if tab_id in self.checked_out:
+                self.stats["reclaimed"] += 1
+                await self.checkin(tab_id)
+    
+    def _prune(self):
+        """Drop tabs the (fresh) tab mirror no longer knows, e.g. after a browser restart"""
+        tab_state = self.service.tab_state
+        if not tab_state.is_fresh():
+            return
+        for tab_id in [tab_id for tab_id in [*self.idle, *self.checked_out] if tab_state.get(tab_id) is None]:
+            self.forget(tab_id)
+    
+    async def _maintain(self):
+        while True:
+            await asyncio.sleep(MAINTAIN_INTERVAL)
+            if not self.service.is_connected():
+                continue
+            try:
+                self._prune()
+                await self._reclaim()
+                await self._trim()
+                await self.fill()
+            except Exception as e:
+                print(f"Tab pool maintenance failed: {e}")
+    
+    def status(self) -> Dict[str, Any]:
+        """Pool size and hit/miss counters for /health"""
+        checkouts = self.stats["hits"] + self.stats["misses"]
+        return {
+            "enabled": self.enabled,
+            "size": self.size,
+            "idle": len(self.idle),
+            "checked_out": len(self.checked_out),
+            "window_id": self.window_id,
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / checkouts, 3) if checkouts else None
+        }
@@ -0,0 +1,126 @@
+"""In-memory mirror of the browser's tab table"""
+
+import time
+from typing import Dict, Any, Optional, List
+
+
+class TabState:
+    """
+    Mirror of chrome.tabs kept up to date by events pushed from the extension
+    
+    The extension sends a full snapshot on (re)connect and incremental
+    created/updated/removed/activated events afterwards. Every message carries
+    a sequence number so events that race with a snapshot are not lost.
+    """
+    
+    def __init__(self):
+        self.tabs: Dict[int, Dict[str, Any]] = {}
+        self.focused_window_id: Optional[int] = None
+        self.synced = False
+        self.connected = False
+        self.last_sync_at: Optional[float] = None
+        self.last_event_at: Optional[float] = None
+        self._syncing = False
+        self._buffered: List[Dict[str, Any]] = []
+    
+    def mark_connected(self):
+        """Extension connected - table is stale until the next snapshot"""
+        self.connected = True
+        self.synced = False
+        self._syncing = True
+        self._buffered = []
+    
+    def mark_disconnected(self):
+        """Extension went away - keep the last known table but flag it stale"""
+        self.connected = False
+        self._syncing = False
+        self._buffered = []
+    
+    def abort_sync(self):
+        """Snapshot request failed - stop buffering, table stays stale"""
+        self._syncing = False
+        self._buffered = []
+    
+    def is_fresh(self) -> bool:
+        """Whether the mirror can be used to answer queries"""
+        return self.connected and self.synced
+    
+    def apply_snapshot(self, tabs: List[Dict[str, Any]], focused_window_id: Optional[int] = None, seq: int = 0):
+        """Replace the table with a full snapshot from the extension"""
+        self.tabs = {tab["id"]: tab for tab in tabs if tab.get("id") is not None}
+        if focused_window_id is not None and focused_window_id >= 0:
+            self.focused_window_id = focused_window_id
+        
+        # Re-apply events that arrived while the snapshot was in flight
+        buffered, self._buffered = self._buffered, []
+        self._syncing = False
+        for event in buffered:
+            if event.get("seq", 0) > seq:
+                self._apply(event)
+        
+        self.synced = True
+        self.last_sync_at = time.time()
+    
+    def apply_event(self, event: Dict[str, Any]):
+        """Apply an incremental tab event from the extension"""
+        if self._syncing:
+            self._buffered.append(event)
+        self._apply(event)
+        self.last_event_at = time.time()
+    
+    def _apply(self, event: Dict[str, Any]):
+        kind = event.get("event")
+        tab_id = event.get("tabId")
+        
+        if kind in ("created", "updated"):
+            tab = event.get("tab") or {}
+            if tab.get("id") is not None:
+                self.tabs[tab["id"]] = tab
+        
+        elif kind == "removed":
+            self.tabs.pop(tab_id, None)
+        
+        elif kind == "activated":
+            window_id = event.get("windowId")
+            for tab in self.tabs.values():
+                if tab.get("windowId") == window_id:
+                    tab["active"] = tab["id"] == tab_id
+        
+        elif kind == "focusChanged":
+            window_id = event.get("windowId")
+            if window_id is not None and window_id >= 0:
+                self.focused_window_id = window_id
+    
+    def query(self, active: Optional[bool] = None, current_window: Optional[bool] = None) -> List[Dict[str, Any]]:
+        """Filter the mirrored tabs like chrome.tabs.query"""
+        tabs = list(self.tabs.values())
+        
+        if active is not None:
+            tabs = [tab for tab in tabs if bool(tab.get("active")) == active]
+        if current_window is not None:
+            tabs = [
+                tab for tab in tabs
+                if (tab.get("windowId") == self.focused_window_id) == current_window
+            ]
+        
+        return sorted(tabs, key=lambda tab: (tab.get("windowId") or 0, tab.get("index") or 0))
+    
+    def get(self, tab_id: int) -> Optional[Dict[str, Any]]:
+        """Get a single mirrored tab"""
+        return self.tabs.get(tab_id)
+    
+    def active_tab(self) -> Optional[Dict[str, Any]]:
+        """Active tab in the last focused window"""
+        tabs = self.query(active=True, current_window=True)
+        return tabs[0] if tabs else None
+    
+    def status(self) -> Dict[str, Any]:
+        """Staleness indicator for API responses and /health"""
+        now = time.time()
+        last_update = max(filter(None, [self.last_sync_at, self.last_event_at]), default=None)
+        return {
+            "synced": self.synced,
+            "stale": not self.is_fresh(),
+            "age": round(now - last_update, 3) if last_update else None,
+            "tabs": len(self.tabs)
+        }
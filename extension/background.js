@@ -7,8 +7,10 @@ let ws = null;
 let reconnectInterval = null;
 let heartbeatInterval = null;
 let keepAliveInterval = null;
+let wsUrlIndex = 0;
 
-const WS_URL = 'ws://localhost:8000/ws';
+// Single-process server first, then the gateway of a multi-worker deployment
+const WS_URLS = ['ws://localhost:8000/ws', 'ws://localhost:8001/ws'];
 const RECONNECT_DELAY = 5000;
 const HEARTBEAT_INTERVAL = 30000;
 const KEEP_ALIVE_INTERVAL = 20000;
@@ -16,14 +18,22 @@ const KEEP_ALIVE_INTERVAL = 20000;
 // WebSocket Connection
 function connectWebSocket() {
   try {
-    ws = new WebSocket(WS_URL);
+    let opened = false;
+    ws = new WebSocket(WS_URLS[wsUrlIndex]);
     
     ws.onopen = () => {
+      opened = true;
       console.log('✓ Connected to Chrome Automation API server');
       if (reconnectInterval) {
         clearInterval(reconnectInterval);
         reconnectInterval = null;
       }
+      // Lets the server enforce heartbeats; builds without this are never dropped for missing them
+      ws.send(JSON.stringify({
+        type: 'hello',
+        version: chrome.runtime.getManifest().version,
+        capabilities: ['heartbeat']
+      }));
       startHeartbeat();
     };
     
@@ -32,8 +42,20 @@ function connectWebSocket() {
         const message = JSON.parse(event.data);
         if (message.type === 'pong') return;
         
+        // Answer server heartbeats immediately so the server can measure RTT
+        if (message.type === 'ping') {
+          ws.send(JSON.stringify({ type: 'pong', id: message.id }));
+          return;
+        }
+        
+        if (message.type === 'cancel') {
+          await cancelCommand(message.requestId, message.tabIds);
+          return;
+        }
+        
         const response = await handleCommand(message);
-        ws.send(JSON.stringify(response));
+        // Cancelled commands are dropped without serializing their result
+        if (response) ws.send(JSON.stringify(response));
       } catch (error) {
         console.error('Error handling message:', error);
         const message = JSON.parse(event.data);
@@ -54,6 +76,9 @@ function connectWebSocket() {
       ws = null;
       stopHeartbeat();
       
+      // Refused or unreachable (e.g. an HTTP worker) - try the next URL
+      if (!opened) wsUrlIndex = (wsUrlIndex + 1) % WS_URLS.length;
+      
       if (!reconnectInterval) {
         reconnectInterval = setInterval(() => {
           console.log('Attempting to reconnect...');
@@ -93,61 +118,157 @@ function startKeepAlive() {
 }
 
 // Command Handler
+const inflightCommands = new Map();
+
+async function cancelCommand(requestId, tabIds = []) {
+  const job = inflightCommands.get(requestId);
+  if (!job) return;
+  job.cancelled = true;
+  
+  // Flag the request in every page it runs in (all sub-command tabs of a batch) so in-page waits stop polling
+  await Promise.all(tabIds.map(async (tabId) => {
+    try {
+      await chrome.scripting.executeScript({
+        target: { tabId },
+        func: (id) => {
+          window.__automationCancelled = window.__automationCancelled || {};
+          window.__automationCancelled[id] = true;
+        },
+        args: [requestId]
+      });
+    } catch (error) {
+      // Tab gone or not scriptable - nothing left to abort
+    }
+  }));
+}
+
 async function handleCommand(message) {
-  const { action, requestId } = message;
+  const { requestId } = message;
+  const job = { cancelled: false };
+  inflightCommands.set(requestId, job);
   
   try {
-    let result;
-    
-    switch (action) {
-      case 'createTab':
-        result = await createTab(message.url, message.active);
-        break;
-      case 'getTabs':
-        result = await getTabs(message.filter);
-        break;
-      case 'getActiveTab':
-        result = await getActiveTab();
-        break;
-      case 'navigateTab':
-        result = await navigateTab(message.tabId, message.url);
-        break;
-      case 'activateTab':
-        result = await activateTab(message.tabId);
-        break;
-      case 'closeTab':
-        result = await closeTab(message.tabId);
-        break;
-      case 'reloadTab':
-        result = await reloadTab(message.tabId, message.bypassCache);
-        break;
-      case 'getContent':
-        result = await getContent(message.tabId, message.format);
-        break;
-      case 'getMetadata':
-        result = await getMetadata(message.tabId);
-        break;
-      case 'interact':
-        result = await interact(message.tabId, message.interaction);
-        break;
-      default:
-        throw new Error(`Unknown action: ${action}`);
-    }
+    const result = await dispatchCommand(message, job);
     
+    if (job.cancelled) return null;
     return { ...result, requestId };
   } catch (error) {
+    if (job.cancelled) return null;
     return { 
       success: false, 
       error: error.message,
+      timedOut: error.timedOut || undefined,
       requestId 
     };
+  } finally {
+    inflightCommands.delete(requestId);
+  }
+}
+
+async function dispatchCommand(message, job) {
+  const { action, requestId } = message;
+  
+  switch (action) {
+    case 'createTab':
+      return await createTab(message.url, message.active, message.windowId, navigationOptions(message));
+    case 'createWindow':
+      return await createWindow(message.url);
+    case 'getTabs':
+      return await getTabs(message.filter);
+    case 'syncTabs':
+      return await syncTabs();
+    case 'getActiveTab':
+      return await getActiveTab();
+    case 'navigateTab':
+      return await navigateTab(message.tabId, message.url, navigationOptions(message));
+    case 'activateTab':
+      return await activateTab(message.tabId);
+    case 'closeTab':
+      return await closeTab(message.tabId);
+    case 'reloadTab':
+      return await reloadTab(message.tabId, message.bypassCache, navigationOptions(message));
+    case 'resetTab':
+      return await resetTab(message.tabId, message.clearStorage);
+    case 'getContent':
+      return await getContent(message.tabId, message.format);
+    case 'getMetadata':
+      return await getMetadata(message.tabId);
+    case 'extract':
+      return await extract(message.tabId, message.schema);
+    case 'harvest':
+      return await harvest(message.tabId, { ...message.harvest, requestId }, job);
+    case 'interact':
+      return await interact(message.tabId, { ...message.interaction, requestId });
+    case 'runWorkflow':
+      return await runWorkflow(message.tabId, { ...message.workflow, requestId }, job);
+    case 'batch':
+      return await runBatch(message, job);
+    default:
+      throw new Error(`Unknown action: ${action}`);
+  }
+}
+
+// Batch Operations
+function sendStream(requestId, data) {
+  if (ws && ws.readyState === WebSocket.OPEN) {
+    ws.send(JSON.stringify({ type: 'stream', requestId, data }));
+  }
+}
+
+async function runBatch(message, job) {
+  const { requestId, commands = [], mode = 'sequential', stopOnError = false, stream = false } = message;
+  const concurrency = Math.max(1, message.concurrency || 1);
+  const results = [];
+  let failed = false;
+  
+  const runOne = async (command) => {
+    let result;
+    
+    if (job.cancelled || (stopOnError && failed)) {
+      result = { index: command.index, success: false, skipped: true };
+    } else {
+      try {
+        if (command.action === 'batch') throw new Error('Batches cannot be nested');
+        const response = await dispatchCommand({ ...command, requestId }, job);
+        result = { ...response, index: command.index, success: response.success !== false };
+      } catch (error) {
+        result = { index: command.index, success: false, error: error.message, timedOut: error.timedOut || undefined };
+      }
+      if (!result.success) failed = true;
+    }
+    
+    if (job.cancelled) return;
+    if (stream) {
+      sendStream(requestId, result);
+    } else {
+      results.push(result);
+    }
+  };
+  
+  if (mode === 'parallel') {
+    let next = 0;
+    const worker = async () => {
+      while (next < commands.length) {
+        await runOne(commands[next++]);
+      }
+    };
+    await Promise.all(Array.from({ length: Math.min(concurrency, commands.length) }, worker));
+  } else {
+    for (const command of commands) {
+      await runOne(command);
+    }
   }
+  
+  // Streamed results were already sent one by one
+  return stream ? { success: true, count: commands.length } : { success: true, results };
 }
 
 // Tab Operations
-async function createTab(url, active = true) {
-  const tab = await chrome.tabs.create({ url, active });
-  await waitForTabLoad(tab.id);
+async function createTab(url, active = true, windowId = undefined, options = {}) {
+  // Listen before the tab exists so an early commit is not missed
+  const navigation = startNavigationWait(url, options);
+  const tab = await chrome.tabs.create({ url, active, windowId });
+  const wait = await navigation.wait(tab.id);
   
   return {
     success: true,
@@ -157,6 +278,27 @@ async function createTab(url, active = true) {
       title: tab.title,
       active: tab.active,
       windowId: tab.windowId
+    },
+    wait
+  };
+}
+
+// Unfocused window for the server's pool of worker tabs
+async function createWindow(url = 'about:blank') {
+  const navigation = startNavigationWait(url);
+  const poolWindow = await chrome.windows.create({ url, focused: false });
+  const tab = poolWindow.tabs[0];
+  await navigation.wait(tab.id);
+  
+  return {
+    success: true,
+    windowId: poolWindow.id,
+    tab: {
+      id: tab.id,
+      url: tab.url,
+      title: tab.title,
+      active: tab.active,
+      windowId: poolWindow.id
     }
   };
 }
@@ -179,6 +321,19 @@ async function getTabs(filter = {}) {
   };
 }
 
+async function syncTabs() {
+  const seq = tabEventSeq;
+  const tabs = await chrome.tabs.query({});
+  const focused = await chrome.windows.getLastFocused().catch(() => null);
+  
+  return {
+    success: true,
+    seq,
+    focusedWindowId: focused ? focused.id : null,
+    tabs: tabs.map(serializeTab)
+  };
+}
+
 async function getActiveTab() {
   const tabs = await chrome.tabs.query({ active: true, currentWindow: true });
   if (tabs.length === 0) throw new Error('No active tab found');
@@ -194,9 +349,10 @@ async function getActiveTab() {
   };
 }
 
-async function navigateTab(tabId, url) {
+async function navigateTab(tabId, url, options = {}) {
+  const navigation = startNavigationWait(url, options, tabId);
   await chrome.tabs.update(tabId, { url });
-  await waitForTabLoad(tabId);
+  const wait = await navigation.wait(tabId);
   const tab = await chrome.tabs.get(tabId);
   
   return {
@@ -205,7 +361,8 @@ async function navigateTab(tabId, url) {
       id: tab.id,
       url: tab.url,
       title: tab.title
-    }
+    },
+    wait
   };
 }
 
@@ -227,12 +384,46 @@ async function closeTab(tabId) {
   return { success: true };
 }
 
-async function reloadTab(tabId, bypassCache = false) {
+async function reloadTab(tabId, bypassCache = false, options = {}) {
+  const navigation = startNavigationWait(null, options, tabId);
   await chrome.tabs.reload(tabId, { bypassCache });
-  await waitForTabLoad(tabId);
+  const wait = await navigation.wait(tabId);
+  return { success: true, wait };
+}
+
+// Return a pooled tab to a blank state, optionally wiping what the page stored
+async function resetTab(tabId, clearStorage = false) {
+  if (clearStorage) {
+    try {
+      await chrome.scripting.executeScript({ target: { tabId }, func: clearPageStorage });
+    } catch (error) {
+      // Blank or restricted page - nothing to clear
+    }
+  }
+  const navigation = startNavigationWait('about:blank', {}, tabId);
+  await chrome.tabs.update(tabId, { url: 'about:blank', muted: false });
+  await navigation.wait(tabId);
   return { success: true };
 }
 
+// Injected: storage the page's origin can reach (HttpOnly cookies are out of reach)
+async function clearPageStorage() {
+  try { localStorage.clear(); } catch (error) {}
+  try { sessionStorage.clear(); } catch (error) {}
+  document.cookie.split(';').forEach(cookie => {
+    const name = cookie.split('=')[0].trim();
+    if (name) document.cookie = `${name}=; expires=Thu, 01 Jan 1970 00:00:00 GMT; path=/`;
+  });
+  if (self.caches) {
+    for (const key of await caches.keys()) await caches.delete(key);
+  }
+  if (indexedDB.databases) {
+    for (const db of await indexedDB.databases()) indexedDB.deleteDatabase(db.name);
+  }
+  return true;
+}
+
+// Best-effort wait between harvest rounds; the harvest's own budget decides when to give up
 async function waitForTabLoad(tabId, timeout = 30000) {
   return new Promise((resolve) => {
     const listener = (updatedTabId, info) => {
@@ -249,6 +440,189 @@ async function waitForTabLoad(tabId, timeout = 30000) {
   });
 }
 
+// Navigation Waits - how far a page must get before createTab/navigateTab/reloadTab return
+const WAIT_CONDITIONS = ['commit', 'domcontentloaded', 'load', 'networkidle', 'selector'];
+const DEFAULT_WAIT_TIMEOUT = 30000;
+// networkidle: no request in flight for this long after load
+const NETWORK_IDLE_MS = 500;
+const WAIT_POLL_INTERVAL = 100;
+const navigationWaits = new Set();
+
+function navigationOptions(message) {
+  return {
+    waitUntil: message.waitUntil,
+    selector: message.waitSelector,
+    timeout: message.waitTimeout
+  };
+}
+
+function navigationError(message, timedOut = false) {
+  const error = new Error(message);
+  error.timedOut = timedOut;
+  return error;
+}
+
+/**
+ * Start watching for a navigation before it is triggered
+ * 
+ * Page lifecycle events are recorded from the moment this is called, for
+ * `tabId` or - when the tab does not exist yet - for any tab. `wait(tabId)`
+ * then resolves with `{ condition, elapsedMs }` once the condition holds and
+ * rejects when the navigation fails, the tab closes or the timeout passes.
+ */
+function startNavigationWait(url, options = {}, tabId = null) {
+  const condition = options.waitUntil || 'load';
+  const timeout = options.timeout || DEFAULT_WAIT_TIMEOUT;
+  if (!WAIT_CONDITIONS.includes(condition)) throw new Error(`Unknown wait condition: ${condition}`);
+  if (condition === 'selector' && !options.selector) throw new Error('waitUntil "selector" requires a selector');
+  
+  const started = Date.now();
+  const waiter = { tabId, pages: new Map(), wake: null };
+  const elapsed = () => Date.now() - started;
+  
+  // A blank page has nothing to load
+  if (url === 'about:blank' && condition !== 'selector') {
+    return { wait: async () => ({ condition, elapsedMs: 0 }) };
+  }
+  navigationWaits.add(waiter);
+  
+  const satisfied = async (id, page) => {
+    if (!page) return false;
+    switch (condition) {
+      case 'commit':
+        return page.committed;
+      case 'domcontentloaded':
+        return page.domContentLoaded;
+      case 'load':
+        return page.loaded;
+      case 'networkidle':
+        return page.loaded && page.requests.size === 0 && Date.now() - page.lastActivity >= NETWORK_IDLE_MS;
+      case 'selector': {
+        // Before the commit the old document is still in the tab
+        if (!page.committed) return false;
+        try {
+          const [{ result }] = await chrome.scripting.executeScript({
+            target: { tabId: id },
+            func: (selector) => document.querySelector(selector) !== null,
+            args: [options.selector]
+          });
+          return result;
+        } catch (error) {
+          // Document is being replaced - try again on the next poll
+          return false;
+        }
+      }
+    }
+  };
+  
+  const wait = async (id) => {
+    waiter.tabId = id;
+    try {
+      while (true) {
+        const page = waiter.pages.get(id);
+        if (page && page.error) throw navigationError(`Navigation failed: ${page.error}`);
+        if (await satisfied(id, page)) return { condition, elapsedMs: elapsed() };
+        
+        const remaining = timeout - elapsed();
+        if (remaining <= 0) {
+          const target = condition === 'selector' ? `selector "${options.selector}"` : condition;
+          throw navigationError(`Timed out after ${timeout}ms waiting for ${target}`, true);
+        }
+        await new Promise(resolve => {
+          waiter.wake = resolve;
+          setTimeout(resolve, Math.min(remaining, WAIT_POLL_INTERVAL));
+        });
+      }
+    } finally {
+      navigationWaits.delete(waiter);
+    }
+  };
+  
+  return { wait };
+}
+
+// Feed a lifecycle event to every wait watching the tab
+function recordNavigation(tabId, update) {
+  for (const waiter of navigationWaits) {
+    if (waiter.tabId !== null && waiter.tabId !== tabId) continue;
+    let page = waiter.pages.get(tabId);
+    if (!page) {
+      page = { committed: false, domContentLoaded: false, loaded: false, requests: new Set(), lastActivity: Date.now(), error: null };
+      waiter.pages.set(tabId, page);
+    }
+    update(page);
+    if (waiter.wake) waiter.wake();
+  }
+}
+
+chrome.webNavigation.onCommitted.addListener((details) => {
+  if (details.frameId !== 0) return;
+  recordNavigation(details.tabId, page => {
+    // A new document (e.g. a client-side redirect) starts its lifecycle over
+    page.committed = true;
+    page.domContentLoaded = false;
+    page.loaded = false;
+    page.error = null;
+  });
+});
+
+chrome.webNavigation.onDOMContentLoaded.addListener((details) => {
+  if (details.frameId !== 0) return;
+  recordNavigation(details.tabId, page => {
+    page.committed = true;
+    page.domContentLoaded = true;
+  });
+});
+
+chrome.webNavigation.onCompleted.addListener((details) => {
+  if (details.frameId !== 0) return;
+  recordNavigation(details.tabId, page => {
+    page.committed = page.domContentLoaded = page.loaded = true;
+  });
+});
+
+// Same-document navigations (a fragment change or history.pushState) fire
+// none of the events above: the document they land on is already loaded
+function recordSameDocumentNavigation(details) {
+  if (details.frameId !== 0) return;
+  recordNavigation(details.tabId, page => {
+    page.committed = page.domContentLoaded = page.loaded = true;
+    page.error = null;
+  });
+}
+
+chrome.webNavigation.onReferenceFragmentUpdated.addListener(recordSameDocumentNavigation);
+chrome.webNavigation.onHistoryStateUpdated.addListener(recordSameDocumentNavigation);
+
+chrome.webNavigation.onErrorOccurred.addListener((details) => {
+  // Aborted loads are superseded by another navigation, not failures
+  if (details.frameId !== 0 || details.error === 'net::ERR_ABORTED') return;
+  recordNavigation(details.tabId, page => { page.error = details.error; });
+});
+
+chrome.tabs.onRemoved.addListener((tabId) => {
+  recordNavigation(tabId, page => { page.error = 'tab was closed'; });
+});
+
+chrome.webRequest.onBeforeRequest.addListener((details) => {
+  if (details.tabId < 0) return;
+  recordNavigation(details.tabId, page => {
+    page.requests.add(details.requestId);
+    page.lastActivity = Date.now();
+  });
+}, { urls: ['<all_urls>'] });
+
+function settleRequest(details) {
+  if (details.tabId < 0) return;
+  recordNavigation(details.tabId, page => {
+    page.requests.delete(details.requestId);
+    page.lastActivity = Date.now();
+  });
+}
+
+chrome.webRequest.onCompleted.addListener(settleRequest, { urls: ['<all_urls>'] });
+chrome.webRequest.onErrorOccurred.addListener(settleRequest, { urls: ['<all_urls>'] });
+
 // Content Extraction
 async function getContent(tabId, format = 'html') {
   const results = await chrome.scripting.executeScript({
@@ -275,6 +649,19 @@ async function getMetadata(tabId) {
   };
 }
 
+async function extract(tabId, schema) {
+  const results = await chrome.scripting.executeScript({
+    target: { tabId },
+    func: performExtraction,
+    args: [schema]
+  });
+  
+  return {
+    success: true,
+    result: results[0].result
+  };
+}
+
 // Injected Functions
 // Always extract HTML - Python will handle markdown conversion
 function extractPageContent() {
@@ -315,6 +702,203 @@ function extractMetadata() {
   return metadata;
 }
 
+// Structured extraction - evaluate field selectors over every container match
+function performExtraction(schema) {
+  const started = performance.now();
+  const { container, fields = {}, limit, session, key } = schema;
+  
+  // "text" (default), "html", or any attribute name
+  const read = (el, attribute) => {
+    if (!attribute || attribute === 'text') return el.innerText?.trim() ?? el.textContent.trim();
+    if (attribute === 'html') return el.innerHTML.trim();
+    return el.getAttribute(attribute);
+  };
+  
+  const transform = (value, spec) => {
+    if (value === null || value === undefined) return null;
+    
+    if (spec.regex) {
+      const match = String(value).match(new RegExp(spec.regex));
+      if (!match) return null;
+      value = match[1] ?? match[0];
+    }
+    
+    for (const name of spec.transforms || []) {
+      if (value === null) break;
+      switch (name) {
+        case 'trim': value = String(value).trim(); break;
+        case 'collapse': value = String(value).replace(/\s+/g, ' ').trim(); break;
+        case 'lower': value = String(value).toLowerCase(); break;
+        case 'upper': value = String(value).toUpperCase(); break;
+        case 'number': {
+          const number = parseFloat(String(value).replace(/[^0-9.\-]/g, ''));
+          value = Number.isNaN(number) ? null : number;
+          break;
+        }
+        case 'integer': {
+          const number = parseInt(String(value).replace(/[^0-9\-]/g, ''), 10);
+          value = Number.isNaN(number) ? null : number;
+          break;
+        }
+        case 'absolute_url':
+          try { value = new URL(value, document.baseURI).href; } catch (error) { value = null; }
+          break;
+      }
+    }
+    return value;
+  };
+  
+  const readField = (root, spec) => {
+    const targets = !spec.selector
+      ? [root]
+      : spec.all
+        ? Array.from(root.querySelectorAll(spec.selector))
+        : [root.querySelector(spec.selector)].filter(Boolean);
+    const values = targets.map(el => transform(read(el, spec.attribute), spec));
+    
+    if (spec.all) return values.filter(value => value !== null);
+    return values.length && values[0] !== null && values[0] !== '' ? values[0] : (spec.default ?? null);
+  };
+  
+  const items = container ? Array.from(document.querySelectorAll(container)) : [document.documentElement];
+  
+  // Harvest rounds keep per-document memory so only new items are read and returned
+  let state = null;
+  let pending = items;
+  if (session) {
+    window.__automationHarvest = window.__automationHarvest || {};
+    state = window.__automationHarvest[session] =
+      window.__automationHarvest[session] || { nodes: new WeakSet(), keys: new Set() };
+    pending = items.filter(item => !state.nodes.has(item));
+    pending.forEach(item => state.nodes.add(item));
+  }
+  
+  let rows = (limit ? pending.slice(0, limit) : pending).map(item => {
+    const row = {};
+    for (const [name, spec] of Object.entries(fields)) {
+      row[name] = readField(item, spec);
+    }
+    return row;
+  });
+  
+  let keys;
+  if (state) {
+    // Re-rendered nodes can repeat an item - dedupe on the key field or the whole row
+    const fresh = rows
+      .map(row => ({ row, id: key ? String(row[key]) : JSON.stringify(row) }))
+      .filter(({ id }) => !state.keys.has(id) && state.keys.add(id));
+    rows = fresh.map(({ row }) => row);
+    keys = fresh.map(({ id }) => id);
+  }
+  
+  return {
+    url: window.location.href,
+    title: document.title,
+    readyState: document.readyState,
+    matched: items.length,
+    rows,
+    keys,
+    durationMs: Math.round((performance.now() - started) * 10) / 10
+  };
+}
+
+// Harvesting - scroll or page through a feed, streaming only new items
+async function harvest(tabId, options, job) {
+  const {
+    requestId, schema, key, mode = 'scroll', nextSelector,
+    maxItems = 500, maxRounds = 50, idleRounds = 3, timeBudget = 60000, wait = 1000
+  } = options;
+  const started = Date.now();
+  // Page memory is lost when "next" navigates, so keys are also kept here
+  const seen = new Set();
+  let total = 0;
+  let rounds = 0;
+  let idle = 0;
+  let stopReason = null;
+  
+  try {
+    while (!stopReason) {
+      if (job.cancelled) throw new Error('Cancelled');
+      rounds++;
+      
+      const [{ result }] = await chrome.scripting.executeScript({
+        target: { tabId },
+        func: performExtraction,
+        args: [{ ...schema, session: requestId, key }]
+      });
+      
+      const items = [];
+      result.rows.forEach((row, i) => {
+        if (items.length + total >= maxItems || seen.has(result.keys[i])) return;
+        seen.add(result.keys[i]);
+        items.push(row);
+      });
+      
+      if (items.length) {
+        total += items.length;
+        idle = 0;
+        sendStream(requestId, { round: rounds, items, total });
+      } else {
+        idle++;
+      }
+      
+      if (total >= maxItems) stopReason = 'max_items';
+      else if (idle >= idleRounds) stopReason = 'no_growth';
+      else if (rounds >= maxRounds) stopReason = 'max_rounds';
+      else if (Date.now() - started + wait > timeBudget) stopReason = 'time_budget';
+      if (stopReason) break;
+      
+      const [{ result: advanced }] = await chrome.scripting.executeScript({
+        target: { tabId },
+        func: advanceHarvest,
+        args: [mode, nextSelector]
+      });
+      if (!advanced) {
+        stopReason = 'no_next';
+        break;
+      }
+      
+      for (let waited = 0; waited < wait && !job.cancelled; waited += 100) {
+        await new Promise(resolve => setTimeout(resolve, 100));
+      }
+      const tab = await chrome.tabs.get(tabId);
+      if (tab.status === 'loading') {
+        await waitForTabLoad(tabId, Math.max(1000, timeBudget - (Date.now() - started)));
+      }
+    }
+  } finally {
+    chrome.scripting.executeScript({
+      target: { tabId },
+      func: (session) => { if (window.__automationHarvest) delete window.__automationHarvest[session]; },
+      args: [requestId]
+    }).catch(() => {});
+  }
+  
+  return {
+    success: true,
+    total,
+    rounds,
+    stopReason,
+    durationMs: Date.now() - started
+  };
+}
+
+// Injected: load more items by scrolling to the bottom or clicking "next"
+function advanceHarvest(mode, nextSelector) {
+  if (mode === 'next') {
+    const next = document.querySelector(nextSelector);
+    if (!next || next.disabled || next.getAttribute('aria-disabled') === 'true') return false;
+    next.scrollIntoView({ block: 'center' });
+    next.click();
+    return true;
+  }
+  
+  const scroller = document.scrollingElement || document.documentElement;
+  scroller.scrollTop = scroller.scrollHeight;
+  window.dispatchEvent(new Event('scroll'));
+  return true;
+}
+
 // Page Interactions
 async function interact(tabId, interaction) {
   const results = await chrome.scripting.executeScript({
@@ -330,7 +914,8 @@ async function interact(tabId, interaction) {
 }
 
 function performInteraction(interaction) {
-  const { action, selector, value, timeout } = interaction;
+  const { action, selector, value, timeout, requestId } = interaction;
+  const isCancelled = () => !!(window.__automationCancelled && window.__automationCancelled[requestId]);
   
   return new Promise((resolve, reject) => {
     try {
@@ -393,13 +978,26 @@ function performInteraction(interaction) {
           break;
           
         case 'wait':
-          setTimeout(() => resolve({ success: true, action: 'wait', duration: timeout }), timeout || 1000);
+          let waited = 0;
+          const tick = () => {
+            if (isCancelled()) {
+              reject(new Error('Cancelled'));
+            } else if (waited >= (timeout || 1000)) {
+              resolve({ success: true, action: 'wait', duration: timeout });
+            } else {
+              waited += 100;
+              setTimeout(tick, 100);
+            }
+          };
+          tick();
           break;
           
         case 'waitForElement':
           let elapsed = 0;
           const check = () => {
-            if (document.querySelector(selector)) {
+            if (isCancelled()) {
+              reject(new Error('Cancelled'));
+            } else if (document.querySelector(selector)) {
               resolve({ success: true, action: 'waitForElement', selector });
             } else if (elapsed >= (timeout || 5000)) {
               reject(new Error(`Timeout waiting for: ${selector}`));
@@ -473,6 +1071,359 @@ function performInteraction(interaction) {
   });
 }
 
+// Workflows - run a list of steps in an injected script, re-injecting after a step navigates
+const MAX_WORKFLOW_NAVIGATIONS = 5;
+// How long a click that fired beforeunload has to commit before it counts as no navigation
+const WORKFLOW_COMMIT_GRACE = 1000;
+// Latest step state per running workflow, reported by the page as each step finishes
+const workflowProgress = new Map();
+
+chrome.runtime.onMessage.addListener((message) => {
+  if (message && message.type === 'workflowProgress' && workflowProgress.has(message.requestId)) {
+    workflowProgress.set(message.requestId, message.state);
+  }
+});
+
+async function runWorkflow(tabId, workflow, job) {
+  const { requestId } = workflow;
+  const started = Date.now();
+  let navigations = 0;
+  let committed = false;
+  const onCommitted = (details) => {
+    if (details.tabId === tabId && details.frameId === 0) committed = true;
+  };
+  chrome.webNavigation.onCommitted.addListener(onCommitted);
+  workflowProgress.set(requestId, null);
+  
+  try {
+    while (true) {
+      if (job.cancelled) throw new Error('Cancelled');
+      committed = false;
+      let result = null;
+      try {
+        [{ result }] = await chrome.scripting.executeScript({
+          target: { tabId },
+          func: performWorkflow,
+          args: [{ ...workflow, resume: workflowProgress.get(requestId) || undefined }]
+        });
+      } catch (error) {
+        // The document was replaced before the script could say it was leaving
+        if (!committed) throw error;
+      }
+      
+      if (result && !result.navigating) {
+        return {
+          success: true,
+          result: { ...result, durationMs: Date.now() - started, navigations }
+        };
+      }
+      if (result) workflowProgress.set(requestId, result.state);
+      if (++navigations > MAX_WORKFLOW_NAVIGATIONS) {
+        throw new Error(`Workflow navigated more than ${MAX_WORKFLOW_NAVIGATIONS} times`);
+      }
+      await waitForWorkflowPage(tabId, () => committed, job);
+    }
+  } finally {
+    chrome.webNavigation.onCommitted.removeListener(onCommitted);
+    workflowProgress.delete(requestId);
+  }
+}
+
+// Wait for the document a step navigated to; a click whose navigation never commits resumes in place
+async function waitForWorkflowPage(tabId, hasCommitted, job) {
+  const started = Date.now();
+  while (true) {
+    if (job.cancelled) throw new Error('Cancelled');
+    const tab = await chrome.tabs.get(tabId);
+    const elapsed = Date.now() - started;
+    if (tab.status === 'complete' && (hasCommitted() || elapsed >= WORKFLOW_COMMIT_GRACE)) return;
+    if (elapsed >= DEFAULT_WAIT_TIMEOUT) {
+      throw navigationError(`Page did not load within ${DEFAULT_WAIT_TIMEOUT}ms after a workflow step navigated`, true);
+    }
+    await new Promise(resolve => setTimeout(resolve, WAIT_POLL_INTERVAL));
+  }
+}
+
+function performWorkflow(workflow) {
+  const { steps = [], stopOnError = true, requestId, resume } = workflow;
+  const isCancelled = () => !!(window.__automationCancelled && window.__automationCancelled[requestId]);
+  const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+  const elapsedSince = (start) => Math.round((performance.now() - start) * 10) / 10;
+  
+  const started = performance.now();
+  // State carried over when a step navigated and the workflow continues in the new document
+  const results = resume ? [...resume.results] : [];
+  const outputs = resume ? { ...resume.outputs } : {};
+  let failedStep = resume ? resume.failedStep : null;
+  let error = resume ? resume.error : null;
+  const done = new Map(results.map(entry => [entry.path, entry]));
+  
+  // Fired when a click starts a navigation: the rest runs in the next document
+  let leaving = false;
+  window.addEventListener('beforeunload', () => { leaving = true; }, { once: true });
+  const leave = new Error('Navigating');
+  
+  // Progress survives the document being torn down mid-workflow
+  const report = () => {
+    try {
+      chrome.runtime.sendMessage({
+        type: 'workflowProgress', requestId, state: { results, outputs, failedStep, error }
+      }).catch(() => {});
+    } catch (sendError) {
+      // Extension context unavailable - the workflow just cannot resume
+    }
+  };
+  
+  const find = (selector) => {
+    const el = document.querySelector(selector);
+    if (!el) throw new Error(`Element not found: ${selector}`);
+    return el;
+  };
+  
+  const waitFor = async (selector, timeout) => {
+    let elapsed = 0;
+    while (true) {
+      if (isCancelled()) throw new Error('Cancelled');
+      const el = document.querySelector(selector);
+      if (el) return el;
+      if (elapsed >= timeout) throw new Error(`Timeout waiting for: ${selector}`);
+      await sleep(100);
+      elapsed += 100;
+    }
+  };
+  
+  // "text" (default), "html", or any attribute name
+  const read = (el, attribute) => {
+    if (!attribute || attribute === 'text') return el.innerText;
+    if (attribute === 'html') return el.innerHTML;
+    return el.getAttribute(attribute);
+  };
+  
+  const extract = (step) => {
+    const nodes = step.all
+      ? Array.from(document.querySelectorAll(step.selector))
+      : [find(step.selector)];
+    const limited = step.limit ? nodes.slice(0, step.limit) : nodes;
+    
+    // fields: { name: "sub-selector" or "sub-selector@attribute" }
+    const record = (node) => {
+      if (!step.fields) return read(node, step.attribute);
+      const data = {};
+      for (const [key, spec] of Object.entries(step.fields)) {
+        const [selector, attribute] = spec.split('@');
+        const target = selector ? node.querySelector(selector) : node;
+        data[key] = target ? read(target, attribute) : null;
+      }
+      return data;
+    };
+    
+    const values = limited.map(record);
+    return step.all ? values : values[0];
+  };
+  
+  const runStep = async (step) => {
+    const { action, selector, value } = step;
+    
+    switch (action) {
+      case 'click': {
+        const el = find(selector);
+        el.scrollIntoView({ behavior: 'smooth', block: 'center' });
+        await sleep(300);
+        el.click();
+        return { elementTag: el.tagName, elementText: el.innerText?.substring(0, 50) || '' };
+      }
+      case 'input': {
+        const el = find(selector);
+        el.focus();
+        el.value = value;
+        el.dispatchEvent(new Event('input', { bubbles: true }));
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        el.dispatchEvent(new KeyboardEvent('keydown', { bubbles: true }));
+        el.dispatchEvent(new KeyboardEvent('keyup', { bubbles: true }));
+        return { elementTag: el.tagName, elementType: el.type || 'text' };
+      }
+      case 'select': {
+        const el = find(selector);
+        el.value = value;
+        el.dispatchEvent(new Event('change', { bubbles: true }));
+        return { value };
+      }
+      case 'wait': {
+        const duration = step.timeout ?? 1000;
+        for (let waited = 0; waited < duration; waited += 100) {
+          if (isCancelled()) throw new Error('Cancelled');
+          await sleep(100);
+        }
+        return { duration };
+      }
+      case 'waitForElement':
+        await waitFor(selector, step.timeout ?? 5000);
+        return {};
+      case 'getText':
+        return { value: find(selector).innerText };
+      case 'getAttribute':
+        return { value: find(selector).getAttribute(step.attribute || value) };
+      case 'extract':
+        return { value: extract(step) };
+      default:
+        throw new Error(`Unknown workflow action: ${action}`);
+    }
+  };
+  
+  const runSteps = async (list, prefix) => {
+    for (let i = 0; i < list.length; i++) {
+      const step = list[i];
+      const entry = { path: `${prefix}${i}`, action: step.action };
+      if (step.name) entry.name = step.name;
+      
+      // Ran before the navigation: only descend into the branch it took
+      const previous = done.get(entry.path);
+      if (previous) {
+        if (previous.branch) await runSteps(step[previous.branch] || [], `${entry.path}.${previous.branch}.`);
+        continue;
+      }
+      
+      if (failedStep !== null && stopOnError) {
+        results.push({ ...entry, skipped: true });
+        continue;
+      }
+      if (isCancelled()) throw new Error('Cancelled');
+      
+      const stepStarted = performance.now();
+      try {
+        if (step.action === 'if') {
+          // Branch on element presence, optionally waiting up to `timeout` ms for it
+          let present = !!document.querySelector(step.selector);
+          if (!present && step.timeout) {
+            present = await waitFor(step.selector, step.timeout).then(() => true, () => false);
+          }
+          const branch = present === (step.exists !== false) ? 'then' : 'else';
+          results.push({ ...entry, success: true, present, branch, durationMs: elapsedSince(stepStarted) });
+          report();
+          await runSteps(step[branch] || [], `${entry.path}.${branch}.`);
+          continue;
+        }
+        
+        const result = await runStep(step);
+        if (step.name && 'value' in result) outputs[step.name] = result.value;
+        results.push({ ...entry, success: true, result, durationMs: elapsedSince(stepStarted) });
+        report();
+        if (step.action === 'click') {
+          // Give a navigation started by the click a moment to announce itself
+          await sleep(50);
+          if (leaving) throw leave;
+        }
+      } catch (stepError) {
+        if (stepError === leave || stepError.message === 'Cancelled') throw stepError;
+        results.push({ ...entry, success: false, error: stepError.message, durationMs: elapsedSince(stepStarted) });
+        report();
+        if (!step.optional && failedStep === null) {
+          failedStep = entry.path;
+          error = stepError.message;
+        }
+      }
+    }
+  };
+  
+  const finish = () => ({
+    completed: failedStep === null,
+    failedStep,
+    error,
+    outputs,
+    steps: results,
+    durationMs: elapsedSince(started)
+  });
+  return runSteps(steps, '').then(finish, (runError) => {
+    if (runError === leave) return { navigating: true, state: { results, outputs, failedStep, error } };
+    throw runError;
+  });
+}
+
+// Tab State Sync - push chrome.tabs events so the server can mirror the tab table
+let tabEventSeq = 0;
+
+function serializeTab(tab) {
+  return {
+    id: tab.id,
+    url: tab.url || tab.pendingUrl || '',
+    title: tab.title || '',
+    active: tab.active,
+    windowId: tab.windowId,
+    index: tab.index,
+    pinned: tab.pinned,
+    status: tab.status,
+    favIconUrl: tab.favIconUrl
+  };
+}
+
+function sendTabEvent(event, data) {
+  tabEventSeq += 1;
+  if (ws && ws.readyState === WebSocket.OPEN) {
+    ws.send(JSON.stringify({ type: 'tabEvent', event, seq: tabEventSeq, ...data }));
+  }
+}
+
+// Moves shift the index of every tab in the window, so resend them all
+async function sendWindowTabs(windowId) {
+  const tabs = await chrome.tabs.query({ windowId });
+  tabs.forEach(tab => sendTabEvent('updated', { tabId: tab.id, tab: serializeTab(tab) }));
+}
+
+chrome.tabs.onCreated.addListener((tab) => {
+  sendTabEvent('created', { tabId: tab.id, tab: serializeTab(tab) });
+});
+
+chrome.tabs.onUpdated.addListener((tabId, changeInfo, tab) => {
+  sendTabEvent('updated', { tabId, changeInfo, tab: serializeTab(tab) });
+});
+
+chrome.tabs.onRemoved.addListener((tabId, removeInfo) => {
+  sendTabEvent('removed', { tabId, windowId: removeInfo.windowId });
+});
+
+chrome.tabs.onActivated.addListener(({ tabId, windowId }) => {
+  sendTabEvent('activated', { tabId, windowId });
+});
+
+chrome.tabs.onMoved.addListener((tabId, moveInfo) => sendWindowTabs(moveInfo.windowId));
+chrome.tabs.onAttached.addListener((tabId, attachInfo) => sendWindowTabs(attachInfo.newWindowId));
+chrome.tabs.onDetached.addListener((tabId, detachInfo) => sendWindowTabs(detachInfo.oldWindowId));
+
+chrome.windows.onFocusChanged.addListener((windowId) => {
+  sendTabEvent('focusChanged', { windowId });
+});
+
+// Navigation Events - main frame only, forwarded to API event subscribers
+function sendNavEvent(event, details, extra = {}) {
+  if (details.frameId !== 0) return;
+  if (ws && ws.readyState === WebSocket.OPEN) {
+    ws.send(JSON.stringify({
+      type: 'navEvent',
+      event,
+      tabId: details.tabId,
+      url: details.url,
+      timeStamp: details.timeStamp,
+      ...extra
+    }));
+  }
+}
+
+chrome.webNavigation.onCommitted.addListener((details) => {
+  sendNavEvent('committed', details, { transitionType: details.transitionType });
+});
+
+chrome.webNavigation.onDOMContentLoaded.addListener((details) => {
+  sendNavEvent('domContentLoaded', details);
+});
+
+chrome.webNavigation.onCompleted.addListener((details) => {
+  sendNavEvent('completed', details);
+});
+
+chrome.webNavigation.onErrorOccurred.addListener((details) => {
+  sendNavEvent('errorOccurred', details, { error: details.error });
+});
+
 // Initialize
 chrome.runtime.onInstalled.addListener(() => {
   console.log('Chrome Automation API extension installed');
@@ -4,6 +4,7 @@
  */
 
 import { TabManager } from './tabs.js';
+import { navigationOptions } from './navigation.js';
 import { ContentExtractor } from './content.js';
 import { InteractionManager } from './interactions.js';
 
@@ -12,73 +13,187 @@ export class CommandHandler {
     this.tabManager = new TabManager();
     this.contentExtractor = new ContentExtractor();
     this.interactionManager = new InteractionManager();
+    this.inflight = new Map();
+    this.sendMessage = null;
+  }
+  
+  /**
+   * Set the function used to push streamed partial results to the server
+   */
+  setSender(send) {
+    this.sendMessage = send;
+  }
+  
+  /**
+   * Abandon an in-flight command: abort its in-page waits and drop its result
+   */
+  async cancel(requestId, tabIds = []) {
+    const job = this.inflight.get(requestId);
+    if (!job) return;
+    job.cancelled = true;
+    
+    // Every sub-command's tab for a batch
+    await Promise.all(tabIds.map(tabId => this.interactionManager.cancel(tabId, requestId)));
   }
   
   async handle(message) {
-    const { action, requestId } = message;
+    if (message.type === 'cancel') {
+      await this.cancel(message.requestId, message.tabIds);
+      return null;
+    }
+    
+    const { requestId } = message;
+    const job = { cancelled: false };
+    this.inflight.set(requestId, job);
     
     try {
-      let result;
-      
-      switch (action) {
-        case 'createTab':
-          result = await this.tabManager.createTab(message.url, message.active);
-          break;
-          
-        case 'getTabs':
-          result = await this.tabManager.getTabs(message.filter);
-          break;
-          
-        case 'getActiveTab':
-          result = await this.tabManager.getActiveTab();
-          break;
-          
-        case 'navigateTab':
-          result = await this.tabManager.navigateTab(message.tabId, message.url);
-          break;
-          
-        case 'activateTab':
-          result = await this.tabManager.activateTab(message.tabId);
-          break;
-          
-        case 'closeTab':
-          result = await this.tabManager.closeTab(message.tabId);
-          break;
-          
-        case 'reloadTab':
-          result = await this.tabManager.reloadTab(message.tabId, message.bypassCache);
-          break;
-          
-        case 'getContent':
-          result = await this.contentExtractor.getContent(
-            message.tabId, 
-            message.format || 'html'
-          );
-          break;
-          
-        case 'getMetadata':
-          result = await this.contentExtractor.getPageMetadata(message.tabId);
-          break;
-          
-        case 'interact':
-          result = await this.interactionManager.interact(
-            message.tabId, 
-            message.interaction
-          );
-          break;
-          
-        default:
-          throw new Error(`Unknown action: ${action}`);
-      }
+      const result = await this.dispatch(message, job);
       
+      // Skip serializing results nobody is waiting for
+      if (job.cancelled) return null;
       return { ...result, requestId };
       
     } catch (error) {
+      if (job.cancelled) return null;
       return { 
         success: false, 
         error: error.message,
+        timedOut: error.timedOut || undefined,
         requestId 
       };
+    } finally {
+      this.inflight.delete(requestId);
     }
   }
+  
+  async dispatch(message, job) {
+    const { action, requestId } = message;
+    
+    switch (action) {
+      case 'createTab':
+        return await this.tabManager.createTab(
+          message.url, message.active, message.windowId, navigationOptions(message)
+        );
+        
+      case 'createWindow':
+        return await this.tabManager.createWindow(message.url);
+        
+      case 'getTabs':
+        return await this.tabManager.getTabs(message.filter);
+        
+      case 'syncTabs':
+        return await this.tabManager.syncTabs();
+        
+      case 'getActiveTab':
+        return await this.tabManager.getActiveTab();
+        
+      case 'navigateTab':
+        return await this.tabManager.navigateTab(message.tabId, message.url, navigationOptions(message));
+        
+      case 'activateTab':
+        return await this.tabManager.activateTab(message.tabId);
+        
+      case 'closeTab':
+        return await this.tabManager.closeTab(message.tabId);
+        
+      case 'reloadTab':
+        return await this.tabManager.reloadTab(message.tabId, message.bypassCache, navigationOptions(message));
+        
+      case 'resetTab':
+        return await this.tabManager.resetTab(message.tabId, message.clearStorage);
+        
+      case 'getContent':
+        return await this.contentExtractor.getContent(
+          message.tabId, 
+          message.format || 'html'
+        );
+        
+      case 'getMetadata':
+        return await this.contentExtractor.getPageMetadata(message.tabId);
+        
+      case 'extract':
+        return await this.contentExtractor.extract(message.tabId, message.schema);
+        
+      case 'harvest':
+        return await this.contentExtractor.harvest(
+          message.tabId, 
+          { ...message.harvest, requestId },
+          job,
+          this.sendMessage
+        );
+        
+      case 'interact':
+        return await this.interactionManager.interact(
+          message.tabId, 
+          { ...message.interaction, requestId }
+        );
+        
+      case 'runWorkflow':
+        return await this.interactionManager.runWorkflow(
+          message.tabId, 
+          { ...message.workflow, requestId },
+          job
+        );
+        
+      case 'batch':
+        return await this.runBatch(message, job);
+        
+      default:
+        throw new Error(`Unknown action: ${action}`);
+    }
+  }
+  
+  /**
+   * Run several commands sequentially or with bounded concurrency.
+   * With stopOnError, commands not yet started are reported as skipped
+   * once one fails. Streamed batches push each result as it completes.
+   */
+  async runBatch(message, job) {
+    const { requestId, commands = [], mode = 'sequential', stopOnError = false, stream = false } = message;
+    const concurrency = Math.max(1, message.concurrency || 1);
+    const results = [];
+    let failed = false;
+    
+    const runOne = async (command) => {
+      let result;
+      
+      if (job.cancelled || (stopOnError && failed)) {
+        result = { index: command.index, success: false, skipped: true };
+      } else {
+        try {
+          if (command.action === 'batch') throw new Error('Batches cannot be nested');
+          const response = await this.dispatch({ ...command, requestId }, job);
+          result = { ...response, index: command.index, success: response.success !== false };
+        } catch (error) {
+          result = { index: command.index, success: false, error: error.message, timedOut: error.timedOut || undefined };
+        }
+        if (!result.success) failed = true;
+      }
+      
+      if (job.cancelled) return;
+      if (stream && this.sendMessage) {
+        this.sendMessage({ type: 'stream', requestId, data: result });
+      } else {
+        results.push(result);
+      }
+    };
+    
+    if (mode === 'parallel') {
+      let next = 0;
+      const worker = async () => {
+        while (next < commands.length) {
+          await runOne(commands[next++]);
+        }
+      };
+      await Promise.all(Array.from({ length: Math.min(concurrency, commands.length) }, worker));
+    } else {
+      for (const command of commands) {
+        await runOne(command);
+      }
+    }
+    
+    return stream && this.sendMessage
+      ? { success: true, count: commands.length }
+      : { success: true, results };
+  }
 }
@@ -5,7 +5,10 @@
 
 export class ConnectionManager {
   constructor(config) {
-    this.wsUrl = config.wsUrl;
+    // Candidate URLs, tried in turn until one accepts (e.g. server, then gateway)
+    this.wsUrls = config.wsUrls || [config.wsUrl];
+    this.wsUrlIndex = 0;
+    this.opened = false;
     this.reconnectDelay = config.reconnectDelay || 5000;
     this.heartbeatInterval = config.heartbeatInterval || 30000;
     
@@ -17,7 +20,8 @@ export class ConnectionManager {
   
   connect() {
     try {
-      this.ws = new WebSocket(this.wsUrl);
+      this.opened = false;
+      this.ws = new WebSocket(this.wsUrls[this.wsUrlIndex]);
       
       this.ws.onopen = () => this.handleOpen();
       this.ws.onmessage = (event) => this.handleMessage(event);
@@ -31,6 +35,7 @@ export class ConnectionManager {
   
   handleOpen() {
     console.log('✓ Connected to Chrome Automation API server');
+    this.opened = true;
     
     // Clear reconnect interval
     if (this.reconnectInterval) {
@@ -38,6 +43,13 @@ export class ConnectionManager {
       this.reconnectInterval = null;
     }
     
+    // Lets the server enforce heartbeats; builds without this are never dropped for missing them
+    this.send({
+      type: 'hello',
+      version: chrome.runtime.getManifest().version,
+      capabilities: ['heartbeat']
+    });
+    
     // Start heartbeat
     this.startHeartbeat();
   }
@@ -51,10 +63,16 @@ export class ConnectionManager {
         return;
       }
       
-      // Call message handler
+      // Answer server heartbeats immediately so the server can measure RTT
+      if (message.type === 'ping') {
+        this.send({ type: 'pong', id: message.id });
+        return;
+      }
+      
+      // Call message handler (cancelled commands and cancel notices yield no response)
       if (this.messageHandler) {
         const response = await this.messageHandler(message);
-        this.send(response);
+        if (response) this.send(response);
       }
       
     } catch (error) {
@@ -79,6 +97,11 @@ export class ConnectionManager {
     // Clear heartbeat
     this.stopHeartbeat();
     
+    // Refused or unreachable (e.g. an HTTP worker) - try the next URL
+    if (!this.opened) {
+      this.wsUrlIndex = (this.wsUrlIndex + 1) % this.wsUrls.length;
+    }
+    
     // Start reconnection
     if (!this.reconnectInterval) {
       this.reconnectInterval = setInterval(() => {
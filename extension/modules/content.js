@@ -41,6 +41,113 @@ export class ContentExtractor {
     }
   }
   
+  async extract(tabId, schema) {
+    try {
+      const results = await chrome.scripting.executeScript({
+        target: { tabId },
+        func: this.performExtraction,
+        args: [schema]
+      });
+      
+      return {
+        success: true,
+        result: results[0].result
+      };
+    } catch (error) {
+      throw new Error(`Failed to extract: ${error.message}`);
+    }
+  }
+  
+  /**
+   * Scroll or page through a feed, sending only new items each round
+   * until a stop condition (max items, no growth, rounds, time budget)
+   */
+  async harvest(tabId, options, job, send) {
+    const {
+      requestId, schema, key, mode = 'scroll', nextSelector,
+      maxItems = 500, maxRounds = 50, idleRounds = 3, timeBudget = 60000, wait = 1000
+    } = options;
+    const started = Date.now();
+    // Page memory is lost when "next" navigates, so keys are also kept here
+    const seen = new Set();
+    let total = 0;
+    let rounds = 0;
+    let idle = 0;
+    let stopReason = null;
+    // Without a sender (no streaming) items are returned with the result
+    const collected = [];
+    
+    try {
+      while (!stopReason) {
+        if (job.cancelled) throw new Error('Cancelled');
+        rounds++;
+        
+        const [{ result }] = await chrome.scripting.executeScript({
+          target: { tabId },
+          func: this.performExtraction,
+          args: [{ ...schema, session: requestId, key }]
+        });
+        
+        const items = [];
+        result.rows.forEach((row, i) => {
+          if (items.length + total >= maxItems || seen.has(result.keys[i])) return;
+          seen.add(result.keys[i]);
+          items.push(row);
+        });
+        
+        if (items.length) {
+          total += items.length;
+          idle = 0;
+          if (send) {
+            send({ type: 'stream', requestId, data: { round: rounds, items, total } });
+          } else {
+            collected.push(...items);
+          }
+        } else {
+          idle++;
+        }
+        
+        if (total >= maxItems) stopReason = 'max_items';
+        else if (idle >= idleRounds) stopReason = 'no_growth';
+        else if (rounds >= maxRounds) stopReason = 'max_rounds';
+        else if (Date.now() - started + wait > timeBudget) stopReason = 'time_budget';
+        if (stopReason) break;
+        
+        const [{ result: advanced }] = await chrome.scripting.executeScript({
+          target: { tabId },
+          func: this.advanceHarvest,
+          args: [mode, nextSelector]
+        });
+        if (!advanced) {
+          stopReason = 'no_next';
+          break;
+        }
+        
+        for (let waited = 0; waited < wait && !job.cancelled; waited += 100) {
+          await new Promise(resolve => setTimeout(resolve, 100));
+        }
+        while ((await chrome.tabs.get(tabId)).status === 'loading' && Date.now() - started < timeBudget) {
+          await new Promise(resolve => setTimeout(resolve, 100));
+        }
+      }
+    } finally {
+      chrome.scripting.executeScript({
+        target: { tabId },
+        func: (session) => { if (window.__automationHarvest) delete window.__automationHarvest[session]; },
+        args: [requestId]
+      }).catch(() => {});
+    }
+    
+    return {
+      success: true,
+      total,
+      rounds,
+      stopReason,
+      durationMs: Date.now() - started,
+      ...(send ? {} : { items: collected })
+    };
+  }
+  
   // Injected function - runs in page context
   // Always extract HTML - Python will handle markdown conversion
   extractPageContent() {
@@ -92,4 +199,120 @@ export class ContentExtractor {
     
     return metadata;
   }
+  
+  // Injected function - evaluates an extraction schema in page context
+  performExtraction(schema) {
+    const started = performance.now();
+    const { container, fields = {}, limit, session, key } = schema;
+    
+    // "text" (default), "html", or any attribute name
+    const read = (el, attribute) => {
+      if (!attribute || attribute === 'text') return el.innerText?.trim() ?? el.textContent.trim();
+      if (attribute === 'html') return el.innerHTML.trim();
+      return el.getAttribute(attribute);
+    };
+    
+    const transform = (value, spec) => {
+      if (value === null || value === undefined) return null;
+      
+      if (spec.regex) {
+        const match = String(value).match(new RegExp(spec.regex));
+        if (!match) return null;
+        value = match[1] ?? match[0];
+      }
+      
+      for (const name of spec.transforms || []) {
+        if (value === null) break;
+        switch (name) {
+          case 'trim': value = String(value).trim(); break;
+          case 'collapse': value = String(value).replace(/\s+/g, ' ').trim(); break;
+          case 'lower': value = String(value).toLowerCase(); break;
+          case 'upper': value = String(value).toUpperCase(); break;
+          case 'number': {
+            const number = parseFloat(String(value).replace(/[^0-9.\-]/g, ''));
+            value = Number.isNaN(number) ? null : number;
+            break;
+          }
+          case 'integer': {
+            const number = parseInt(String(value).replace(/[^0-9\-]/g, ''), 10);
+            value = Number.isNaN(number) ? null : number;
+            break;
+          }
+          case 'absolute_url':
+            try { value = new URL(value, document.baseURI).href; } catch (error) { value = null; }
+            break;
+        }
+      }
+      return value;
+    };
+    
+    const readField = (root, spec) => {
+      const targets = !spec.selector
+        ? [root]
+        : spec.all
+          ? Array.from(root.querySelectorAll(spec.selector))
+          : [root.querySelector(spec.selector)].filter(Boolean);
+      const values = targets.map(el => transform(read(el, spec.attribute), spec));
+      
+      if (spec.all) return values.filter(value => value !== null);
+      return values.length && values[0] !== null && values[0] !== '' ? values[0] : (spec.default ?? null);
+    };
+    
+    const items = container ? Array.from(document.querySelectorAll(container)) : [document.documentElement];
+    
+    // Harvest rounds keep per-document memory so only new items are read and returned
+    let state = null;
+    let pending = items;
+    if (session) {
+      window.__automationHarvest = window.__automationHarvest || {};
+      state = window.__automationHarvest[session] =
+        window.__automationHarvest[session] || { nodes: new WeakSet(), keys: new Set() };
+      pending = items.filter(item => !state.nodes.has(item));
+      pending.forEach(item => state.nodes.add(item));
+    }
+    
+    let rows = (limit ? pending.slice(0, limit) : pending).map(item => {
+      const row = {};
+      for (const [name, spec] of Object.entries(fields)) {
+        row[name] = readField(item, spec);
+      }
+      return row;
+    });
+    
+    let keys;
+    if (state) {
+      // Re-rendered nodes can repeat an item - dedupe on the key field or the whole row
+      const fresh = rows
+        .map(row => ({ row, id: key ? String(row[key]) : JSON.stringify(row) }))
+        .filter(({ id }) => !state.keys.has(id) && state.keys.add(id));
+      rows = fresh.map(({ row }) => row);
+      keys = fresh.map(({ id }) => id);
+    }
+    
+    return {
+      url: window.location.href,
+      title: document.title,
+      readyState: document.readyState,
+      matched: items.length,
+      rows,
+      keys,
+      durationMs: Math.round((performance.now() - started) * 10) / 10
+    };
+  }
+  
+  // Injected function - loads more items by scrolling to the bottom or clicking "next"
+  advanceHarvest(mode, nextSelector) {
+    if (mode === 'next') {
+      const next = document.querySelector(nextSelector);
+      if (!next || next.disabled || next.getAttribute('aria-disabled') === 'true') return false;
+      next.scrollIntoView({ block: 'center' });
+      next.click();
+      return true;
+    }
+    
+    const scroller = document.scrollingElement || document.documentElement;
+    scroller.scrollTop = scroller.scrollHeight;
+    window.dispatchEvent(new Event('scroll'));
+    return true;
+  }
 }
@@ -3,8 +3,24 @@
  * Handles DOM interactions
  */
 
+import { DEFAULT_WAIT_TIMEOUT, WAIT_POLL_INTERVAL, navigationError } from './navigation.js';
+
+const MAX_WORKFLOW_NAVIGATIONS = 5;
+// How long a click that fired beforeunload has to commit before it counts as no navigation
+const WORKFLOW_COMMIT_GRACE = 1000;
+
 export class InteractionManager {
   
+  constructor() {
+    // Latest step state per running workflow, reported by the page as each step finishes
+    this.workflowProgress = new Map();
+    chrome.runtime.onMessage.addListener((message) => {
+      if (message && message.type === 'workflowProgress' && this.workflowProgress.has(message.requestId)) {
+        this.workflowProgress.set(message.requestId, message.state);
+      }
+    });
+  }
+  
   async interact(tabId, interaction) {
     try {
       const results = await chrome.scripting.executeScript({
@@ -25,9 +41,93 @@ export class InteractionManager {
     }
   }
   
+  // Re-inject the remaining steps whenever one of them navigates the tab
+  async runWorkflow(tabId, workflow, job) {
+    const { requestId } = workflow;
+    const started = Date.now();
+    let navigations = 0;
+    let committed = false;
+    const onCommitted = (details) => {
+      if (details.tabId === tabId && details.frameId === 0) committed = true;
+    };
+    chrome.webNavigation.onCommitted.addListener(onCommitted);
+    this.workflowProgress.set(requestId, null);
+    
+    try {
+      while (true) {
+        if (job.cancelled) throw new Error('Cancelled');
+        committed = false;
+        let result = null;
+        try {
+          const results = await chrome.scripting.executeScript({
+            target: { tabId },
+            func: this.performWorkflow,
+            args: [{ ...workflow, resume: this.workflowProgress.get(requestId) || undefined }]
+          });
+          result = results && results[0] ? results[0].result : null;
+        } catch (error) {
+          // The document was replaced before the script could say it was leaving
+          if (!committed) throw error;
+        }
+        
+        if (result && !result.navigating) {
+          return {
+            success: true,
+            result: { ...result, durationMs: Date.now() - started, navigations },
+            tabId: tabId
+          };
+        }
+        if (result) this.workflowProgress.set(requestId, result.state);
+        if (++navigations > MAX_WORKFLOW_NAVIGATIONS) {
+          throw new Error(`Workflow navigated more than ${MAX_WORKFLOW_NAVIGATIONS} times`);
+        }
+        await this.waitForWorkflowPage(tabId, () => committed, job);
+      }
+    } catch (error) {
+      const wrapped = new Error(`Workflow failed: ${error.message}`);
+      wrapped.timedOut = error.timedOut;
+      throw wrapped;
+    } finally {
+      chrome.webNavigation.onCommitted.removeListener(onCommitted);
+      this.workflowProgress.delete(requestId);
+    }
+  }
+  
+  // Wait for the document a step navigated to; a click whose navigation never commits resumes in place
+  async waitForWorkflowPage(tabId, hasCommitted, job) {
+    const started = Date.now();
+    while (true) {
+      if (job.cancelled) throw new Error('Cancelled');
+      const tab = await chrome.tabs.get(tabId);
+      const elapsed = Date.now() - started;
+      if (tab.status === 'complete' && (hasCommitted() || elapsed >= WORKFLOW_COMMIT_GRACE)) return;
+      if (elapsed >= DEFAULT_WAIT_TIMEOUT) {
+        throw navigationError(`Page did not load within ${DEFAULT_WAIT_TIMEOUT}ms after a workflow step navigated`, true);
+      }
+      await new Promise(resolve => setTimeout(resolve, WAIT_POLL_INTERVAL));
+    }
+  }
+  
+  // Flag a request as cancelled inside the page so in-page waits stop polling
+  async cancel(tabId, requestId) {
+    try {
+      await chrome.scripting.executeScript({
+        target: { tabId },
+        func: (id) => {
+          window.__automationCancelled = window.__automationCancelled || {};
+          window.__automationCancelled[id] = true;
+        },
+        args: [requestId]
+      });
+    } catch (error) {
+      // Tab gone or not scriptable - nothing left to abort
+    }
+  }
+  
   // Injected function - runs in page context
   performInteraction(interaction) {
-    const { action, selector, value, timeout } = interaction;
+    const { action, selector, value, timeout, requestId } = interaction;
+    const isCancelled = () => !!(window.__automationCancelled && window.__automationCancelled[requestId]);
     
     return new Promise((resolve, reject) => {
       try {
@@ -90,9 +190,18 @@ export class InteractionManager {
             break;
             
           case 'wait':
-            setTimeout(() => {
-              resolve({ success: true, action: 'wait', duration: timeout });
-            }, timeout || 1000);
+            let waited = 0;
+            const tick = () => {
+              if (isCancelled()) {
+                reject(new Error('Cancelled'));
+              } else if (waited >= (timeout || 1000)) {
+                resolve({ success: true, action: 'wait', duration: timeout });
+              } else {
+                waited += 100;
+                setTimeout(tick, 100);
+              }
+            };
+            tick();
             break;
             
           case 'waitForElement':
@@ -101,7 +210,9 @@ export class InteractionManager {
             const maxTimeout = timeout || 5000;
             
             const checkElement = () => {
-              if (document.querySelector(selector)) {
+              if (isCancelled()) {
+                reject(new Error('Cancelled'));
+              } else if (document.querySelector(selector)) {
                 resolve({ success: true, action: 'waitForElement', selector });
               } else if (elapsed >= maxTimeout) {
                 reject(new Error(`Timeout waiting for element: ${selector}`));
@@ -179,4 +290,200 @@ export class InteractionManager {
       }
     });
   }
+  
+  // Injected function - runs a whole workflow in page context
+  performWorkflow(workflow) {
+    const { steps = [], stopOnError = true, requestId, resume } = workflow;
+    const isCancelled = () => !!(window.__automationCancelled && window.__automationCancelled[requestId]);
+    const sleep = (ms) => new Promise(resolve => setTimeout(resolve, ms));
+    const elapsedSince = (start) => Math.round((performance.now() - start) * 10) / 10;
+    
+    const started = performance.now();
+    // State carried over when a step navigated and the workflow continues in the new document
+    const results = resume ? [...resume.results] : [];
+    const outputs = resume ? { ...resume.outputs } : {};
+    let failedStep = resume ? resume.failedStep : null;
+    let error = resume ? resume.error : null;
+    const done = new Map(results.map(entry => [entry.path, entry]));
+    
+    // Fired when a click starts a navigation: the rest runs in the next document
+    let leaving = false;
+    window.addEventListener('beforeunload', () => { leaving = true; }, { once: true });
+    const leave = new Error('Navigating');
+    
+    // Progress survives the document being torn down mid-workflow
+    const report = () => {
+      try {
+        chrome.runtime.sendMessage({
+          type: 'workflowProgress', requestId, state: { results, outputs, failedStep, error }
+        }).catch(() => {});
+      } catch (sendError) {
+        // Extension context unavailable - the workflow just cannot resume
+      }
+    };
+    
+    const find = (selector) => {
+      const el = document.querySelector(selector);
+      if (!el) throw new Error(`Element not found: ${selector}`);
+      return el;
+    };
+    
+    const waitFor = async (selector, timeout) => {
+      let elapsed = 0;
+      while (true) {
+        if (isCancelled()) throw new Error('Cancelled');
+        const el = document.querySelector(selector);
+        if (el) return el;
+        if (elapsed >= timeout) throw new Error(`Timeout waiting for: ${selector}`);
+        await sleep(100);
+        elapsed += 100;
+      }
+    };
+    
+    // "text" (default), "html", or any attribute name
+    const read = (el, attribute) => {
+      if (!attribute || attribute === 'text') return el.innerText;
+      if (attribute === 'html') return el.innerHTML;
+      return el.getAttribute(attribute);
+    };
+    
+    const extract = (step) => {
+      const nodes = step.all
+        ? Array.from(document.querySelectorAll(step.selector))
+        : [find(step.selector)];
+      const limited = step.limit ? nodes.slice(0, step.limit) : nodes;
+      
+      // fields: { name: "sub-selector" or "sub-selector@attribute" }
+      const record = (node) => {
+        if (!step.fields) return read(node, step.attribute);
+        const data = {};
+        for (const [key, spec] of Object.entries(step.fields)) {
+          const [selector, attribute] = spec.split('@');
+          const target = selector ? node.querySelector(selector) : node;
+          data[key] = target ? read(target, attribute) : null;
+        }
+        return data;
+      };
+      
+      const values = limited.map(record);
+      return step.all ? values : values[0];
+    };
+    
+    const runStep = async (step) => {
+      const { action, selector, value } = step;
+      
+      switch (action) {
+        case 'click': {
+          const el = find(selector);
+          el.scrollIntoView({ behavior: 'smooth', block: 'center' });
+          await sleep(300);
+          el.click();
+          return { elementTag: el.tagName, elementText: el.innerText?.substring(0, 50) || '' };
+        }
+        case 'input': {
+          const el = find(selector);
+          el.focus();
+          el.value = value;
+          el.dispatchEvent(new Event('input', { bubbles: true }));
+          el.dispatchEvent(new Event('change', { bubbles: true }));
+          el.dispatchEvent(new KeyboardEvent('keydown', { bubbles: true }));
+          el.dispatchEvent(new KeyboardEvent('keyup', { bubbles: true }));
+          return { elementTag: el.tagName, elementType: el.type || 'text' };
+        }
+        case 'select': {
+          const el = find(selector);
+          el.value = value;
+          el.dispatchEvent(new Event('change', { bubbles: true }));
+          return { value };
+        }
+        case 'wait': {
+          const duration = step.timeout ?? 1000;
+          for (let waited = 0; waited < duration; waited += 100) {
+            if (isCancelled()) throw new Error('Cancelled');
+            await sleep(100);
+          }
+          return { duration };
+        }
+        case 'waitForElement':
+          await waitFor(selector, step.timeout ?? 5000);
+          return {};
+        case 'getText':
+          return { value: find(selector).innerText };
+        case 'getAttribute':
+          return { value: find(selector).getAttribute(step.attribute || value) };
+        case 'extract':
+          return { value: extract(step) };
+        default:
+          throw new Error(`Unknown workflow action: ${action}`);
+      }
+    };
+    
+    const runSteps = async (list, prefix) => {
+      for (let i = 0; i < list.length; i++) {
+        const step = list[i];
+        const entry = { path: `${prefix}${i}`, action: step.action };
+        if (step.name) entry.name = step.name;
+        
+        // Ran before the navigation: only descend into the branch it took
+        const previous = done.get(entry.path);
+        if (previous) {
+          if (previous.branch) await runSteps(step[previous.branch] || [], `${entry.path}.${previous.branch}.`);
+          continue;
+        }
+        
+        if (failedStep !== null && stopOnError) {
+          results.push({ ...entry, skipped: true });
+          continue;
+        }
+        if (isCancelled()) throw new Error('Cancelled');
+        
+        const stepStarted = performance.now();
+        try {
+          if (step.action === 'if') {
+            // Branch on element presence, optionally waiting up to `timeout` ms for it
+            let present = !!document.querySelector(step.selector);
+            if (!present && step.timeout) {
+              present = await waitFor(step.selector, step.timeout).then(() => true, () => false);
+            }
+            const branch = present === (step.exists !== false) ? 'then' : 'else';
+            results.push({ ...entry, success: true, present, branch, durationMs: elapsedSince(stepStarted) });
+            report();
+            await runSteps(step[branch] || [], `${entry.path}.${branch}.`);
+            continue;
+          }
+          
+          const result = await runStep(step);
+          if (step.name && 'value' in result) outputs[step.name] = result.value;
+          results.push({ ...entry, success: true, result, durationMs: elapsedSince(stepStarted) });
+          report();
+          if (step.action === 'click') {
+            // Give a navigation started by the click a moment to announce itself
+            await sleep(50);
+            if (leaving) throw leave;
+          }
+        } catch (stepError) {
+          if (stepError === leave || stepError.message === 'Cancelled') throw stepError;
+          results.push({ ...entry, success: false, error: stepError.message, durationMs: elapsedSince(stepStarted) });
+          report();
+          if (!step.optional && failedStep === null) {
+            failedStep = entry.path;
+            error = stepError.message;
+          }
+        }
+      }
+    };
+    
+    const finish = () => ({
+      completed: failedStep === null,
+      failedStep,
+      error,
+      outputs,
+      steps: results,
+      durationMs: elapsedSince(started)
+    });
+    return runSteps(steps, '').then(finish, (runError) => {
+      if (runError === leave) return { navigating: true, state: { results, outputs, failedStep, error } };
+      throw runError;
+    });
+  }
 }
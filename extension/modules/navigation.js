@@ -0,0 +1,183 @@
+/**
+ * Navigation Wait Module
+ * Decides how far a page must get before tab commands return
+ */
+
+export const WAIT_CONDITIONS = ['commit', 'domcontentloaded', 'load', 'networkidle', 'selector'];
+export const DEFAULT_WAIT_TIMEOUT = 30000;
+// networkidle: no request in flight for this long after load
+const NETWORK_IDLE_MS = 500;
+export const WAIT_POLL_INTERVAL = 100;
+
+/**
+ * Error for a failed or timed-out wait; `timedOut` lets the server answer 504
+ */
+export function navigationError(message, timedOut = false) {
+  const error = new Error(message);
+  error.timedOut = timedOut;
+  return error;
+}
+
+/**
+ * Wait fields of a command message
+ */
+export function navigationOptions(message) {
+  return {
+    waitUntil: message.waitUntil,
+    selector: message.waitSelector,
+    timeout: message.waitTimeout
+  };
+}
+
+export class NavigationWaiter {
+  
+  constructor() {
+    this.waits = new Set();
+    this.listen();
+  }
+  
+  listen() {
+    const mainFrame = (update) => (details) => {
+      if (details.frameId === 0) this.record(details.tabId, page => update(page, details));
+    };
+    
+    chrome.webNavigation.onCommitted.addListener(mainFrame(page => {
+      // A new document (e.g. a client-side redirect) starts its lifecycle over
+      page.committed = true;
+      page.domContentLoaded = false;
+      page.loaded = false;
+      page.error = null;
+    }));
+    chrome.webNavigation.onDOMContentLoaded.addListener(mainFrame(page => {
+      page.committed = page.domContentLoaded = true;
+    }));
+    chrome.webNavigation.onCompleted.addListener(mainFrame(page => {
+      page.committed = page.domContentLoaded = page.loaded = true;
+    }));
+    // Same-document navigations (a fragment change or history.pushState) fire
+    // none of the events above: the document they land on is already loaded
+    const sameDocument = mainFrame(page => {
+      page.committed = page.domContentLoaded = page.loaded = true;
+      page.error = null;
+    });
+    chrome.webNavigation.onReferenceFragmentUpdated.addListener(sameDocument);
+    chrome.webNavigation.onHistoryStateUpdated.addListener(sameDocument);
+    chrome.webNavigation.onErrorOccurred.addListener(mainFrame((page, details) => {
+      // Aborted loads are superseded by another navigation, not failures
+      if (details.error !== 'net::ERR_ABORTED') page.error = details.error;
+    }));
+    chrome.tabs.onRemoved.addListener((tabId) => {
+      this.record(tabId, page => { page.error = 'tab was closed'; });
+    });
+    
+    const tracked = (update) => (details) => {
+      if (details.tabId < 0) return;
+      this.record(details.tabId, page => {
+        update(page, details.requestId);
+        page.lastActivity = Date.now();
+      });
+    };
+    const filter = { urls: ['<all_urls>'] };
+    chrome.webRequest.onBeforeRequest.addListener(tracked((page, id) => page.requests.add(id)), filter);
+    chrome.webRequest.onCompleted.addListener(tracked((page, id) => page.requests.delete(id)), filter);
+    chrome.webRequest.onErrorOccurred.addListener(tracked((page, id) => page.requests.delete(id)), filter);
+  }
+  
+  /**
+   * Feed a lifecycle event to every wait watching the tab
+   */
+  record(tabId, update) {
+    for (const waiter of this.waits) {
+      if (waiter.tabId !== null && waiter.tabId !== tabId) continue;
+      let page = waiter.pages.get(tabId);
+      if (!page) {
+        page = { committed: false, domContentLoaded: false, loaded: false, requests: new Set(), lastActivity: Date.now(), error: null };
+        waiter.pages.set(tabId, page);
+      }
+      update(page);
+      if (waiter.wake) waiter.wake();
+    }
+  }
+  
+  /**
+   * Start watching for a navigation before it is triggered
+   * 
+   * Events are recorded from now on for `tabId` or - when the tab does not
+   * exist yet - for any tab. `wait(tabId)` resolves with
+   * `{ condition, elapsedMs }` once the condition holds and rejects when the
+   * navigation fails, the tab closes or the timeout passes.
+   */
+  start(url, options = {}, tabId = null) {
+    const condition = options.waitUntil || 'load';
+    const timeout = options.timeout || DEFAULT_WAIT_TIMEOUT;
+    if (!WAIT_CONDITIONS.includes(condition)) throw new Error(`Unknown wait condition: ${condition}`);
+    if (condition === 'selector' && !options.selector) throw new Error('waitUntil "selector" requires a selector');
+    
+    // A blank page has nothing to load
+    if (url === 'about:blank' && condition !== 'selector') {
+      return { wait: async () => ({ condition, elapsedMs: 0 }) };
+    }
+    
+    const started = Date.now();
+    const waiter = { tabId, pages: new Map(), wake: null };
+    this.waits.add(waiter);
+    
+    const wait = async (id) => {
+      waiter.tabId = id;
+      try {
+        while (true) {
+          const page = waiter.pages.get(id);
+          if (page && page.error) throw navigationError(`Navigation failed: ${page.error}`);
+          if (await this.satisfied(condition, options.selector, id, page)) {
+            return { condition, elapsedMs: Date.now() - started };
+          }
+          
+          const remaining = timeout - (Date.now() - started);
+          if (remaining <= 0) {
+            const target = condition === 'selector' ? `selector "${options.selector}"` : condition;
+            throw navigationError(`Timed out after ${timeout}ms waiting for ${target}`, true);
+          }
+          await new Promise(resolve => {
+            waiter.wake = resolve;
+            setTimeout(resolve, Math.min(remaining, WAIT_POLL_INTERVAL));
+          });
+        }
+      } finally {
+        this.waits.delete(waiter);
+      }
+    };
+    
+    return { wait };
+  }
+  
+  async satisfied(condition, selector, tabId, page) {
+    if (!page) return false;
+    switch (condition) {
+      case 'commit':
+        return page.committed;
+      case 'domcontentloaded':
+        return page.domContentLoaded;
+      case 'load':
+        return page.loaded;
+      case 'networkidle':
+        return page.loaded && page.requests.size === 0 && Date.now() - page.lastActivity >= NETWORK_IDLE_MS;
+      case 'selector': {
+        // Before the commit the old document is still in the tab
+        if (!page.committed) return false;
+        try {
+          const [{ result }] = await chrome.scripting.executeScript({
+            target: { tabId },
+            func: (query) => document.querySelector(query) !== null,
+            args: [selector]
+          });
+          return result;
+        } catch (error) {
+          // Document is being replaced - try again on the next poll
+          return false;
+        }
+      }
+      default:
+        return false;
+    }
+  }
+}
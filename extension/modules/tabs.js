@@ -3,14 +3,126 @@
  * Handles tab operations
  */
 
+import { NavigationWaiter, navigationError } from './navigation.js';
+
+/**
+ * Prefix an error message, keeping whether a navigation wait timed out
+ */
+function tabError(prefix, error) {
+  return navigationError(`${prefix}: ${error.message}`, error.timedOut);
+}
+
 export class TabManager {
   
-  async createTab(url, active = true) {
+  constructor() {
+    this.eventSeq = 0;
+    this.sendEvent = null;
+    this.navigation = new NavigationWaiter();
+  }
+  
+  /**
+   * Push chrome.tabs events through `send` so the server can mirror the tab table
+   */
+  startEventForwarding(send) {
+    this.sendEvent = send;
+    
+    chrome.tabs.onCreated.addListener((tab) => {
+      this.emitTabEvent('created', { tabId: tab.id, tab: this.serializeTab(tab) });
+    });
+    
+    chrome.tabs.onUpdated.addListener((tabId, changeInfo, tab) => {
+      this.emitTabEvent('updated', { tabId, changeInfo, tab: this.serializeTab(tab) });
+    });
+    
+    chrome.tabs.onRemoved.addListener((tabId, removeInfo) => {
+      this.emitTabEvent('removed', { tabId, windowId: removeInfo.windowId });
+    });
+    
+    chrome.tabs.onActivated.addListener(({ tabId, windowId }) => {
+      this.emitTabEvent('activated', { tabId, windowId });
+    });
+    
+    // Moves shift the index of every tab in the window, so resend them all
+    chrome.tabs.onMoved.addListener((tabId, moveInfo) => this.emitWindowTabs(moveInfo.windowId));
+    chrome.tabs.onAttached.addListener((tabId, attachInfo) => this.emitWindowTabs(attachInfo.newWindowId));
+    chrome.tabs.onDetached.addListener((tabId, detachInfo) => this.emitWindowTabs(detachInfo.oldWindowId));
+    
+    chrome.windows.onFocusChanged.addListener((windowId) => {
+      this.emitTabEvent('focusChanged', { windowId });
+    });
+    
+    // Navigation events - main frame only
+    const forwardNavigation = (event, extra = () => ({})) => (details) => {
+      if (details.frameId !== 0 || !this.sendEvent) return;
+      this.sendEvent({
+        type: 'navEvent',
+        event,
+        tabId: details.tabId,
+        url: details.url,
+        timeStamp: details.timeStamp,
+        ...extra(details)
+      });
+    };
+    
+    chrome.webNavigation.onCommitted.addListener(
+      forwardNavigation('committed', (details) => ({ transitionType: details.transitionType }))
+    );
+    chrome.webNavigation.onDOMContentLoaded.addListener(forwardNavigation('domContentLoaded'));
+    chrome.webNavigation.onCompleted.addListener(forwardNavigation('completed'));
+    chrome.webNavigation.onErrorOccurred.addListener(
+      forwardNavigation('errorOccurred', (details) => ({ error: details.error }))
+    );
+  }
+  
+  emitTabEvent(event, data) {
+    this.eventSeq += 1;
+    if (this.sendEvent) {
+      this.sendEvent({ type: 'tabEvent', event, seq: this.eventSeq, ...data });
+    }
+  }
+  
+  async emitWindowTabs(windowId) {
+    const tabs = await chrome.tabs.query({ windowId });
+    tabs.forEach(tab => this.emitTabEvent('updated', { tabId: tab.id, tab: this.serializeTab(tab) }));
+  }
+  
+  serializeTab(tab) {
+    return {
+      id: tab.id,
+      url: tab.url || tab.pendingUrl || '',
+      title: tab.title || '',
+      active: tab.active,
+      windowId: tab.windowId,
+      index: tab.index,
+      pinned: tab.pinned,
+      status: tab.status,
+      favIconUrl: tab.favIconUrl
+    };
+  }
+  
+  async syncTabs() {
     try {
-      const tab = await chrome.tabs.create({ url, active });
+      const seq = this.eventSeq;
+      const tabs = await chrome.tabs.query({});
+      const focused = await chrome.windows.getLastFocused().catch(() => null);
       
-      // Wait for tab to load
-      await this.waitForTabLoad(tab.id);
+      return {
+        success: true,
+        seq,
+        focusedWindowId: focused ? focused.id : null,
+        tabs: tabs.map(tab => this.serializeTab(tab))
+      };
+    } catch (error) {
+      throw new Error(`Failed to sync tabs: ${error.message}`);
+    }
+  }
+  
+  async createTab(url, active = true, windowId = undefined, options = {}) {
+    try {
+      // Listen before the tab exists so an early commit is not missed
+      const navigation = this.navigation.start(url, options);
+      const tab = await chrome.tabs.create({ url, active, windowId });
+      const wait = await navigation.wait(tab.id);
       
       return {
         success: true,
@@ -21,10 +133,37 @@ export class TabManager {
           active: tab.active,
           windowId: tab.windowId,
           index: tab.index
+        },
+        wait
+      };
+    } catch (error) {
+      throw tabError('Failed to create tab', error);
+    }
+  }
+  
+  /**
+   * Unfocused window for the server's pool of worker tabs
+   */
+  async createWindow(url = 'about:blank') {
+    try {
+      const navigation = this.navigation.start(url);
+      const poolWindow = await chrome.windows.create({ url, focused: false });
+      const tab = poolWindow.tabs[0];
+      await navigation.wait(tab.id);
+      
+      return {
+        success: true,
+        windowId: poolWindow.id,
+        tab: {
+          id: tab.id,
+          url: tab.url,
+          title: tab.title,
+          active: tab.active,
+          windowId: poolWindow.id
         }
       };
     } catch (error) {
-      throw new Error(`Failed to create tab: ${error.message}`);
+      throw tabError('Failed to create window', error);
     }
   }
   
@@ -74,12 +213,13 @@ export class TabManager {
     }
   }
   
-  async navigateTab(tabId, url) {
+  async navigateTab(tabId, url, options = {}) {
     try {
+      const navigation = this.navigation.start(url, options, tabId);
       await chrome.tabs.update(tabId, { url });
       
-      // Wait for navigation to complete
-      await this.waitForTabLoad(tabId);
+      // Wait for the requested point of the page lifecycle
+      const wait = await navigation.wait(tabId);
       
       // Get updated tab info
       const tab = await chrome.tabs.get(tabId);
@@ -91,10 +231,11 @@ export class TabManager {
           url: tab.url,
           title: tab.title,
           active: tab.active
-        }
+        },
+        wait
       };
     } catch (error) {
-      throw new Error(`Failed to navigate tab: ${error.message}`);
+      throw tabError('Failed to navigate tab', error);
     }
   }
   
@@ -125,33 +266,56 @@ export class TabManager {
     }
   }
   
-  async reloadTab(tabId, bypassCache = false) {
+  async reloadTab(tabId, bypassCache = false, options = {}) {
     try {
+      const navigation = this.navigation.start(null, options, tabId);
       await chrome.tabs.reload(tabId, { bypassCache });
-      await this.waitForTabLoad(tabId);
+      const wait = await navigation.wait(tabId);
       
-      return { success: true };
+      return { success: true, wait };
     } catch (error) {
-      throw new Error(`Failed to reload tab: ${error.message}`);
+      throw tabError('Failed to reload tab', error);
     }
   }
   
-  async waitForTabLoad(tabId, timeout = 30000) {
-    return new Promise((resolve) => {
-      const listener = (updatedTabId, info) => {
-        if (updatedTabId === tabId && info.status === 'complete') {
-          chrome.tabs.onUpdated.removeListener(listener);
-          resolve();
+  /**
+   * Return a pooled tab to a blank state, optionally wiping what the page stored
+   */
+  async resetTab(tabId, clearStorage = false) {
+    try {
+      if (clearStorage) {
+        try {
+          await chrome.scripting.executeScript({ target: { tabId }, func: clearPageStorage });
+        } catch (error) {
+          // Blank or restricted page - nothing to clear
         }
-      };
-      
-      chrome.tabs.onUpdated.addListener(listener);
+      }
+      const navigation = this.navigation.start('about:blank', {}, tabId);
+      await chrome.tabs.update(tabId, { url: 'about:blank', muted: false });
+      await navigation.wait(tabId);
       
-      // Timeout
-      setTimeout(() => {
-        chrome.tabs.onUpdated.removeListener(listener);
-        resolve();
-      }, timeout);
-    });
+      return { success: true };
+    } catch (error) {
+      throw tabError('Failed to reset tab', error);
+    }
+  }
+}
+
+/**
+ * Injected: storage the page's origin can reach (HttpOnly cookies are out of reach)
+ */
+async function clearPageStorage() {
+  try { localStorage.clear(); } catch (error) {}
+  try { sessionStorage.clear(); } catch (error) {}
+  document.cookie.split(';').forEach(cookie => {
+    const name = cookie.split('=')[0].trim();
+    if (name) document.cookie = `${name}=; expires=Thu, 01 Jan 1970 00:00:00 GMT; path=/`;
+  });
+  if (self.caches) {
+    for (const key of await caches.keys()) await caches.delete(key);
+  }
+  if (indexedDB.databases) {
+    for (const db of await indexedDB.databases()) indexedDB.deleteDatabase(db.name);
   }
+  return true;
 }
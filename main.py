@@ -4,27 +4,106 @@ Chrome Automation API - Main Entry Point
 Production-ready browser automation via REST API
 """
 
+import argparse
+import multiprocessing
+import os
+import socket
 import sys
 import uvicorn
+from uvicorn.supervisors import Multiprocess
 from app.config import settings
 
+
+def run_gateway():
+    """Gateway process: owns the extension WebSocket, serves workers over IPC"""
+    os.environ["SERVICE_ROLE"] = "gateway"
+    uvicorn.run(
+        "app.gateway:app",
+        host=settings.HOST,
+        port=settings.GATEWAY_PORT,
+        log_level=settings.LOG_LEVEL.lower()
+    )
+
+
+def bind_unix_socket(path: str) -> socket.socket:
+    """Unix domain socket for same-host clients, replacing a stale one"""
+    if os.path.exists(path):
+        os.unlink(path)
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(path)
+    os.chmod(path, 0o666)
+    return sock
+
+
+def serve_api(workers: int, reload: bool):
+    """Run the HTTP API on PORT and, when UNIX_SOCKET is set, on that socket too"""
+    if not settings.UNIX_SOCKET or reload or not hasattr(socket, "AF_UNIX"):
+        uvicorn.run(
+            "app.api:app",
+            host=settings.HOST,
+            port=settings.PORT,
+            reload=reload,
+            workers=workers if workers > 1 else None,
+            log_level=settings.LOG_LEVEL.lower()
+        )
+        return
+    
+    # uvicorn.run binds a single address; pass both listeners in ourselves
+    config = uvicorn.Config(
+        "app.api:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=workers,
+        log_level=settings.LOG_LEVEL.lower()
+    )
+    server = uvicorn.Server(config)
+    sockets = [config.bind_socket(), bind_unix_socket(settings.UNIX_SOCKET)]
+    try:
+        if workers > 1:
+            Multiprocess(config, target=server.run, sockets=sockets).run()
+        else:
+            server.run(sockets=sockets)
+    finally:
+        if os.path.exists(settings.UNIX_SOCKET):
+            os.unlink(settings.UNIX_SOCKET)
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Chrome Automation API Server")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.WORKERS,
+        help="HTTP worker processes; more than 1 starts a separate extension gateway"
+    )
+    args = parser.parse_args()
+    
     print("\n" + "="*70)
     print("Chrome Automation API Server")
     print("="*70)
     print(f"\n✓ Server: http://{settings.HOST}:{settings.PORT}")
+    if settings.UNIX_SOCKET:
+        print(f"✓ Unix socket: unix://{settings.UNIX_SOCKET}")
     print(f"✓ API Docs: http://{settings.HOST}:{settings.PORT}/docs")
-    print(f"✓ WebSocket: ws://{settings.HOST}:{settings.PORT}/ws")
+    
+    gateway = None
+    if args.workers > 1:
+        print(f"✓ Workers: {args.workers}")
+        print(f"✓ WebSocket (gateway): ws://{settings.HOST}:{settings.GATEWAY_PORT}/ws")
+        gateway = multiprocessing.Process(target=run_gateway, name="gateway", daemon=True)
+        gateway.start()
+        # Inherited by the worker processes uvicorn spawns
+        os.environ["SERVICE_ROLE"] = "worker"
+    else:
+        print(f"✓ WebSocket: ws://{settings.HOST}:{settings.PORT}/ws")
     print("\nWaiting for Chrome extension to connect...\n")
     
     try:
-        uvicorn.run(
-            "app.api:app",
-            host=settings.HOST,
-            port=settings.PORT,
-            reload=settings.DEBUG,
-            log_level=settings.LOG_LEVEL.lower()
-        )
+        serve_api(args.workers if gateway else 1, reload=settings.DEBUG and gateway is None)
     except KeyboardInterrupt:
         print("\n\n✓ Server stopped")
         sys.exit(0)
+    finally:
+        if gateway is not None:
+            gateway.terminate()
+            gateway.join(timeout=5)
@@ -0,0 +1,89 @@
+"""
+Concurrency test for the streamable HTTP transport
+
+Simulates many agents against one MCP server:
+
+    python server.py --transport http          # in one terminal
+    python bench_concurrency.py --sessions 50   # in another
+
+Every simulated agent opens its own MCP session, lists the tools and calls
+a read-only tool a few times. The test checks that every session got its
+own session id and that every call succeeded, then prints call latencies.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from mcp import ClientSession
+from mcp.client.streamable_http import streamablehttp_client
+
+
+async def run_agent(url: str, tool: str, calls: int, latencies: list) -> dict:
+    """One simulated agent: its own session, a few sequential tool calls"""
+    failures = []
+    async with streamablehttp_client(url) as (read_stream, write_stream, get_session_id):
+        async with ClientSession(read_stream, write_stream) as session:
+            await session.initialize()
+            tools = await session.list_tools()
+            if tool not in {t.name for t in tools.tools}:
+                raise RuntimeError(f"Tool {tool} not offered by the server")
+            
+            for _ in range(calls):
+                started = time.perf_counter()
+                result = await session.call_tool(tool, {})
+                latencies.append((time.perf_counter() - started) * 1000)
+                text = result.content[0].text if result.content else ""
+                if result.isError or text.startswith("❌"):
+                    failures.append(text[:200])
+            
+            return {"session_id": get_session_id(), "failures": failures}
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Many concurrent MCP sessions against one server")
+    parser.add_argument("--url", default="http://127.0.0.1:8100/mcp")
+    parser.add_argument("--sessions", type=int, default=50)
+    parser.add_argument("--calls", type=int, default=5, help="Tool calls per session")
+    parser.add_argument("--tool", default="browser_list_tabs")
+    args = parser.parse_args()
+    
+    print("=" * 70)
+    print(f"MCP CONCURRENCY TEST: {args.sessions} sessions x {args.calls} calls of {args.tool}")
+    print("=" * 70)
+    
+    latencies: list = []
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(
+        *(run_agent(args.url, args.tool, args.calls, latencies) for _ in range(args.sessions)),
+        return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+    
+    crashed = [outcome for outcome in outcomes if isinstance(outcome, BaseException)]
+    finished = [outcome for outcome in outcomes if not isinstance(outcome, BaseException)]
+    session_ids = {outcome["session_id"] for outcome in finished}
+    failures = [failure for outcome in finished for failure in outcome["failures"]]
+    
+    print(f"\nSessions finished: {len(finished)}/{args.sessions} in {elapsed:.2f}s")
+    print(f"Distinct session ids: {len(session_ids)}")
+    print(f"Tool calls: {len(latencies)}, failed: {len(failures)}")
+    if latencies:
+        ordered = sorted(latencies)
+        print(
+            f"Latency: p50 {statistics.median(ordered):.1f} ms, "
+            f"p99 {ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]:.1f} ms, "
+            f"max {ordered[-1]:.1f} ms"
+        )
+    for error in crashed[:3]:
+        print(f"❌ Session error: {error!r}")
+    for failure in failures[:3]:
+        print(f"❌ Call failed: {failure}")
+    
+    ok = not crashed and not failures and len(session_ids) == len(finished)
+    print("\n✓ PASSED" if ok else "\n❌ FAILED")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(asyncio.run(main()))
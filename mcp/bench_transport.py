@@ -0,0 +1,67 @@
+"""
+Microbenchmark: per-call overhead of TCP loopback vs. Unix domain socket
+
+Start the server with UNIX_SOCKET set, then run from the mcp directory:
+
+    python bench_transport.py --unix /tmp/chrome-automation.sock
+
+Both transports call the same cheap endpoint (GET / by default), so the
+difference is the transport's share of every MCP tool call.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from utils import APIClient
+
+
+async def measure(url: str, endpoint: str, calls: int, warmup: int) -> list:
+    """Latencies in milliseconds of `calls` sequential requests"""
+    client = APIClient(base_url=url)
+    try:
+        for _ in range(warmup):
+            await client.call("GET", endpoint)
+        
+        samples = []
+        for _ in range(calls):
+            started = time.perf_counter()
+            result = await client.call("GET", endpoint)
+            samples.append((time.perf_counter() - started) * 1000)
+            if result.get("success") is False:
+                raise RuntimeError(f"{url}{endpoint}: {result.get('error')}")
+        return samples
+    finally:
+        await client.close()
+
+
+def report(label: str, samples: list):
+    ordered = sorted(samples)
+    p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+    print(
+        f"{label:<6} mean {statistics.mean(samples):7.3f} ms   "
+        f"p50 {statistics.median(samples):7.3f} ms   p99 {p99:7.3f} ms"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tcp", default="http://localhost:8000", help="TCP base URL")
+    parser.add_argument("--unix", default="/tmp/chrome-automation.sock", help="Unix socket path")
+    parser.add_argument("--endpoint", default="/", help="Endpoint to call")
+    parser.add_argument("-n", "--calls", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=100)
+    args = parser.parse_args()
+    
+    print(f"{args.calls} sequential GET {args.endpoint} calls per transport\n")
+    tcp = await measure(args.tcp, args.endpoint, args.calls, args.warmup)
+    uds = await measure(f"unix://{args.unix}", args.endpoint, args.calls, args.warmup)
+    
+    report("tcp", tcp)
+    report("unix", uds)
+    saved = statistics.mean(tcp) - statistics.mean(uds)
+    print(f"\nUnix socket saves {saved:.3f} ms per call ({saved / statistics.mean(tcp) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,99 @@
+"""
+Token comparison of verbose and compact tool output
+
+Runs the same sample flows through the tool handlers in both output modes
+against a live API server and prints the estimated tokens each response
+costs the model:
+
+    python compare_output.py [--url https://example.com]
+"""
+
+import argparse
+import asyncio
+import json
+import re
+from handlers import handle_tool
+from utils import get_client
+from utils.pagination import estimate_tokens
+
+
+def sample_flows(url: str) -> dict:
+    """Flow name to its steps; `None` tab ids are filled in from browser_create_tab"""
+    return {
+        "read a page": [
+            ("browser_create_tab", {"url": url}),
+            ("browser_list_tabs", {}),
+            ("browser_get_metadata", {"tab_id": None}),
+            ("browser_get_content", {"tab_id": None, "format": "markdown"}),
+            ("browser_close_tab", {"tab_id": None}),
+        ],
+        "inspect elements": [
+            ("browser_create_tab", {"url": url}),
+            ("browser_wait_for_element", {"tab_id": None, "selector": "h1"}),
+            ("browser_find_element", {"tab_id": None, "selector": "h1"}),
+            ("browser_get_text", {"tab_id": None, "selector": "h1"}),
+            ("browser_get_attribute", {"tab_id": None, "selector": "a", "attribute": "href"}),
+            ("browser_close_tab", {"tab_id": None}),
+        ],
+    }
+
+
+def created_tab_id(text: str, output: str):
+    """Tab id from a browser_create_tab response in either mode"""
+    if output == "compact":
+        return json.loads(text).get("tab", {}).get("id")
+    match = re.search(r"Tab ID: (\d+)", text)
+    return int(match.group(1)) if match else None
+
+
+async def run_flow(steps: list, output: str) -> list:
+    """Token estimate per step of one flow"""
+    tab_id = None
+    costs = []
+    for name, arguments in steps:
+        arguments = {key: (tab_id if key == "tab_id" else value) for key, value in arguments.items()}
+        result = await handle_tool(name, {**arguments, "output": output})
+        text = "".join(item.text for item in result)
+        costs.append((name, estimate_tokens(text)))
+        
+        if name == "browser_create_tab":
+            tab_id = created_tab_id(text, output)
+    return costs
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Compare verbose and compact output token costs")
+    parser.add_argument("--url", default="https://example.com")
+    args = parser.parse_args()
+    
+    print("=" * 70)
+    print("OUTPUT MODE TOKEN COMPARISON (estimated tokens per response)")
+    print("=" * 70)
+    
+    grand = {"verbose": 0, "compact": 0}
+    try:
+        for flow, steps in sample_flows(args.url).items():
+            verbose = await run_flow(steps, "verbose")
+            compact = await run_flow(steps, "compact")
+            
+            print(f"\n{flow}")
+            print(f"  {'tool':<28}{'verbose':>10}{'compact':>10}{'saved':>9}")
+            for (name, v), (_, c) in zip(verbose, compact):
+                saved = f"{(v - c) / v * 100:.0f}%" if v else "-"
+                print(f"  {name:<28}{v:>10}{c:>10}{saved:>9}")
+            
+            v_total = sum(cost for _, cost in verbose)
+            c_total = sum(cost for _, cost in compact)
+            grand["verbose"] += v_total
+            grand["compact"] += c_total
+            print(f"  {'total':<28}{v_total:>10}{c_total:>10}{(v_total - c_total) / max(v_total, 1) * 100:>8.0f}%")
+    finally:
+        await get_client().close()
+    
+    saved = grand["verbose"] - grand["compact"]
+    print(f"\nAll flows: {grand['verbose']} -> {grand['compact']} tokens "
+          f"({saved / max(grand['verbose'], 1) * 100:.0f}% fewer)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -9,9 +9,72 @@ from typing import Optional
 API_BASE_URL = os.getenv("BROWSER_API_URL", "http://localhost:8000")
 API_TIMEOUT = float(os.getenv("BROWSER_API_TIMEOUT", "30.0"))
 
+# "http" calls a separately running API server; "inprocess" hosts the
+# extension WebSocket in the MCP server and calls the app code directly
+API_TRANSPORT = os.getenv("BROWSER_API_TRANSPORT", "http")
+
+# Connection pool shared by every MCP session in this process; idle
+# keepalive connections are closed after API_KEEPALIVE_EXPIRY seconds
+API_MAX_CONNECTIONS = int(os.getenv("BROWSER_API_MAX_CONNECTIONS", "100"))
+API_MAX_KEEPALIVE = int(os.getenv("BROWSER_API_MAX_KEEPALIVE", "20"))
+API_KEEPALIVE_EXPIRY = float(os.getenv("BROWSER_API_KEEPALIVE_EXPIRY", "30"))
+
+# Retries of connect errors and 503/504 responses, with full-jitter
+# exponential backoff between API_RETRY_BACKOFF and API_RETRY_MAX_BACKOFF
+API_RETRIES = int(os.getenv("BROWSER_API_RETRIES", "3"))
+API_RETRY_BACKOFF = float(os.getenv("BROWSER_API_RETRY_BACKOFF", "0.25"))
+API_RETRY_MAX_BACKOFF = float(os.getenv("BROWSER_API_RETRY_MAX_BACKOFF", "4.0"))
+
+
+def _endpoint_timeouts(value: str) -> dict[str, float]:
+    """Parse "navigate=60,content=90" into {"navigate": 60.0, "content": 90.0}"""
+    timeouts = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, seconds = item.split("=", 1)
+            timeouts[name.strip()] = float(seconds)
+    return timeouts
+
+
+# Per-endpoint timeouts, keyed by the last path segment of the endpoint;
+# others use API_TIMEOUT. Slow page work gets room for the API's own
+# (adaptive) command timeout to fire first and report a proper error.
+API_ENDPOINT_TIMEOUTS = {
+    "new": 60.0,
+    "navigate": 60.0,
+    "reload": 60.0,
+    "content": 90.0,
+    "extract": 60.0,
+    **_endpoint_timeouts(os.getenv("BROWSER_API_ENDPOINT_TIMEOUTS", ""))
+}
+
 # Server Configuration
 SERVER_NAME = "browser-automation"
 SERVER_VERSION = "1.0.0"
 
+# MCP transport: "stdio" (one agent per process) or "http" (streamable HTTP
+# and SSE, many concurrent agents sharing one API connection pool)
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "stdio")
+MCP_HTTP_HOST = os.getenv("MCP_HTTP_HOST", "127.0.0.1")
+MCP_HTTP_PORT = int(os.getenv("MCP_HTTP_PORT", "8100"))
+
+# Content paging: browser_get_content returns at most MCP_CONTENT_MAX_TOKENS
+# (estimated at CHARS_PER_TOKEN characters each) and a cursor for the rest
+CONTENT_MAX_TOKENS = int(os.getenv("MCP_CONTENT_MAX_TOKENS", "8000"))
+CHARS_PER_TOKEN = 4
+CURSOR_TTL = float(os.getenv("MCP_CURSOR_TTL", "600"))
+CURSOR_CACHE_SIZE = int(os.getenv("MCP_CURSOR_CACHE_SIZE", "64"))
+
+# Tool output: "verbose" (readable text) or "compact" (minimal JSON);
+# every tool also takes an `output` argument to choose per call
+OUTPUT_MODE = os.getenv("MCP_OUTPUT_MODE", "verbose")
+
+# browser_batch: default calls in flight, and the most calls one batch may hold
+BATCH_CONCURRENCY = int(os.getenv("MCP_BATCH_CONCURRENCY", "4"))
+BATCH_MAX_CALLS = int(os.getenv("MCP_BATCH_MAX_CALLS", "50"))
+
+# Tab resources: coalesce update notifications over this many seconds
+RESOURCE_UPDATE_DEBOUNCE = float(os.getenv("MCP_RESOURCE_UPDATE_DEBOUNCE", "0.25"))
+
 # Logging
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
@@ -3,19 +3,48 @@
 from .tab_handlers import handle_tab_tool
 from .content_handlers import handle_content_tool
 from .interaction_handlers import handle_interaction_tool
+from .compact_handlers import handle_compact_tool
+from .batch_handlers import handle_batch_tool, result_failed
+from .diagnostics_handlers import handle_diagnostics_tool
+from config import OUTPUT_MODE
+from progress import track_progress
 
-__all__ = ["handle_tab_tool", "handle_content_tool", "handle_interaction_tool"]
+__all__ = [
+    "handle_tab_tool", "handle_content_tool", "handle_interaction_tool",
+    "handle_compact_tool", "handle_batch_tool", "handle_diagnostics_tool"
+]
 
 
 async def handle_tool(name: str, arguments: dict):
     """Route tool execution to appropriate handler"""
     
+    # Output mode: per call, else the server default
+    output = arguments.pop("output", None) or OUTPUT_MODE
+    
+    # Batches dispatch their calls back through here, in the batch's output mode
+    if name == "browser_batch":
+        return await handle_batch_tool(arguments, output, handle_tool)
+    
+    async with track_progress(name, arguments) as progress:
+        result = await _route(name, arguments, output)
+        await progress.finish(not result_failed("\n".join(item.text for item in result), output))
+    return result
+
+
+async def _route(name: str, arguments: dict, output: str):
+    # Reads local client state, formatted for either output mode
+    if name == "browser_diagnostics":
+        return await handle_diagnostics_tool(name, arguments, output)
+    
+    if output == "compact":
+        return await handle_compact_tool(name, arguments)
+    
     # Tab management tools
     if name.startswith("browser_") and any(x in name for x in ["tab", "navigate", "activate", "reload"]):
         return await handle_tab_tool(name, arguments)
     
     # Content extraction tools
-    elif name in ["browser_get_content", "browser_get_metadata"]:
+    elif name in ["browser_get_content", "browser_get_content_page", "browser_get_metadata", "browser_extract"]:
         return await handle_content_tool(name, arguments)
     
     # Interaction tools
@@ -0,0 +1,142 @@
+"""
+Batch Tool Handler
+"""
+
+import asyncio
+import json
+import mcp.types as types
+import sys
+from pathlib import Path
+from typing import Awaitable, Callable
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import BATCH_CONCURRENCY, BATCH_MAX_CALLS
+from progress import activate, current_reporter
+
+Dispatch = Callable[[str, dict], Awaitable[list]]
+
+
+def result_failed(text: str, output: str) -> bool:
+    """Whether a sub-tool result reports failure (both output modes)"""
+    if output == "compact":
+        try:
+            return not json.loads(text).get("ok", False)
+        except ValueError:
+            return True
+    return text.startswith("❌") or text.startswith("Unknown")
+
+
+def _chains(calls: list, mode: str) -> list[list[int]]:
+    """
+    Indexes of the calls grouped into chains that run one after another
+    
+    Chains themselves run concurrently: one per tab in per_tab mode (calls
+    without a tab_id get a chain each), a single chain in sequential mode
+    and one per call in parallel mode.
+    """
+    if mode == "sequential":
+        return [list(range(len(calls)))]
+    if mode == "parallel":
+        return [[index] for index in range(len(calls))]
+    
+    chains: dict = {}
+    for index, call in enumerate(calls):
+        tab_id = (call.get("arguments") or {}).get("tab_id")
+        chains.setdefault(("tab", tab_id) if tab_id is not None else ("call", index), []).append(index)
+    return list(chains.values())
+
+
+async def handle_batch_tool(arguments: dict, output: str, dispatch: Dispatch) -> list[types.TextContent]:
+    """Run a list of tool calls and aggregate their results"""
+    calls = arguments.get("calls") or []
+    mode = arguments.get("mode", "per_tab")
+    stop_on_error = arguments.get("stop_on_error", True)
+    semaphore = asyncio.Semaphore(max(1, arguments.get("concurrency") or BATCH_CONCURRENCY))
+    
+    if not calls or len(calls) > BATCH_MAX_CALLS:
+        error = f"browser_batch takes 1 to {BATCH_MAX_CALLS} calls"
+        if output == "compact":
+            return [types.TextContent(type="text", text=json.dumps({"ok": False, "error": error}))]
+        return [types.TextContent(type="text", text=f"❌ {error}")]
+    
+    results: dict[int, tuple[str, str]] = {}
+    reporter = current_reporter()
+    
+    async def run_call(index: int) -> str:
+        call = calls[index]
+        tool = call.get("tool", "")
+        if tool == "browser_batch":
+            return "failed", "browser_batch cannot be nested"
+        
+        async with semaphore:
+            try:
+                content = await dispatch(tool, {**(call.get("arguments") or {}), "output": output})
+            except Exception as e:
+                return "failed", str(e)
+        
+        text = "\n".join(item.text for item in content if getattr(item, "type", "") == "text")
+        return ("failed" if result_failed(text, output) else "ok"), text
+    
+    async def run_chain(chain: list[int]):
+        # Sub-calls don't report their own progress; the batch reports calls done
+        activate(None)
+        stopped = False
+        for index in chain:
+            if stopped:
+                results[index] = ("skipped", "")
+            else:
+                results[index] = await run_call(index)
+                stopped = stop_on_error and results[index][0] == "failed"
+            if reporter is not None:
+                await reporter.report(len(results), len(calls), f"[{index}] {calls[index].get('tool')}: {results[index][0]}")
+    
+    await asyncio.gather(*(run_chain(chain) for chain in _chains(calls, mode)))
+    
+    counts = {status: sum(1 for s, _ in results.values() if s == status) for status in ("ok", "failed", "skipped")}
+    
+    if output == "compact":
+        items = []
+        for index in range(len(calls)):
+            status, text = results[index]
+            item = {"tool": calls[index].get("tool")}
+            if status == "skipped":
+                item["skipped"] = True
+            else:
+                try:
+                    item.update(json.loads(text))
+                except ValueError:
+                    item.update({"ok": False, "error": text})
+            items.append(item)
+        return [types.TextContent(
+            type="text",
+            text=json.dumps(
+                {
+                    "ok": counts["failed"] == 0,
+                    "completed": counts["ok"],
+                    "failed": counts["failed"],
+                    "skipped": counts["skipped"],
+                    "results": items
+                },
+                ensure_ascii=False, separators=(",", ":")
+            )
+        )]
+    
+    markers = {"ok": "✓", "failed": "❌", "skipped": "⏭"}
+    sections = [
+        f"📦 Batch: {counts['ok']} ok, {counts['failed']} failed, {counts['skipped']} skipped ({mode})",
+        ""
+    ]
+    for index in range(len(calls)):
+        status, text = results[index]
+        tab_id = (calls[index].get("arguments") or {}).get("tab_id")
+        on_tab = f" (tab {tab_id})" if tab_id is not None else ""
+        sections.append(f"{markers[status]} [{index}] {calls[index].get('tool')}{on_tab}")
+        if status == "skipped":
+            sections.append("Skipped after an earlier failure")
+        elif text:
+            sections.append(text)
+        sections.append("")
+    
+    return [types.TextContent(type="text", text="\n".join(sections).rstrip())]
@@ -0,0 +1,160 @@
+"""
+Compact Tool Handlers
+
+Same API calls as the regular handlers, answered with one line of minimal
+JSON instead of decorated prose: `{"ok":true,...}` on success and
+`{"ok":false,"error":"..."}` on failure. Meant for agents that parse
+results rather than read them.
+"""
+
+import json
+import mcp.types as types
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from config import CONTENT_MAX_TOKENS
+from utils import call_api
+from utils.pagination import first_page, read_page
+from .tab_handlers import wait_params
+
+# Interaction tools and the /interact action each one maps to
+INTERACTION_ACTIONS = {
+    "browser_click": "click",
+    "browser_input": "input",
+    "browser_get_text": "getText",
+    "browser_wait_for_element": "waitForElement",
+    "browser_find_element": "findElement",
+    "browser_select_option": "select",
+    "browser_get_attribute": "getAttribute"
+}
+
+
+def compact_json(data: dict) -> list[types.TextContent]:
+    return [types.TextContent(
+        type="text",
+        text=json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    )]
+
+
+def _pruned(data: dict) -> dict:
+    """Drop empty values; they cost tokens and say nothing"""
+    return {key: value for key, value in data.items() if value not in (None, "", [], {})}
+
+
+def _tab(tab: dict) -> dict:
+    return _pruned({key: tab.get(key) for key in ("id", "title", "url", "active", "status")})
+
+
+async def _request(name: str, arguments: dict) -> tuple[dict, dict]:
+    """Call the API for a tool; returns the raw result and the compact payload"""
+    tab_id = arguments.get("tab_id")
+    
+    if name == "browser_create_tab":
+        result = await call_api(
+            "POST", "/tab/new",
+            json={"url": arguments["url"], "active": arguments.get("active", True), **wait_params(arguments)}
+        )
+        return result, _pruned({"tab": _tab(result.get("tab", {})), "wait": result.get("wait")})
+    
+    if name == "browser_list_tabs":
+        result = await call_api("GET", "/tabs")
+        return result, {"tabs": [_tab(tab) for tab in result.get("tabs", [])]}
+    
+    if name == "browser_close_tab":
+        return await call_api("DELETE", f"/tab/{tab_id}"), {}
+    
+    if name == "browser_navigate":
+        result = await call_api(
+            "POST", f"/tab/{tab_id}/navigate", params={"url": arguments["url"], **wait_params(arguments)}
+        )
+        return result, _pruned({"tab": _tab(result.get("tab", {})), "wait": result.get("wait")})
+    
+    if name == "browser_activate_tab":
+        return await call_api("POST", f"/tab/{tab_id}/activate"), {}
+    
+    if name == "browser_reload_tab":
+        result = await call_api(
+            "POST", f"/tab/{tab_id}/reload",
+            params={"bypass_cache": arguments.get("bypass_cache", False), **wait_params(arguments)}
+        )
+        return result, _pruned({"wait": result.get("wait")})
+    
+    if name == "browser_get_content":
+        format_type = arguments.get("format", "markdown")
+        result = await call_api(
+            "GET",
+            f"/tab/{tab_id}/content",
+            params={
+                "format": format_type,
+                "method": arguments.get("method", "html2text"),
+                "clean": arguments.get("clean", True)
+            }
+        )
+        content = result.get("content", {})
+        text = content.get("markdown" if format_type == "markdown" else "bodyHtml", "")
+        page, cursor = first_page(
+            text, arguments.get("max_tokens") or CONTENT_MAX_TOKENS,
+            title=content.get("title", "Unknown"), url=content.get("url")
+        )
+        return result, _pruned({
+            "title": content.get("title"),
+            "url": content.get("url"),
+            "length": len(text),
+            "content": page,
+            "cursor": cursor
+        })
+    
+    if name == "browser_get_content_page":
+        entry, start, end, cursor = read_page(arguments["cursor"], arguments.get("max_tokens") or CONTENT_MAX_TOKENS)
+        return {"success": True}, _pruned({
+            "start": start,
+            "length": len(entry["text"]),
+            "content": entry["text"][start:end],
+            "cursor": cursor
+        })
+    
+    if name == "browser_get_metadata":
+        result = await call_api("GET", f"/tab/{tab_id}/metadata")
+        return result, {"metadata": _pruned(result.get("metadata", {}))}
+    
+    if name == "browser_extract":
+        body = {"fields": arguments["fields"], "format": arguments.get("format", "columns")}
+        if arguments.get("container"):
+            body["container"] = arguments["container"]
+        if arguments.get("limit"):
+            body["limit"] = arguments["limit"]
+        result = await call_api("POST", f"/tab/{tab_id}/extract", json=body)
+        return result, _pruned({key: result.get(key) for key in ("count", "columns", "rows", "cached")})
+    
+    if name in INTERACTION_ACTIONS:
+        body = {"action": INTERACTION_ACTIONS[name], "selector": arguments.get("selector")}
+        if name == "browser_get_attribute":
+            body["value"] = arguments["attribute"]
+        elif "value" in arguments:
+            body["value"] = arguments["value"]
+        if name == "browser_wait_for_element":
+            body["timeout"] = arguments.get("timeout", 5000)
+        result = await call_api("POST", f"/tab/{tab_id}/interact", json=body)
+        return result, _pruned(result.get("result") or {})
+    
+    raise ValueError(f"Unknown tool: {name}")
+
+
+async def handle_compact_tool(name: str, arguments: dict) -> list[types.TextContent]:
+    """Handle any tool with compact JSON output"""
+    try:
+        result, data = await _request(name, arguments)
+    except ValueError as e:
+        return compact_json({"ok": False, "error": str(e)})
+    
+    if not result.get("success"):
+        return compact_json(_pruned({
+            "ok": False,
+            "error": result.get("error", "Unknown error"),
+            # Still failing after the client's own retries, but worth another try later
+            "retryable": result.get("retryable") or None
+        }))
+    return compact_json({"ok": True, **data})
@@ -2,6 +2,7 @@
 Content Extraction Tool Handlers
 """
 
+import json
 import mcp.types as types
 import sys
 from pathlib import Path
@@ -9,7 +10,25 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from config import CONTENT_MAX_TOKENS
 from utils import call_api
+from utils.pagination import first_page, read_page
+
+
+def _continuation(cursor: str | None, end: int, length: int) -> str:
+    """Footer pointing at the next page, empty after the last one"""
+    if cursor is None:
+        return ""
+    return (
+        f"\n\n[Showing up to character {end} of {length}. "
+        f"Continue with browser_get_content_page cursor=\"{cursor}\"]"
+    )
+
+
+def _first_page(text: str, max_tokens: int, content: dict) -> str:
+    """The first page of a text; the whole text is cached behind a cursor if it doesn't fit"""
+    page, cursor = first_page(text, max_tokens, title=content.get("title", "Unknown"), url=content.get("url"))
+    return page + _continuation(cursor, len(page), len(text))
 
 
 async def handle_content_tool(name: str, arguments: dict) -> list[types.TextContent]:
@@ -20,6 +39,7 @@ async def handle_content_tool(name: str, arguments: dict) -> list[types.TextCont
         format_type = arguments.get("format", "markdown")
         method = arguments.get("method", "html2text")
         clean = arguments.get("clean", True)
+        max_tokens = arguments.get("max_tokens") or CONTENT_MAX_TOKENS
         
         result = await call_api(
             "GET",
@@ -60,23 +80,20 @@ async def handle_content_tool(name: str, arguments: dict) -> list[types.TextCont
                 
                 return [types.TextContent(
                     type="text",
-                    text=info + markdown
+                    text=info + _first_page(markdown, max_tokens, content)
                 )]
             else:
                 # HTML format
                 html = content.get("html", "")
                 body_html = content.get("bodyHtml", "")
                 
-                # Return body HTML (more useful than full HTML)
-                preview = body_html[:2000] if len(body_html) > 2000 else body_html
-                truncated = "...\n\n[Content truncated. Use markdown format for full content]" if len(body_html) > 2000 else ""
-                
+                # Return body HTML (more useful than full HTML), paged instead of truncated
                 return [types.TextContent(
                     type="text",
                     text=f"HTML content from {content.get('title', 'Unknown')}\n"
                          f"URL: {content.get('url', 'Unknown')}\n"
                          f"Length: {len(html)} characters\n\n"
-                         f"Body HTML:\n{preview}{truncated}"
+                         f"Body HTML:\n{_first_page(body_html, max_tokens, content)}"
                 )]
         else:
             return [types.TextContent(
@@ -84,6 +101,19 @@ async def handle_content_tool(name: str, arguments: dict) -> list[types.TextCont
                 text=f"❌ Failed to get content: {result.get('error', 'Unknown error')}"
             )]
     
+    elif name == "browser_get_content_page":
+        try:
+            entry, start, end, cursor = read_page(arguments["cursor"], arguments.get("max_tokens") or CONTENT_MAX_TOKENS)
+        except ValueError as e:
+            return [types.TextContent(type="text", text=f"❌ {e}")]
+        
+        text = entry["text"]
+        return [types.TextContent(
+            type="text",
+            text=f"📄 {entry['title']} - characters {start}-{end} of {len(text)}\n\n"
+                 f"{text[start:end]}{_continuation(cursor, end, len(text))}"
+        )]
+    
     elif name == "browser_get_metadata":
         tab_id = arguments["tab_id"]
         result = await call_api("GET", f"/tab/{tab_id}/metadata")
@@ -115,6 +145,33 @@ async def handle_content_tool(name: str, arguments: dict) -> list[types.TextCont
                 text=f"❌ Failed to get metadata: {result.get('error', 'Unknown error')}"
             )]
     
+    elif name == "browser_extract":
+        tab_id = arguments["tab_id"]
+        body = {
+            "fields": arguments["fields"],
+            "format": arguments.get("format", "columns")
+        }
+        if arguments.get("container"):
+            body["container"] = arguments["container"]
+        if arguments.get("limit"):
+            body["limit"] = arguments["limit"]
+        
+        result = await call_api("POST", f"/tab/{tab_id}/extract", json=body)
+        
+        if result.get("success"):
+            data = {key: result[key] for key in ("columns", "rows") if key in result}
+            cached = f", cached {result.get('age')}s ago" if result.get("cached") else ""
+            return [types.TextContent(
+                type="text",
+                text=f"📊 {result.get('count', 0)} rows from {result.get('url', 'Unknown')}{cached}\n"
+                     f"{json.dumps(data, ensure_ascii=False, separators=(',', ':'))}"
+            )]
+        else:
+            return [types.TextContent(
+                type="text",
+                text=f"❌ Failed to extract: {result.get('error', 'Unknown error')}"
+            )]
+    
     else:
         return [types.TextContent(
             type="text",
@@ -0,0 +1,60 @@
+"""
+Diagnostics Tool Handler
+"""
+
+import mcp.types as types
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils import get_client
+from .compact_handlers import compact_json
+
+
+def _filtered(diagnostics: dict, endpoint: str) -> dict:
+    endpoints = diagnostics.get("endpoints", {})
+    return {**diagnostics, "endpoints": {key: stats for key, stats in endpoints.items() if endpoint in key}}
+
+
+def _format_endpoint(key: str, stats: dict) -> str:
+    line = f"{key}: {stats['calls']} calls, {stats['errors']} errors, {stats['retries']} retries"
+    if "p50_ms" in stats:
+        line += f"\n  p50 {stats['p50_ms']}ms · p90 {stats['p90_ms']}ms · p99 {stats['p99_ms']}ms · max {stats['max_ms']}ms"
+    if stats.get("last_error"):
+        line += f"\n  last error: {stats['last_error']}"
+    return line
+
+
+async def handle_diagnostics_tool(name: str, arguments: dict, output: str) -> list[types.TextContent]:
+    """Handle diagnostics tool execution (both output modes)"""
+    diagnostics = get_client().diagnostics()
+    if arguments.get("endpoint"):
+        diagnostics = _filtered(diagnostics, arguments["endpoint"])
+    
+    if output == "compact":
+        return compact_json({"ok": True, **diagnostics})
+    
+    lines = [f"🩺 API client diagnostics ({diagnostics.get('transport', 'unknown')} transport)"]
+    if "base_url" in diagnostics:
+        lines.append(f"\nServer: {diagnostics['base_url']}")
+    if "pool" in diagnostics:
+        pool = diagnostics["pool"]
+        lines.append(
+            f"Pool: {pool['max_connections']} connections, {pool['max_keepalive_connections']} keepalive "
+            f"(idle expiry {pool['keepalive_expiry']}s)"
+        )
+    if "retries" in diagnostics:
+        retries = diagnostics["retries"]
+        lines.append(f"Retries: up to {retries['max']}, backoff {retries['backoff']}s–{retries['max_backoff']}s with jitter")
+    if "timeouts" in diagnostics:
+        lines.append("Timeouts: " + ", ".join(f"{key} {value}s" for key, value in diagnostics["timeouts"].items()))
+    
+    endpoints = diagnostics.get("endpoints", {})
+    lines.append(f"\nEndpoints ({len(endpoints)}), uptime {diagnostics.get('uptime_seconds', 0)}s:")
+    if not endpoints:
+        lines.append("  No calls yet")
+    lines.extend(_format_endpoint(key, stats) for key, stats in endpoints.items())
+    
+    return [types.TextContent(type="text", text="\n".join(lines))]
@@ -12,6 +12,22 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from utils import call_api
 
 
+def wait_params(arguments: dict) -> dict:
+    """Navigation wait arguments, as passed to /tab/new, /navigate and /reload"""
+    return {
+        key: arguments[key] for key in ("wait_until", "wait_selector", "wait_timeout")
+        if arguments.get(key) is not None
+    }
+
+
+def _waited(result: dict) -> str:
+    """Which wait condition was met, and how long it took"""
+    wait = result.get("wait") or (result.get("tab") or {}).get("wait")
+    if not wait:
+        return ""
+    return f"\nWaited for: {wait.get('condition')} ({wait.get('elapsedMs')} ms)"
+
+
 async def handle_tab_tool(name: str, arguments: dict) -> list[types.TextContent]:
     """Handle tab management tool execution"""
     
@@ -21,7 +37,8 @@ async def handle_tab_tool(name: str, arguments: dict) -> list[types.TextContent]
             "/tab/new",
             json={
                 "url": arguments["url"],
-                "active": arguments.get("active", True)
+                "active": arguments.get("active", True),
+                **wait_params(arguments)
             }
         )
         
@@ -29,7 +46,7 @@ async def handle_tab_tool(name: str, arguments: dict) -> list[types.TextContent]
             tab = result.get("tab", {})
             return [types.TextContent(
                 type="text",
-                text=f"✓ Tab created successfully\n\nTab ID: {tab.get('id')}\nURL: {arguments['url']}\nTitle: {tab.get('title', 'Loading...')}\n\nUse this Tab ID for further operations."
+                text=f"✓ Tab created successfully\n\nTab ID: {tab.get('id')}\nURL: {arguments['url']}\nTitle: {tab.get('title', 'Loading...')}{_waited(result)}\n\nUse this Tab ID for further operations."
             )]
         else:
             return [types.TextContent(
@@ -84,13 +101,13 @@ async def handle_tab_tool(name: str, arguments: dict) -> list[types.TextContent]
     elif name == "browser_navigate":
         tab_id = arguments["tab_id"]
         url = arguments["url"]
-        result = await call_api("POST", f"/tab/{tab_id}/navigate", params={"url": url})
+        result = await call_api("POST", f"/tab/{tab_id}/navigate", params={"url": url, **wait_params(arguments)})
         
         if result.get("success"):
             tab = result.get("tab", {})
             return [types.TextContent(
                 type="text",
-                text=f"✓ Navigated to {url}\n\nTab ID: {tab_id}\nTitle: {tab.get('title', 'Loading...')}"
+                text=f"✓ Navigated to {url}\n\nTab ID: {tab_id}\nTitle: {tab.get('title', 'Loading...')}{_waited(result)}"
             )]
         else:
             return [types.TextContent(
@@ -119,14 +136,14 @@ async def handle_tab_tool(name: str, arguments: dict) -> list[types.TextContent]
         result = await call_api(
             "POST",
             f"/tab/{tab_id}/reload",
-            params={"bypass_cache": bypass_cache}
+            params={"bypass_cache": bypass_cache, **wait_params(arguments)}
         )
         
         if result.get("success"):
             cache_msg = " (bypassing cache)" if bypass_cache else ""
             return [types.TextContent(
                 type="text",
-                text=f"✓ Tab {tab_id} reloaded{cache_msg}"
+                text=f"✓ Tab {tab_id} reloaded{cache_msg}{_waited(result)}"
             )]
         else:
             return [types.TextContent(
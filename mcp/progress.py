@@ -0,0 +1,157 @@
+"""
+Progress notifications for long-running tool calls
+
+When a client sends a progressToken with a tool call, tab creation,
+navigation and element waits report their stages as MCP progress
+notifications, sourced from the extension's tab and navigation events:
+
+    created (tab id known) -> committed -> domContentLoaded -> loaded
+
+Clients can start follow-up work on DOMContentLoaded or cancel early
+instead of waiting out the whole call.
+"""
+
+import asyncio
+import contextlib
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from utils import get_client
+
+# Navigation stages and their position on the progress scale
+NAVIGATION_STAGES = {
+    "navigation.committed": (1, "Navigation committed"),
+    "navigation.domContentLoaded": (2, "DOMContentLoaded"),
+    "navigation.completed": (3, "Page loaded"),
+}
+NAVIGATION_TOTAL = 3
+
+# Tools whose progress is tracked
+NAVIGATION_TOOLS = ("browser_create_tab", "browser_navigate")
+WAIT_TOOLS = ("browser_wait_for_element",)
+
+# How long to wait for the event subscription before running the tool anyway
+SUBSCRIBE_TIMEOUT = 2.0
+
+
+class ProgressReporter:
+    """Sends progress notifications for one tool call; progress never goes backwards"""
+    
+    def __init__(self, session: Any, token: Any):
+        self.session = session
+        self.token = token
+        self.progress = 0.0
+    
+    async def report(self, progress: float, total: Optional[float] = None, message: Optional[str] = None):
+        if progress < self.progress:
+            return
+        self.progress = progress
+        try:
+            await self.session.send_progress_notification(self.token, progress, total=total, message=message)
+        except Exception:
+            # Progress is advisory; a client that went away must not fail the call
+            pass
+
+
+_reporter: ContextVar[Optional[ProgressReporter]] = ContextVar("mcp_progress_reporter", default=None)
+
+
+def activate(reporter: Optional[ProgressReporter]):
+    """Set (or with None, suppress) the reporter for the running tool call"""
+    return _reporter.set(reporter)
+
+
+def deactivate(token):
+    _reporter.reset(token)
+
+
+def current_reporter() -> Optional[ProgressReporter]:
+    return _reporter.get()
+
+
+async def _follow_navigation(reporter: ProgressReporter, tab_id: Optional[int], ready: asyncio.Event):
+    """Report navigation stages of a tab (or of the next tab created, if tab_id is None)"""
+    async for event in get_client().events(["tab.created", "navigation"], ready=ready):
+        event_type = event.get("type")
+        
+        if event_type == "tab.created":
+            if tab_id is None:
+                tab_id = event.get("tabId")
+                await reporter.report(0, NAVIGATION_TOTAL, f"Tab {tab_id} created")
+            continue
+        
+        if tab_id is None or event.get("tabId") != tab_id:
+            continue
+        
+        if event_type == "navigation.errorOccurred":
+            await reporter.report(
+                reporter.progress, NAVIGATION_TOTAL,
+                f"Navigation failed: {event.get('data', {}).get('error', 'unknown error')}"
+            )
+        elif event_type in NAVIGATION_STAGES:
+            progress, message = NAVIGATION_STAGES[event_type]
+            url = event.get("data", {}).get("url")
+            await reporter.report(progress, NAVIGATION_TOTAL, f"{message}: {url}" if url else message)
+
+
+class _Tracker:
+    """Handle returned by track_progress; `finish` reports the final step"""
+    
+    def __init__(self, reporter: Optional[ProgressReporter], name: str, arguments: dict):
+        self.reporter = reporter
+        self.name = name
+        self.arguments = arguments
+    
+    async def finish(self, succeeded: bool):
+        if self.reporter is None or self.name not in WAIT_TOOLS:
+            return
+        selector = self.arguments.get("selector")
+        await self.reporter.report(
+            1, 1, f"Element found: {selector}" if succeeded else f"Element not found: {selector}"
+        )
+
+
+class _Muted(ProgressReporter):
+    """Relays navigation stages as messages only, keeping another scale's progress value"""
+    
+    def __init__(self, reporter: ProgressReporter):
+        self.reporter = reporter
+    
+    @property
+    def progress(self) -> float:
+        return self.reporter.progress
+    
+    async def report(self, progress: float, total: Optional[float] = None, message: Optional[str] = None):
+        await self.reporter.report(self.reporter.progress, 1, message)
+
+
+@contextlib.asynccontextmanager
+async def track_progress(name: str, arguments: dict):
+    """Report progress of a tool call while it runs, if the client asked for it"""
+    reporter = current_reporter()
+    tracker = _Tracker(reporter, name, arguments)
+    if reporter is None or name not in NAVIGATION_TOOLS + WAIT_TOOLS:
+        yield tracker
+        return
+    
+    if name in WAIT_TOOLS:
+        await reporter.report(0, 1, f"Waiting for {arguments.get('selector')}")
+    
+    # Element waits usually wait on a loading page, so follow its navigation too
+    ready = asyncio.Event()
+    follower = asyncio.create_task(_follow_navigation(
+        reporter if name in NAVIGATION_TOOLS else _Muted(reporter),
+        arguments.get("tab_id"),
+        ready
+    ))
+    # Don't hold the call up if the event stream is unavailable
+    subscribed = asyncio.create_task(ready.wait())
+    await asyncio.wait({subscribed, follower}, timeout=SUBSCRIBE_TIMEOUT, return_when=asyncio.FIRST_COMPLETED)
+    subscribed.cancel()
+    
+    try:
+        yield tracker
+    finally:
+        follower.cancel()
+        with contextlib.suppress(asyncio.CancelledError, Exception):
+            await follower
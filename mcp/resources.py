@@ -0,0 +1,187 @@
+"""
+Tabs as MCP resources
+
+- `tab://{id}`          tab state as JSON (title, URL, status, ...)
+- `tab://{id}/content`  page content as Markdown, converted when read
+
+Clients can `resources/subscribe` to either URI. A single watcher follows
+the extension's tab and navigation events and sends
+`notifications/resources/updated` to the subscribed sessions, so clients
+keep a live view without polling browser_list_tabs.
+"""
+
+import asyncio
+import json
+import re
+import weakref
+from typing import Any, Optional
+
+import mcp.types as types
+
+from config import RESOURCE_UPDATE_DEBOUNCE
+from utils import call_api, get_client
+
+TAB_URI = re.compile(r"^tab://(\d+)(/content)?/?$")
+
+
+def tab_uri(tab_id: int, content: bool = False) -> str:
+    return f"tab://{tab_id}/content" if content else f"tab://{tab_id}"
+
+
+def parse_tab_uri(uri: str) -> tuple[int, bool]:
+    """Tab id of a resource URI and whether it names the content sub-resource"""
+    match = TAB_URI.match(str(uri))
+    if not match:
+        raise ValueError(f"Unknown resource: {uri}")
+    return int(match.group(1)), bool(match.group(2))
+
+
+def _tab_state(tab: dict) -> dict:
+    return {key: tab.get(key) for key in ("id", "title", "url", "status", "active", "windowId", "index", "pinned")}
+
+
+async def list_tab_resources() -> list[types.Resource]:
+    """One resource per open tab"""
+    result = await call_api("GET", "/tabs")
+    if not result.get("success"):
+        raise RuntimeError(result.get("error", "Could not list tabs"))
+    
+    return [
+        types.Resource(
+            uri=tab_uri(tab["id"]),
+            name=tab.get("title") or tab.get("url") or f"Tab {tab['id']}",
+            description=tab.get("url"),
+            mimeType="application/json"
+        )
+        for tab in result.get("tabs", [])
+    ]
+
+
+def tab_resource_templates() -> list[types.ResourceTemplate]:
+    return [
+        types.ResourceTemplate(
+            uriTemplate="tab://{id}",
+            name="Browser tab",
+            description="Tab state: title, URL, loading status, active flag",
+            mimeType="application/json"
+        ),
+        types.ResourceTemplate(
+            uriTemplate="tab://{id}/content",
+            name="Browser tab content",
+            description="Page content as Markdown, converted when read",
+            mimeType="text/markdown"
+        )
+    ]
+
+
+async def read_tab_resource(uri: str) -> str:
+    """Contents of a tab resource"""
+    tab_id, content = parse_tab_uri(uri)
+    
+    if content:
+        result = await call_api("GET", f"/tab/{tab_id}/content", params={"format": "markdown"})
+        if not result.get("success"):
+            raise RuntimeError(result.get("error", f"Could not read tab {tab_id}"))
+        return result.get("content", {}).get("markdown", "")
+    
+    result = await call_api("GET", "/tabs")
+    if not result.get("success"):
+        raise RuntimeError(result.get("error", "Could not list tabs"))
+    for tab in result.get("tabs", []):
+        if tab.get("id") == tab_id:
+            return json.dumps(_tab_state(tab), ensure_ascii=False)
+    raise ValueError(f"Tab {tab_id} not found")
+
+
+class TabSubscriptions:
+    """
+    Resource subscriptions of all sessions, fed by one event watcher
+    
+    Updates are coalesced for RESOURCE_UPDATE_DEBOUNCE seconds since a
+    loading page fires many tab.updated events in a row.
+    """
+    
+    def __init__(self, debounce: float = RESOURCE_UPDATE_DEBOUNCE):
+        self.debounce = debounce
+        self.subscribers: dict[str, "weakref.WeakSet[Any]"] = {}
+        self.pending: set[str] = set()
+        self.list_changed = False
+        self._watcher: Optional[asyncio.Task] = None
+        self._flush: Optional[asyncio.Task] = None
+    
+    def subscribe(self, session: Any, uri: str):
+        parse_tab_uri(uri)
+        self.subscribers.setdefault(str(uri), weakref.WeakSet()).add(session)
+        if self._watcher is None or self._watcher.done():
+            self._watcher = asyncio.create_task(self._watch())
+    
+    def unsubscribe(self, session: Any, uri: str):
+        sessions = self.subscribers.get(str(uri))
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self.subscribers[str(uri)]
+    
+    def stats(self) -> dict[str, Any]:
+        return {
+            "resources": len(self.subscribers),
+            "subscriptions": sum(len(sessions) for sessions in self.subscribers.values())
+        }
+    
+    async def _watch(self):
+        """Follow tab and navigation events until nobody is subscribed"""
+        while self.subscribers:
+            try:
+                async for event in get_client().events(["tab", "navigation"]):
+                    self._on_event(event)
+                    if not self.subscribers:
+                        return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Tab event stream failed, retrying: {e}")
+            await asyncio.sleep(1)
+    
+    def _on_event(self, event: dict):
+        event_type = event.get("type", "")
+        tab_id = event.get("tabId")
+        if tab_id is None:
+            return
+        
+        if event_type.startswith("tab."):
+            self.pending.add(tab_uri(tab_id))
+            if event_type in ("tab.created", "tab.removed"):
+                self.list_changed = True
+            if event_type == "tab.removed":
+                self.pending.add(tab_uri(tab_id, content=True))
+        elif event_type in ("navigation.committed", "navigation.completed"):
+            self.pending.add(tab_uri(tab_id, content=True))
+        
+        if self.pending and (self._flush is None or self._flush.done()):
+            self._flush = asyncio.create_task(self._send_updates())
+    
+    async def _send_updates(self):
+        await asyncio.sleep(self.debounce)
+        uris, self.pending = self.pending, set()
+        list_changed, self.list_changed = self.list_changed, False
+        
+        notifications = [(uri, session) for uri in uris for session in list(self.subscribers.get(uri, ()))]
+        if list_changed:
+            # Every session holding a subscription also hears about new and closed tabs
+            sessions = {id(session): session for subscribed in self.subscribers.values() for session in subscribed}
+            notifications += [(None, session) for session in sessions.values()]
+        
+        for uri, session in notifications:
+            try:
+                if uri is None:
+                    await session.send_resource_list_changed()
+                else:
+                    await session.send_resource_updated(uri)
+            except Exception:
+                # Session went away; its transport no longer accepts messages
+                for subscribed in list(self.subscribers):
+                    self.unsubscribe(session, subscribed)
+
+
+# Shared by all sessions of this server process
+tab_subscriptions = TabSubscriptions()
@@ -4,21 +4,50 @@ Browser Automation MCP Server
 Exposes browser automation capabilities via Model Context Protocol
 
 Modular architecture with separate tool definitions and handlers
+
+Transports:
+    python server.py                       # stdio, one agent (default)
+    python server.py --transport http      # streamable HTTP at /mcp and SSE at /sse,
+                                           # many concurrent agents per process
 """
 
+import argparse
 import asyncio
+import contextlib
+import sys
 from mcp.server.models import InitializationOptions
 import mcp.types as types
 from mcp.server import NotificationOptions, Server
 import mcp.server.stdio
 
-from config import SERVER_NAME, SERVER_VERSION
+from config import SERVER_NAME, SERVER_VERSION, MCP_TRANSPORT, MCP_HTTP_HOST, MCP_HTTP_PORT
 from tools import get_all_tools
 from handlers import handle_tool
+from sessions import session_state, activate, deactivate
+from progress import ProgressReporter, activate as activate_progress, deactivate as deactivate_progress
+from resources import list_tab_resources, tab_resource_templates, read_tab_resource, tab_subscriptions
 from utils import get_client
 
+
+class BrowserServer(Server):
+    """Low-level server that also advertises resource subscriptions"""
+    
+    def create_initialization_options(
+        self,
+        notification_options: NotificationOptions | None = None,
+        experimental_capabilities: dict | None = None,
+    ) -> InitializationOptions:
+        options = super().create_initialization_options(
+            notification_options or NotificationOptions(resources_changed=True),
+            experimental_capabilities or {},
+        )
+        # The SDK never sets this flag itself; tab resources support it
+        options.capabilities.resources.subscribe = True
+        return options
+
+
 # Create server instance
-server = Server(SERVER_NAME)
+server = BrowserServer(SERVER_NAME, version=SERVER_VERSION)
 
 
 @server.list_tools()
@@ -27,6 +56,35 @@ async def handle_list_tools() -> list[types.Tool]:
     return get_all_tools()
 
 
+@server.list_resources()
+async def handle_list_resources() -> list[types.Resource]:
+    """Open tabs as tab://{id} resources"""
+    return await list_tab_resources()
+
+
+@server.list_resource_templates()
+async def handle_list_resource_templates() -> list[types.ResourceTemplate]:
+    """tab://{id} and its lazily converted tab://{id}/content"""
+    return tab_resource_templates()
+
+
+@server.read_resource()
+async def handle_read_resource(uri) -> str:
+    """Tab state as JSON, or page content as Markdown"""
+    return await read_tab_resource(str(uri))
+
+
+@server.subscribe_resource()
+async def handle_subscribe_resource(uri) -> None:
+    """Send resources/updated to this session when the tab changes"""
+    tab_subscriptions.subscribe(server.request_context.session, str(uri))
+
+
+@server.unsubscribe_resource()
+async def handle_unsubscribe_resource(uri) -> None:
+    tab_subscriptions.unsubscribe(server.request_context.session, str(uri))
+
+
 @server.call_tool()
 async def handle_call_tool(
     name: str, arguments: dict | None
@@ -36,6 +94,17 @@ async def handle_call_tool(
     if arguments is None:
         arguments = {}
     
+    context = server.request_context
+    state = session_state(context.session)
+    state.record_call(name)
+    token = activate(state)
+    
+    # Clients that pass a progressToken get progress notifications for long calls
+    progress_token = context.meta.progressToken if context.meta else None
+    reporter_token = activate_progress(
+        ProgressReporter(context.session, progress_token) if progress_token is not None else None
+    )
+    
     try:
         return await handle_tool(name, arguments)
     except Exception as e:
@@ -43,23 +112,73 @@ async def handle_call_tool(
             type="text",
             text=f"❌ Error executing {name}: {str(e)}"
         )]
+    finally:
+        deactivate_progress(reporter_token)
+        deactivate(token)
+
+
+def initialization_options() -> InitializationOptions:
+    return server.create_initialization_options()
 
 
 async def main():
-    """Run the MCP server"""
+    """Run the MCP server over stdio"""
     async with mcp.server.stdio.stdio_server() as (read_stream, write_stream):
-        await server.run(
-            read_stream,
-            write_stream,
-            InitializationOptions(
-                server_name=SERVER_NAME,
-                server_version=SERVER_VERSION,
-                capabilities=server.get_capabilities(
-                    notification_options=NotificationOptions(),
-                    experimental_capabilities={},
-                ),
-            ),
-        )
+        # stdout now carries the protocol; keep prints (e.g. from the
+        # in-process API's connection logs) off it
+        sys.stdout = sys.stderr
+        await get_client().start()
+        
+        try:
+            await server.run(read_stream, write_stream, initialization_options())
+        finally:
+            # Stops the hosted API in in-process mode while its loop is running
+            await get_client().close()
+
+
+def create_http_app():
+    """
+    ASGI app serving many MCP sessions from one process
+    
+    - `/mcp`: streamable HTTP (sessions tracked by the Mcp-Session-Id header)
+    - `/sse` + `/messages/`: the older HTTP+SSE transport
+    
+    All sessions share one API client, i.e. one connection pool.
+    """
+    from mcp.server.sse import SseServerTransport
+    from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+    from starlette.applications import Starlette
+    from starlette.responses import Response
+    from starlette.routing import Mount, Route
+    
+    session_manager = StreamableHTTPSessionManager(app=server)
+    sse = SseServerTransport("/messages/")
+    
+    async def handle_streamable_http(scope, receive, send):
+        await session_manager.handle_request(scope, receive, send)
+    
+    async def handle_sse(request):
+        async with sse.connect_sse(request.scope, request.receive, request._send) as (read_stream, write_stream):
+            await server.run(read_stream, write_stream, initialization_options())
+        return Response()
+    
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        await get_client().start()
+        async with session_manager.run():
+            try:
+                yield
+            finally:
+                await get_client().close()
+    
+    return Starlette(
+        routes=[
+            Mount("/mcp", app=handle_streamable_http),
+            Route("/sse", endpoint=handle_sse, methods=["GET"]),
+            Mount("/messages/", app=sse.handle_post_message),
+        ],
+        lifespan=lifespan,
+    )
 
 
 async def cleanup():
@@ -69,9 +188,21 @@ async def cleanup():
 
 
 if __name__ == "__main__":
-    try:
-        asyncio.run(main())
-    except KeyboardInterrupt:
-        print("\nServer stopped")
-    finally:
-        asyncio.run(cleanup())
+    parser = argparse.ArgumentParser(description="Browser Automation MCP Server")
+    parser.add_argument("--transport", choices=["stdio", "http"], default=MCP_TRANSPORT)
+    parser.add_argument("--host", default=MCP_HTTP_HOST)
+    parser.add_argument("--port", type=int, default=MCP_HTTP_PORT)
+    args = parser.parse_args()
+    
+    if args.transport == "http":
+        import uvicorn
+        
+        print(f"MCP server: http://{args.host}:{args.port}/mcp (SSE: /sse)", file=sys.stderr)
+        uvicorn.run(create_http_app(), host=args.host, port=args.port, log_level="warning")
+    else:
+        try:
+            asyncio.run(main())
+        except KeyboardInterrupt:
+            print("\nServer stopped")
+        finally:
+            asyncio.run(cleanup())
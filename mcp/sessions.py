@@ -0,0 +1,69 @@
+"""
+Per-session state for MCP clients
+
+With stdio there is exactly one session; over streamable HTTP or SSE one
+server process serves many agents at once. Everything here is keyed by the
+MCP ServerSession, while the API client (connection pool) and API-side
+caches stay shared by all sessions.
+"""
+
+import time
+import uuid
+import weakref
+from contextvars import ContextVar
+from typing import Any, Optional
+
+
+class SessionState:
+    """What the server remembers about one connected agent"""
+    
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:12]
+        self.created_at = time.time()
+        self.tool_calls = 0
+        self.last_tool: Optional[str] = None
+        # Free-form per-session storage for handlers (e.g. pagination cursors)
+        self.data: dict[str, Any] = {}
+    
+    def record_call(self, name: str):
+        self.tool_calls += 1
+        self.last_tool = name
+    
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "age_seconds": round(time.time() - self.created_at, 1),
+            "tool_calls": self.tool_calls,
+            "last_tool": self.last_tool
+        }
+
+
+# Dropped together with the session object when its transport goes away
+_states: "weakref.WeakKeyDictionary[Any, SessionState]" = weakref.WeakKeyDictionary()
+_current: ContextVar[Optional[SessionState]] = ContextVar("mcp_session_state", default=None)
+
+
+def session_state(session: Any) -> SessionState:
+    """State of an MCP ServerSession, created on first use"""
+    state = _states.get(session)
+    if state is None:
+        state = _states[session] = SessionState()
+    return state
+
+
+def activate(state: SessionState):
+    """Make `state` the current session for the running tool call"""
+    return _current.set(state)
+
+
+def deactivate(token):
+    _current.reset(token)
+
+
+def current_session() -> Optional[SessionState]:
+    """State of the session whose tool call is running, None outside a tool call"""
+    return _current.get()
+
+
+def active_sessions() -> int:
+    return len(_states)
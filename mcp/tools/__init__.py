@@ -3,14 +3,32 @@
 from .tab_tools import get_tab_tools
 from .content_tools import get_content_tools
 from .interaction_tools import get_interaction_tools
+from .batch_tools import get_batch_tools
+from .diagnostics_tools import get_diagnostics_tools
 
-__all__ = ["get_tab_tools", "get_content_tools", "get_interaction_tools"]
+__all__ = [
+    "get_tab_tools", "get_content_tools", "get_interaction_tools", "get_batch_tools",
+    "get_diagnostics_tools"
+]
+
+
+# Accepted by every tool, see handlers.handle_tool
+OUTPUT_PROPERTY = {
+    "type": "string",
+    "enum": ["verbose", "compact"],
+    "description": "'compact' returns minimal JSON instead of readable text (default: server setting)"
+}
 
 
 def get_all_tools():
     """Get all available tools"""
-    return [
+    tools = [
         *get_tab_tools(),
         *get_content_tools(),
-        *get_interaction_tools()
+        *get_interaction_tools(),
+        *get_batch_tools(),
+        *get_diagnostics_tools()
     ]
+    for tool in tools:
+        tool.inputSchema.setdefault("properties", {})["output"] = OUTPUT_PROPERTY
+    return tools
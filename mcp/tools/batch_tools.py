@@ -0,0 +1,56 @@
+"""
+Batch Tool
+"""
+
+import mcp.types as types
+
+
+def get_batch_tools() -> list[types.Tool]:
+    """Get batch tool definitions"""
+    return [
+        types.Tool(
+            name="browser_batch",
+            description="Run several browser tools in one call and get all results back together. Calls on the same tab run in order; calls on different tabs run in parallel. Use it to fill a form, read several elements or work on many tabs without one turn per action.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "calls": {
+                        "type": "array",
+                        "description": "Tool invocations, e.g. [{\"tool\": \"browser_input\", \"arguments\": {\"tab_id\": 1, \"selector\": \"#q\", \"value\": \"mcp\"}}, {\"tool\": \"browser_click\", \"arguments\": {\"tab_id\": 1, \"selector\": \"#go\"}}]",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "tool": {
+                                    "type": "string",
+                                    "description": "Name of any browser_* tool except browser_batch"
+                                },
+                                "arguments": {
+                                    "type": "object",
+                                    "description": "Arguments of that tool"
+                                }
+                            },
+                            "required": ["tool"]
+                        },
+                        "minItems": 1
+                    },
+                    "mode": {
+                        "type": "string",
+                        "enum": ["per_tab", "sequential", "parallel"],
+                        "description": "'per_tab' runs each tab's calls in order and different tabs in parallel; 'sequential' runs everything in order; 'parallel' runs everything at once (default: per_tab)",
+                        "default": "per_tab"
+                    },
+                    "concurrency": {
+                        "type": "integer",
+                        "description": "Maximum calls in flight at once (default: 4)",
+                        "default": 4
+                    },
+                    "stop_on_error": {
+                        "type": "boolean",
+                        "description": "Skip the remaining calls of a tab (all calls in sequential mode) after one fails (default: true)",
+                        "default": True
+                    }
+                },
+                "required": ["calls"]
+            }
+        )
+    ]
@@ -34,11 +34,33 @@ def get_content_tools() -> list[types.Tool]:
                         "type": "boolean",
                         "description": "Clean HTML before conversion (removes ads, scripts, styles) (default: true)",
                         "default": True
+                    },
+                    "max_tokens": {
+                        "type": "integer",
+                        "description": "Token budget for this response (default: 8000). Longer content returns the first page and a cursor for browser_get_content_page"
                     }
                 },
                 "required": ["tab_id"]
             }
         ),
+        types.Tool(
+            name="browser_get_content_page",
+            description="Read the next page of content returned by browser_get_content, using the cursor it gave. Served from the cached conversion without touching the browser again.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "cursor": {
+                        "type": "string",
+                        "description": "Cursor from the previous page"
+                    },
+                    "max_tokens": {
+                        "type": "integer",
+                        "description": "Token budget for this page (default: 8000)"
+                    }
+                },
+                "required": ["cursor"]
+            }
+        ),
         types.Tool(
             name="browser_get_metadata",
             description="Extract metadata from a page (title, description, keywords, Open Graph tags)",
@@ -52,5 +74,40 @@ def get_content_tools() -> list[types.Tool]:
                 },
                 "required": ["tab_id"]
             }
+        ),
+        types.Tool(
+            name="browser_extract",
+            description="Extract structured rows from a page in one call. Give a container selector for the repeated item (e.g. a search result) and field selectors; returns compact JSON rows. Much cheaper than reading the whole page.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "tab_id": {
+                        "type": "integer",
+                        "description": "ID of the tab"
+                    },
+                    "container": {
+                        "type": "string",
+                        "description": "CSS selector of the repeated item, e.g. '#search .g'. Omit to extract a single row from the whole page"
+                    },
+                    "fields": {
+                        "type": "object",
+                        "description": "Field name to spec. A string is a selector relative to the item, optionally with @attribute ('h3', 'a@href', '@data-id'). An object may set selector, attribute (text/html/name), all, transforms (trim, collapse, lower, upper, number, integer, absolute_url), regex, default",
+                        "additionalProperties": {
+                            "anyOf": [{"type": "string"}, {"type": "object"}]
+                        }
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Maximum number of rows"
+                    },
+                    "format": {
+                        "type": "string",
+                        "enum": ["columns", "objects"],
+                        "description": "'columns' lists field names once and rows as arrays (fewest tokens), 'objects' gives one object per row (default: columns)",
+                        "default": "columns"
+                    }
+                },
+                "required": ["tab_id", "fields"]
+            }
         )
     ]
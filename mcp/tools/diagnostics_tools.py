@@ -0,0 +1,24 @@
+"""
+Diagnostics Tool
+"""
+
+import mcp.types as types
+
+
+def get_diagnostics_tools() -> list[types.Tool]:
+    """Get diagnostics tool definitions"""
+    return [
+        types.Tool(
+            name="browser_diagnostics",
+            description="Show how this MCP server talks to the browser API: connection pool and retry settings, per-endpoint timeouts, and latency percentiles, error and retry counts for every endpoint called so far. Use it when browser tools are slow or failing.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "endpoint": {
+                        "type": "string",
+                        "description": "Only endpoints containing this text, e.g. 'navigate' or '/content' (optional)"
+                    }
+                }
+            }
+        )
+    ]
@@ -4,6 +4,24 @@ Tab Management Tools
 
 import mcp.types as types
 
+# When create/navigate/reload return, see handlers.tab_handlers.wait_params
+NAVIGATION_WAIT_PROPERTIES = {
+    "wait_until": {
+        "type": "string",
+        "enum": ["commit", "domcontentloaded", "load", "networkidle", "selector"],
+        "description": "Return once the page has committed, parsed its HTML, fully loaded, "
+                       "had no network requests for 500 ms after load, or shows wait_selector (default: load)"
+    },
+    "wait_selector": {
+        "type": "string",
+        "description": "CSS selector to wait for when wait_until is 'selector'"
+    },
+    "wait_timeout": {
+        "type": "integer",
+        "description": "Milliseconds before the wait fails with a timeout error (default: 30000)"
+    }
+}
+
 
 def get_tab_tools() -> list[types.Tool]:
     """Get tab management tool definitions"""
@@ -22,7 +40,8 @@ def get_tab_tools() -> list[types.Tool]:
                         "type": "boolean",
                         "description": "Whether to make the tab active (default: true)",
                         "default": True
-                    }
+                    },
+                    **NAVIGATION_WAIT_PROPERTIES
                 },
                 "required": ["url"]
             }
@@ -62,7 +81,8 @@ def get_tab_tools() -> list[types.Tool]:
                     "url": {
                         "type": "string",
                         "description": "URL to navigate to"
-                    }
+                    },
+                    **NAVIGATION_WAIT_PROPERTIES
                 },
                 "required": ["tab_id", "url"]
             }
@@ -95,7 +115,8 @@ def get_tab_tools() -> list[types.Tool]:
                         "type": "boolean",
                         "description": "Whether to bypass cache (default: false)",
                         "default": False
-                    }
+                    },
+                    **NAVIGATION_WAIT_PROPERTIES
                 },
                 "required": ["tab_id"]
             }
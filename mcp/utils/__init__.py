@@ -1,5 +1,6 @@
 """Utility modules"""
 
+from .transport import Transport
 from .api_client import APIClient, call_api, get_client
 
-__all__ = ["APIClient", "call_api", "get_client"]
+__all__ = ["Transport", "APIClient", "call_api", "get_client"]
@@ -2,32 +2,100 @@
 API Client for Browser Automation Server
 """
 
-from typing import Any, Optional
+from typing import Any, AsyncIterator, Optional
+import asyncio
 import httpx
+import json
+import random
 import sys
+import time
 from pathlib import Path
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from config import API_BASE_URL, API_TIMEOUT
+from config import (
+    API_BASE_URL, API_TIMEOUT, API_TRANSPORT, API_MAX_CONNECTIONS, API_MAX_KEEPALIVE,
+    API_KEEPALIVE_EXPIRY, API_RETRIES, API_RETRY_BACKOFF, API_RETRY_MAX_BACKOFF, API_ENDPOINT_TIMEOUTS
+)
+from .metrics import ClientMetrics
+from .transport import Transport
 
 
-class APIClient:
-    """HTTP client for browser automation API"""
+UNIX_SCHEME = "unix://"
+
+# Statuses retried for reads only: the extension may have run the command
+# (502: connection lost in flight, 504: timed out) or the 503 is unmarked
+RETRYABLE_STATUSES = {502: ("GET",), 503: ("GET",), 504: ("GET",)}
+
+# Set to "true" on 503s for commands the API never sent to the extension
+# (not connected, reconnecting), which any method may repeat
+NOT_SENT_HEADER = "X-Retryable"
+
+# Failures before the request reached the server
+RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def _error_detail(response: httpx.Response) -> str:
+    """The FastAPI `detail` of an error response, else its body"""
+    try:
+        detail = response.json().get("detail")
+    except (ValueError, AttributeError):
+        detail = None
+    return str(detail) if detail is not None else (response.text or response.reason_phrase)
+
+
+def _retryable(method: str, response: httpx.Response) -> bool:
+    """Whether repeating the request cannot run a command twice"""
+    # An open circuit breaker would only fail fast again
+    if "X-Circuit-Breaker" in response.headers:
+        return False
+    if response.status_code == 503 and response.headers.get(NOT_SENT_HEADER) == "true":
+        return True
+    return method in RETRYABLE_STATUSES.get(response.status_code, ())
+
+
+class APIClient(Transport):
+    """
+    HTTP client for browser automation API
+    
+    `base_url` is either an http(s) URL or `unix:///path/to/socket` to talk to
+    a server started with UNIX_SOCKET, skipping the TCP loopback stack.
+    """
     
     def __init__(self, base_url: str = API_BASE_URL, timeout: float = API_TIMEOUT):
         self.base_url = base_url
         self.timeout = timeout
+        self.endpoint_timeouts = dict(API_ENDPOINT_TIMEOUTS)
+        self.retries = API_RETRIES
+        # One pool shared by all MCP sessions of this process
+        self.limits = httpx.Limits(
+            max_connections=API_MAX_CONNECTIONS,
+            max_keepalive_connections=min(API_MAX_KEEPALIVE, API_MAX_CONNECTIONS),
+            keepalive_expiry=API_KEEPALIVE_EXPIRY
+        )
+        self.metrics = ClientMetrics()
         self._client: Optional[httpx.AsyncClient] = None
     
     async def get_client(self) -> httpx.AsyncClient:
         """Get or create HTTP client"""
         if self._client is None:
-            self._client = httpx.AsyncClient(
-                base_url=self.base_url,
-                timeout=self.timeout
-            )
+            if self.base_url.startswith(UNIX_SCHEME):
+                # The host part is only used for the Host header
+                self._client = httpx.AsyncClient(
+                    base_url="http://localhost",
+                    transport=httpx.AsyncHTTPTransport(
+                        uds=self.base_url[len(UNIX_SCHEME):],
+                        limits=self.limits
+                    ),
+                    timeout=self.timeout
+                )
+            else:
+                self._client = httpx.AsyncClient(
+                    base_url=self.base_url,
+                    timeout=self.timeout,
+                    limits=self.limits
+                )
         return self._client
     
     async def close(self):
@@ -36,35 +104,133 @@ class APIClient:
             await self._client.aclose()
             self._client = None
     
+    def timeout_for(self, endpoint: str) -> float:
+        """Timeout of an endpoint, by its last path segment"""
+        return self.endpoint_timeouts.get(endpoint.rstrip("/").rsplit("/", 1)[-1], self.timeout)
+    
+    def backoff(self, attempt: int, retry_after: Optional[str] = None) -> float:
+        """
+        Seconds to wait before retry number `attempt` (0-based)
+        
+        Full jitter: uniform in [0, min(max, base * 2^attempt)]. A numeric
+        Retry-After header replaces the jitter, capped at the maximum backoff.
+        """
+        if retry_after is not None:
+            try:
+                return min(float(retry_after), API_RETRY_MAX_BACKOFF)
+            except ValueError:
+                pass
+        return random.uniform(0, min(API_RETRY_MAX_BACKOFF, API_RETRY_BACKOFF * 2 ** attempt))
+    
     async def call(self, method: str, endpoint: str, **kwargs) -> dict[str, Any]:
-        """Make API call to browser automation server"""
+        """
+        Make API call to browser automation server
+        
+        Connect errors and 503 responses marked `X-Retryable: true` (the
+        command was never sent) are retried up to API_RETRIES times; other
+        502/503/504 responses only for GET, since a POST may have clicked,
+        submitted or navigated already. Open circuit breakers are not
+        retried. Failures come back as
+        `{"success": False, "error": ..., "status": ..., "retryable": ...}`.
+        """
+        method = method.upper()
+        if method not in ("GET", "POST", "DELETE"):
+            raise ValueError(f"Unsupported HTTP method: {method}")
+        
         client = await self.get_client()
+        kwargs.setdefault("timeout", self.timeout_for(endpoint))
+        stats = self.metrics.endpoint(method, endpoint)
+        started = time.monotonic()
+        attempt = 0
         
-        try:
-            if method.upper() == "GET":
-                response = await client.get(endpoint, **kwargs)
-            elif method.upper() == "POST":
-                response = await client.post(endpoint, **kwargs)
-            elif method.upper() == "DELETE":
-                response = await client.delete(endpoint, **kwargs)
+        while True:
+            delay = None
+            try:
+                response = await client.request(method, endpoint, **kwargs)
+            except httpx.HTTPError as e:
+                retryable = isinstance(e, RETRYABLE_ERRORS)
+                if retryable and attempt < self.retries:
+                    delay = self.backoff(attempt)
+                result = {"success": False, "error": str(e) or type(e).__name__, "retryable": retryable}
+                ok = False
             else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
+                retryable = _retryable(method, response)
+                if retryable and attempt < self.retries:
+                    delay = self.backoff(attempt, response.headers.get("Retry-After"))
+                ok = response.is_success
+                if ok:
+                    result = response.json()
+                else:
+                    result = {
+                        "success": False,
+                        "error": f"{response.status_code}: {_error_detail(response)}",
+                        "status": response.status_code,
+                        "retryable": retryable
+                    }
             
+            if delay is None:
+                break
+            attempt += 1
+            stats.retries += 1
+            await asyncio.sleep(delay)
+        
+        stats.observe(time.monotonic() - started, ok, None if ok else result["error"])
+        return result
+    
+    def diagnostics(self) -> dict[str, Any]:
+        """Pool and retry settings plus per-endpoint latency histograms"""
+        return {
+            "transport": "unix" if self.base_url.startswith(UNIX_SCHEME) else "http",
+            "base_url": self.base_url,
+            "pool": {
+                "max_connections": self.limits.max_connections,
+                "max_keepalive_connections": self.limits.max_keepalive_connections,
+                "keepalive_expiry": self.limits.keepalive_expiry
+            },
+            "retries": {
+                "max": self.retries,
+                "backoff": API_RETRY_BACKOFF,
+                "max_backoff": API_RETRY_MAX_BACKOFF
+            },
+            "timeouts": {"default": self.timeout, **self.endpoint_timeouts},
+            **self.metrics.snapshot()
+        }
+    
+    async def events(
+        self,
+        types: list[str],
+        tab_ids: Optional[list[int]] = None,
+        ready: Optional[asyncio.Event] = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Browser events from the API's Server-Sent Events stream"""
+        client = await self.get_client()
+        params: dict[str, Any] = {"types": ",".join(types)}
+        if tab_ids:
+            params["tab_id"] = tab_ids
+        
+        timeout = httpx.Timeout(self.timeout, read=None)
+        async with client.stream("GET", "/events", params=params, timeout=timeout) as response:
             response.raise_for_status()
-            return response.json()
-        except httpx.HTTPError as e:
-            return {"success": False, "error": str(e)}
+            if ready is not None:
+                ready.set()
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    yield json.loads(line[len("data: "):])
 
 
 # Global client instance
-_global_client: Optional[APIClient] = None
+_global_client: Optional[Transport] = None
 
 
-def get_client() -> APIClient:
-    """Get global API client instance"""
+def get_client() -> Transport:
+    """Get global API client instance (HTTP, or in-process per BROWSER_API_TRANSPORT)"""
     global _global_client
     if _global_client is None:
-        _global_client = APIClient()
+        if API_TRANSPORT == "inprocess":
+            from .inprocess import InProcessTransport
+            _global_client = InProcessTransport()
+        else:
+            _global_client = APIClient()
     return _global_client
 
 
@@ -0,0 +1,151 @@
+"""
+In-process transport: the MCP server hosts the extension WebSocket itself
+
+Tool calls are dispatched straight to the route functions of the FastAPI
+app in `app/`, which talk to ExtensionService and the markdown converter
+without an HTTP round trip. The same app is served on the API port so the
+extension can connect (and REST clients keep working).
+"""
+
+import asyncio
+import inspect
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Optional
+
+import uvicorn
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.params import Param
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ValidationError
+from starlette.routing import Match
+
+from .metrics import ClientMetrics
+from .transport import Transport
+
+# The repository root holds the `app` package. Appended, not prepended:
+# the root also has an `mcp/` directory that must not shadow the mcp SDK.
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from app.api import app
+from app.config import settings
+from app.services.events import event_bus
+from app.services.leases import LEASE_HEADER, LEASE_WAIT_HEADER, set_claim, reset_claim
+
+
+class InProcessTransport(Transport):
+    """Calls the API's route handlers directly instead of over HTTP"""
+    
+    def __init__(self):
+        self.app = app
+        self.metrics = ClientMetrics()
+        self._server = None
+        self._server_task = None
+    
+    async def start(self):
+        """Serve the app (and with it /ws for the extension) in this event loop"""
+        config = uvicorn.Config(
+            self.app,
+            host=settings.HOST,
+            port=settings.PORT,
+            log_level="warning"
+        )
+        self._server = uvicorn.Server(config)
+        self._server_task = asyncio.create_task(self._server.serve())
+    
+    async def close(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            await self._server_task
+            self._server = None
+    
+    def _resolve(self, method: str, endpoint: str):
+        """The route matching a request, with its path parameters"""
+        scope = {"type": "http", "path": endpoint, "method": method.upper(), "root_path": ""}
+        for route in self.app.routes:
+            if not isinstance(route, APIRoute):
+                continue
+            match, child_scope = route.matches(scope)
+            if match == Match.FULL:
+                return route, child_scope.get("path_params", {})
+        return None, {}
+    
+    def _arguments(self, route, path_params: dict, params: dict, body: Optional[dict]) -> dict:
+        """Bind path, query and body values to the route function's parameters"""
+        arguments = {}
+        for name, parameter in inspect.signature(route.endpoint).parameters.items():
+            annotation = parameter.annotation
+            
+            if annotation is Request:
+                # No HTTP client to watch for disconnects
+                arguments[name] = None
+            elif inspect.isclass(annotation) and issubclass(annotation, BaseModel):
+                arguments[name] = annotation(**(body or {}))
+            elif name in path_params:
+                value = path_params[name]
+                arguments[name] = annotation(value) if annotation in (int, float) else value
+            elif name in params:
+                arguments[name] = params[name]
+            elif isinstance(parameter.default, Param):
+                arguments[name] = parameter.default.default
+            elif parameter.default is not inspect.Parameter.empty:
+                arguments[name] = parameter.default
+        return arguments
+    
+    async def call(self, method: str, endpoint: str, **kwargs) -> dict[str, Any]:
+        started = time.monotonic()
+        result = await self._call(method, endpoint, **kwargs)
+        failed = result.get("success") is False
+        self.metrics.endpoint(method, endpoint).observe(
+            time.monotonic() - started, not failed, result.get("error") if failed else None
+        )
+        return result
+    
+    async def _call(self, method: str, endpoint: str, **kwargs) -> dict[str, Any]:
+        route, path_params = self._resolve(method, endpoint)
+        if route is None:
+            return {"success": False, "error": f"No route for {method.upper()} {endpoint}"}
+        
+        # Lease headers, as the API's middleware would read them
+        headers = kwargs.get("headers") or {}
+        wait = headers.get(LEASE_WAIT_HEADER)
+        context_token = set_claim(headers.get(LEASE_HEADER), float(wait) if wait else None)
+        try:
+            arguments = self._arguments(route, path_params, kwargs.get("params") or {}, kwargs.get("json"))
+            result = await route.endpoint(**arguments)
+        except HTTPException as e:
+            return {"success": False, "error": f"{e.status_code}: {e.detail}"}
+        except (ValidationError, ValueError) as e:
+            return {"success": False, "error": f"422: {e}"}
+        finally:
+            reset_claim(context_token)
+        
+        if isinstance(result, JSONResponse):
+            if result.status_code >= 400:
+                return {"success": False, "error": f"{result.status_code}: {result.body.decode()}"}
+            return json.loads(result.body)
+        if isinstance(result, Response):
+            return {"success": False, "error": f"{endpoint} streams its response; use the HTTP transport"}
+        return jsonable_encoder(result)
+    
+    def diagnostics(self) -> dict[str, Any]:
+        """Per-endpoint latency of direct route calls (no pool, no retries)"""
+        return {"transport": "inprocess", **self.metrics.snapshot()}
+    
+    async def events(
+        self,
+        types: list[str],
+        tab_ids: Optional[list[int]] = None,
+        ready: Optional[asyncio.Event] = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Browser events straight from the app's event bus"""
+        subscriber = event_bus.subscribe(types, tab_ids)
+        if ready is not None:
+            ready.set()
+        async for event in event_bus.listen(subscriber):
+            if event is not None:
+                yield event
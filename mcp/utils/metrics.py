@@ -0,0 +1,82 @@
+"""
+Client-side latency histograms
+"""
+
+import math
+import re
+import time
+from collections import deque
+from typing import Any, Optional
+
+# Histogram bucket upper bounds in milliseconds
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+_ID_SEGMENT = re.compile(r"/\d+(?=/|$)")
+
+
+def endpoint_key(method: str, endpoint: str) -> str:
+    """Group calls by route: `GET /tab/123/content` -> `GET /tab/{id}/content`"""
+    return f"{method.upper()} {_ID_SEGMENT.sub('/{id}', endpoint)}"
+
+
+class EndpointStats:
+    """Latency samples and outcome counters of one endpoint"""
+    
+    def __init__(self, max_samples: int = 500):
+        self.samples: deque = deque(maxlen=max_samples)
+        self.calls = 0
+        self.errors = 0
+        self.retries = 0
+        self.last_error: Optional[str] = None
+    
+    def observe(self, seconds: float, ok: bool, error: Optional[str] = None):
+        self.samples.append(seconds)
+        self.calls += 1
+        if not ok:
+            self.errors += 1
+            self.last_error = error
+    
+    def snapshot(self) -> dict[str, Any]:
+        values = sorted(self.samples)
+        summary: dict[str, Any] = {"calls": self.calls, "errors": self.errors, "retries": self.retries}
+        if self.last_error:
+            summary["last_error"] = self.last_error
+        if not values:
+            return summary
+        
+        def rank(q: float) -> float:
+            return round(values[min(len(values) - 1, max(0, math.ceil(q * len(values)) - 1))] * 1000, 2)
+        
+        buckets = {}
+        for bound in BUCKETS_MS:
+            buckets[f"le_{bound}"] = sum(1 for value in values if value * 1000 <= bound) - sum(buckets.values())
+        buckets["le_inf"] = len(values) - sum(buckets.values())
+        
+        return {
+            **summary,
+            "p50_ms": rank(0.50),
+            "p90_ms": rank(0.90),
+            "p99_ms": rank(0.99),
+            "max_ms": round(values[-1] * 1000, 2),
+            "buckets": buckets
+        }
+
+
+class ClientMetrics:
+    """Per-endpoint stats for every call made by the API client"""
+    
+    def __init__(self):
+        self.started_at = time.time()
+        self.endpoints: dict[str, EndpointStats] = {}
+    
+    def endpoint(self, method: str, endpoint: str) -> EndpointStats:
+        key = endpoint_key(method, endpoint)
+        if key not in self.endpoints:
+            self.endpoints[key] = EndpointStats()
+        return self.endpoints[key]
+    
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "uptime_seconds": round(time.time() - self.started_at, 1),
+            "endpoints": {key: stats.snapshot() for key, stats in sorted(self.endpoints.items())}
+        }
@@ -0,0 +1,117 @@
+"""
+Token-budgeted paging of large tool outputs
+
+A converted page is fetched from the browser once; the full text is kept in
+a cursor cache and handed out in pages that fit the caller's token budget.
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Optional
+
+from config import CHARS_PER_TOKEN, CURSOR_TTL, CURSOR_CACHE_SIZE
+from sessions import current_session
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (no tokenizer dependency)"""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def page_end(text: str, start: int, max_tokens: int) -> int:
+    """
+    End offset of the page starting at `start`
+    
+    Prefers to break at a paragraph, then a line, then a word boundary in
+    the second half of the page so pages don't cut through sentences.
+    """
+    end = start + max(1, max_tokens) * CHARS_PER_TOKEN
+    if end >= len(text):
+        return len(text)
+    
+    floor = start + (end - start) // 2
+    for separator in ("\n\n", "\n", " "):
+        cut = text.rfind(separator, floor, end)
+        if cut != -1:
+            return cut + len(separator)
+    return end
+
+
+class CursorCache:
+    """Full texts behind content cursors, expiring after `ttl` seconds"""
+    
+    def __init__(self, ttl: float = CURSOR_TTL, max_entries: int = CURSOR_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, dict[str, Any]]" = OrderedDict()
+    
+    def _expire(self):
+        cutoff = time.time() - self.ttl
+        for key in [key for key, entry in self.entries.items() if entry["stored_at"] < cutoff]:
+            del self.entries[key]
+    
+    def put(self, text: str, owner: Optional[str] = None, **meta) -> str:
+        """Store a text and return its cursor id"""
+        self._expire()
+        cursor_id = uuid.uuid4().hex[:16]
+        self.entries[cursor_id] = {"text": text, "owner": owner, "stored_at": time.time(), **meta}
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return cursor_id
+    
+    def get(self, cursor_id: str, owner: Optional[str] = None) -> Optional[dict[str, Any]]:
+        """Entry for a cursor id, None when unknown, expired or another session's"""
+        self._expire()
+        entry = self.entries.get(cursor_id)
+        if entry is None or (entry["owner"] is not None and entry["owner"] != owner):
+            return None
+        self.entries.move_to_end(cursor_id)
+        return entry
+
+
+def encode_cursor(cursor_id: str, offset: int) -> str:
+    return f"{cursor_id}:{offset}"
+
+
+def decode_cursor(cursor: str) -> tuple[str, int]:
+    """Split a cursor into its cache id and character offset"""
+    cursor_id, _, offset = cursor.partition(":")
+    if not cursor_id or not offset.isdigit():
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return cursor_id, int(offset)
+
+
+# Shared by all sessions; entries are tagged with the owning session
+content_cursors = CursorCache()
+
+
+def _owner() -> Optional[str]:
+    session = current_session()
+    return session.id if session else None
+
+
+def first_page(text: str, max_tokens: int, **meta) -> tuple[str, Optional[str]]:
+    """First page of a text and a cursor to the rest (None when it all fits)"""
+    end = page_end(text, 0, max_tokens)
+    if end >= len(text):
+        return text, None
+    
+    cursor_id = content_cursors.put(text, owner=_owner(), **meta)
+    return text[:end], encode_cursor(cursor_id, end)
+
+
+def read_page(cursor: str, max_tokens: int) -> tuple[dict[str, Any], int, int, Optional[str]]:
+    """
+    Page at a cursor: (entry, start, end, next cursor or None)
+    
+    Raises ValueError for malformed, expired or foreign cursors.
+    """
+    cursor_id, start = decode_cursor(cursor)
+    entry = content_cursors.get(cursor_id, owner=_owner())
+    if entry is None:
+        raise ValueError("Cursor expired or unknown. Call browser_get_content again.")
+    
+    end = page_end(entry["text"], start, max_tokens)
+    next_cursor = encode_cursor(cursor_id, end) if end < len(entry["text"]) else None
+    return entry, start, end, next_cursor
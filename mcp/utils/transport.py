@@ -0,0 +1,50 @@
+"""
+Transport interface used by the tool handlers
+"""
+
+import asyncio
+from abc import ABC, abstractmethod
+from typing import Any, AsyncIterator, Optional
+
+
+class Transport(ABC):
+    """
+    How tool handlers reach the browser automation API
+    
+    Handlers only ever call `call(method, endpoint, params=..., json=...)`
+    with REST-style endpoints and get the JSON body back as a dict, or
+    `{"success": False, "error": ...}` on failure. Implementations decide
+    whether that goes over HTTP or straight into the app in this process.
+    A subclass missing `call` or `events` cannot be instantiated.
+    """
+    
+    async def start(self):
+        """Start background work (e.g. hosting the extension WebSocket)"""
+        pass
+    
+    @abstractmethod
+    async def call(self, method: str, endpoint: str, **kwargs) -> dict[str, Any]:
+        """Send one REST-style request and return its JSON body"""
+    
+    @abstractmethod
+    def events(
+        self,
+        types: list[str],
+        tab_ids: Optional[list[int]] = None,
+        ready: Optional[asyncio.Event] = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Browser events as published on the API's /events stream
+        
+        `ready` is set once the subscription is in place, so a caller can
+        subscribe before sending the command whose events it wants.
+        Implementations are async generators.
+        """
+    
+    def diagnostics(self) -> dict[str, Any]:
+        """Client-side settings and per-endpoint latency of this transport"""
+        return {}
+    
+    async def close(self):
+        """Release connections and background work"""
+        pass
@@ -0,0 +1,110 @@
+"""
+Concurrent clients against the API, with a fake extension on the socket
+
+Drives `app.api:app` in-process through httpx's ASGITransport. The fake
+extension answers commands out of order after a delay, so the tests fail
+if commands are serialized or a response reaches the wrong request.
+"""
+
+import asyncio
+import time
+import httpx
+from app.api import app
+from app.services.extension import extension_service
+
+TABS = 20
+# The first tab answers last: responses arrive in reverse request order
+BASE_DELAY = 0.2
+STAGGER = 0.01
+
+
+class FakeExtension:
+    """Stands in for the extension's WebSocket on the server side"""
+    
+    def __init__(self):
+        self.inflight = 0
+        self.max_inflight = 0
+        self.tasks = set()
+    
+    async def accept(self):
+        pass
+    
+    async def send_json(self, message):
+        task = asyncio.ensure_future(self._answer(message))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+    
+    async def close(self, code: int = 1000):
+        pass
+    
+    async def _answer(self, message):
+        if message.get("type") == "ping":
+            await extension_service.handle_message({"type": "pong", "id": message.get("id")})
+            return
+        
+        action = message.get("action")
+        if action == "syncTabs":
+            tabs = [{"id": tab_id, "url": f"https://example.com/{tab_id}", "status": "complete"} for tab_id in range(TABS)]
+            await extension_service.handle_message({"requestId": message["requestId"], "success": True, "tabs": tabs})
+            return
+        if action != "getContent":
+            return
+        
+        tab_id = message["tabId"]
+        self.inflight += 1
+        self.max_inflight = max(self.max_inflight, self.inflight)
+        try:
+            await asyncio.sleep(BASE_DELAY + STAGGER * (TABS - tab_id))
+        finally:
+            self.inflight -= 1
+        await extension_service.handle_message({
+            "requestId": message["requestId"],
+            "success": True,
+            "content": {"html": f"<p>tab {tab_id}</p>", "tabId": tab_id}
+        })
+
+
+async def _with_extension(scenario):
+    """Run `scenario(client, fake)` with the fake extension connected"""
+    fake = FakeExtension()
+    await extension_service.connect(fake)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await scenario(client, fake)
+    finally:
+        extension_service.disconnect(fake)
+        for task in (extension_service._grace_task, *fake.tasks):
+            if task and not task.done():
+                task.cancel()
+
+
+def test_parallel_commands_are_not_serialized():
+    async def scenario(client, fake):
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(
+            client.get(f"/tab/{tab_id}/content", params={"format": "html"}) for tab_id in range(TABS)
+        ))
+        elapsed = time.perf_counter() - started
+        
+        assert all(response.status_code == 200 for response in responses)
+        assert fake.max_inflight == TABS
+        # Serialized, the commands would take the sum of their delays
+        assert elapsed < sum(BASE_DELAY + STAGGER * (TABS - tab_id) for tab_id in range(TABS)) / 4
+    
+    asyncio.run(_with_extension(scenario))
+
+
+def test_out_of_order_responses_reach_their_requests():
+    async def scenario(client, fake):
+        responses = await asyncio.gather(*(
+            client.get(f"/tab/{tab_id}/content", params={"format": "html"}) for tab_id in range(TABS)
+        ))
+        
+        for tab_id, response in enumerate(responses):
+            body = response.json()
+            assert body["success"] is True
+            assert body["content"] == {"html": f"<p>tab {tab_id}</p>", "tabId": tab_id}
+        assert not extension_service.pending_requests
+    
+    asyncio.run(_with_extension(scenario))